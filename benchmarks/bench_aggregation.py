@@ -0,0 +1,97 @@
+"""
+Compares the old one-scan-per-metric report analysis with the single-pass
+aggregation used by generate_sales_report.
+
+Usage: python benchmarks/bench_aggregation.py [rows]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from benchmarks.synthetic import make_transactions
+from utils.data_processor import (
+    aggregate_transactions,
+    _region_view,
+    _top_products_view,
+    _customer_view,
+    _daily_view,
+    _peak_day_view,
+    _low_performers_view
+)
+
+
+class CountingList(list):
+    """List that counts how many times it is iterated from the start."""
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.passes = 0
+
+    def __iter__(self):
+        self.passes += 1
+        return super().__iter__()
+
+
+def legacy_report_metrics(transactions):
+    """
+    Reproduces the scans the report used to make: one loop per metric,
+    daily trend computed twice (once for the peak day) and a sort of every date.
+    """
+    def by_key(key):
+        stats = {}
+        for t in transactions:
+            amount = t['Quantity'] * t['UnitPrice']
+            entry = stats.setdefault(t[key], [0.0, 0, set()])
+            entry[0] += amount
+            entry[1] += 1
+            if key == 'CustomerID':
+                entry[2].add(t['ProductName'])
+            elif key == 'Date':
+                entry[2].add(t['CustomerID'])
+        return stats
+
+    total = 0.0
+    for t in transactions:
+        total += t['Quantity'] * t['UnitPrice']
+    by_key('Region')
+    by_key('ProductName')
+    by_key('CustomerID')
+    by_key('Date')
+    by_key('Date')
+    by_key('ProductName')
+    sorted([t['Date'] for t in transactions])
+    return total
+
+
+def single_pass_report_metrics(transactions):
+    stats = aggregate_transactions(transactions)
+    _region_view(stats)
+    _top_products_view(stats, 5)
+    _customer_view(stats)
+    daily = _daily_view(stats)
+    _peak_day_view(daily)
+    _low_performers_view(stats, 5)
+    return stats['total_revenue']
+
+
+def run(label, func, transactions):
+    transactions.passes = 0
+    start = time.perf_counter()
+    func(transactions)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<14} | passes: {transactions.passes:<3} | {elapsed:8.3f}s")
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    print(f"Generating {rows:,} synthetic transactions...")
+    transactions = CountingList(make_transactions(rows))
+
+    run("per-metric", legacy_report_metrics, transactions)
+    run("single-pass", single_pass_report_metrics, transactions)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Benchmark: end-to-end latency of main.py, serial vs --async, against a
+deliberately slow local mock of the product API.
+
+Each run executes main.py in a scratch directory holding a synthetic
+data/sales_data.txt, with --no-cache so the catalog is fetched every time,
+and answers 'n' to the filter prompt. The async run starts the catalog
+fetch at once and parses while it downloads, so its total should approach
+max(fetch, local work) instead of their sum.
+
+Usage: python benchmarks/bench_async_pipeline.py [--rows N] [--products N] [--delay SECONDS]
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from benchmarks.mock_product_api import MockProductAPI
+from benchmarks.synthetic import write_sales_file
+
+
+def run_main(workdir, base_url, extra_args):
+    command = [sys.executable, os.path.join(ROOT, 'main.py'), '--no-cache', '--api-url', base_url] + extra_args
+    start = time.perf_counter()
+    result = subprocess.run(command, cwd=workdir, input='n\n', capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr)
+    return elapsed, result.stdout
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=300_000)
+    parser.add_argument('--products', type=int, default=2_000, help="products served by the mock API")
+    parser.add_argument('--delay', type=float, default=0.5, help="seconds added to every API request")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir, MockProductAPI(args.products, args.delay) as api:
+        os.makedirs(os.path.join(workdir, 'data'))
+        write_sales_file(os.path.join(workdir, 'data', 'sales_data.txt'), args.rows, n_products=args.products)
+        print(f"{args.rows:,} rows, {args.products:,} products, {args.delay}s per API request")
+
+        outputs = {}
+        for label, extra in (("serial", []), ("async ", ['--async'])):
+            elapsed, stdout = run_main(workdir, api.base_url, extra)
+            with open(os.path.join(workdir, 'data', 'enriched_sales_data.txt'), 'rb') as file:
+                outputs[label] = file.read()
+            print(f"  {label} | end to end {elapsed:6.2f}s")
+            for line in stdout.splitlines():
+                if re.match(r' (⏱|✓ Fetch overlapped|✓ Enriched)', line):
+                    print(f"           {line.strip()}")
+
+        print(f"  same enriched output: {outputs['serial'] == outputs['async ']}")
+
+
+if __name__ == "__main__":
+    main()
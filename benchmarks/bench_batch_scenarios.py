@@ -0,0 +1,117 @@
+"""
+Benchmark: N filter scenarios as one batch run of main.py (--scenarios FILE)
+vs N interactive runs of main.py, each answering the filter prompt.
+
+Both sides run on the same seeded synthetic file, in scratch directories,
+against the local mock product API with the catalog cache off. The N
+separate runs each read, parse, fetch, enrich and save the whole file
+again; the batch run does that once and answers every scenario from the
+transaction index. Checks that every scenario's report is the same both
+ways (apart from the timestamp and the unordered failed product IDs).
+
+Usage: python benchmarks/bench_batch_scenarios.py [--rows N] [--scenarios N] [--seed N]
+"""
+import argparse
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from benchmarks.mock_product_api import MockProductAPI
+from benchmarks.synthetic import write_sales_file, REGIONS
+
+# Report lines that differ between two runs over the same rows
+VOLATILE_LINES = ('Generated:', 'Failed to Match')
+
+
+def make_scenarios(count, seed):
+    """
+    Returns: list of (name, region, min_amount, max_amount), None for no filter.
+    Amounts are quantity x unit price, up to 900,000 in the synthetic data.
+    """
+    rng = random.Random(seed)
+    scenarios = []
+    for i in range(count):
+        region = rng.choice(REGIONS + [None])
+        low, high = sorted(rng.randrange(0, 900_001, 1000) for _ in range(2))
+        min_amount = low if rng.random() < 0.7 else None
+        max_amount = high if rng.random() < 0.7 else None
+        scenarios.append((f"s{i:03d}", region, min_amount, max_amount))
+    return scenarios
+
+
+def workdir_for(path, workdir):
+    os.makedirs(os.path.join(workdir, 'data'))
+    os.symlink(os.path.abspath(path), os.path.join(workdir, 'data', 'sales_data.txt'))
+
+
+def run_main(workdir, base_url, extra_args, answers):
+    command = [sys.executable, os.path.join(ROOT, 'main.py'), '--no-cache', '--api-url', base_url,
+               '--profile', ''] + extra_args
+    result = subprocess.run(command, cwd=workdir, input=answers, capture_output=True, text=True)
+    if result.returncode != 0 or 'CRITICAL ERROR' in result.stdout:
+        raise RuntimeError(f"main.py {' '.join(extra_args)} failed:\n{result.stdout[-2000:]}{result.stderr[-2000:]}")
+
+
+def read_report(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return [line for line in f if not any(marker in line for marker in VOLATILE_LINES)]
+
+
+def answers_for(region, min_amount, max_amount):
+    fields = ['' if value is None else str(value) for value in (region, min_amount, max_amount)]
+    return 'y\n' + '\n'.join(fields) + '\n'
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--scenarios', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    scenarios = make_scenarios(args.scenarios, args.seed)
+    with tempfile.TemporaryDirectory() as scratch, MockProductAPI(200) as api:
+        path = os.path.join(scratch, 'sales.txt')
+        write_sales_file(path, args.rows, seed=args.seed)
+        print(f"{args.rows:,} rows, {len(scenarios)} scenarios")
+
+        separate = {}
+        start = time.perf_counter()
+        for name, region, min_amount, max_amount in scenarios:
+            workdir = os.path.join(scratch, f"run_{name}")
+            workdir_for(path, workdir)
+            run_main(workdir, api.base_url, [], answers_for(region, min_amount, max_amount))
+            separate[name] = read_report(os.path.join(workdir, 'output', 'sales_report.txt'))
+        separate_time = time.perf_counter() - start
+
+        workdir = os.path.join(scratch, 'batch')
+        workdir_for(path, workdir)
+        scenario_file = os.path.join(workdir, 'scenarios.txt')
+        with open(scenario_file, 'w', encoding='utf-8') as f:
+            for name, region, min_amount, max_amount in scenarios:
+                fields = ['' if value is None else str(value) for value in (region, min_amount, max_amount)]
+                f.write(f"{name}={':'.join(fields)}\n")
+        start = time.perf_counter()
+        run_main(workdir, api.base_url, ['--scenarios', scenario_file], '')
+        batch_time = time.perf_counter() - start
+        batch = {name: read_report(os.path.join(workdir, 'output', 'reports', f"{name}.txt"))
+                 for name, *_ in scenarios}
+
+    print(f"  {len(scenarios)} separate runs | {separate_time:7.2f}s | "
+          f"{len(scenarios) / separate_time:6.2f} scenarios/s")
+    print(f"  one batch run    | {batch_time:7.2f}s | {len(scenarios) / batch_time:6.2f} scenarios/s "
+          f"({separate_time / batch_time:.1f}x)")
+    print(f"  same reports: {separate == batch} "
+          f"({sum(report is not None for report in batch.values())} scenarios with rows)")
+
+
+if __name__ == "__main__":
+    main()
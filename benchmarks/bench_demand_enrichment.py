@@ -0,0 +1,65 @@
+"""
+Compares full-catalog enrichment with demand-driven enrichment (only the
+products referenced by the sales data are fetched) against the local mock API.
+
+Usage: python benchmarks/bench_demand_enrichment.py [--rows N] [--catalog N] [--active N]
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from benchmarks.mock_product_api import MockProductAPI
+from benchmarks.synthetic import make_transactions
+from utils.api_handler import fetch_all_products, create_product_mapping
+from utils.data_processor import enrich_sales_data, collect_product_ids
+from utils.product_cache import get_product_mapping_for_ids
+
+
+def catalog_enrichment(transactions, base_url, cache_file):
+    product_map = create_product_mapping(fetch_all_products(base_url))
+    return enrich_sales_data(transactions, product_map)
+
+
+def demand_enrichment(transactions, base_url, cache_file):
+    product_ids = collect_product_ids(transactions)
+    product_map, _ = get_product_mapping_for_ids(product_ids.values(), cache_file, base_url=base_url)
+    return enrich_sales_data(transactions, product_map, product_ids)
+
+
+def run(label, api, func, *args):
+    before = api.request_count
+    bytes_before = api.bytes_sent
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        enriched = func(*args)
+    elapsed = time.perf_counter() - start
+    matches = sum(1 for t in enriched if t['API_Match'])
+    print(f"{label:<20} | requests: {api.request_count - before:>5} | "
+          f"received: {(api.bytes_sent - bytes_before) / 1024:8.1f} KiB | matched: {matches:>8,} | {elapsed:7.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--catalog', type=int, default=20_000, help="products served by the mock API")
+    parser.add_argument('--active', type=int, default=300, help="distinct products in the sales data")
+    parser.add_argument('--delay', type=float, default=0.02)
+    args = parser.parse_args()
+
+    transactions = make_transactions(args.rows, n_products=args.active)
+
+    with tempfile.TemporaryDirectory() as tmp, MockProductAPI(args.catalog, args.delay) as api:
+        cache_file = os.path.join(tmp, 'product_cache.pickle')
+        run("full catalog", api, catalog_enrichment, transactions, api.base_url, cache_file)
+        run("demand, cold cache", api, demand_enrichment, transactions, api.base_url, cache_file)
+        run("demand, warm cache", api, demand_enrichment, transactions, api.base_url, cache_file)
+
+
+if __name__ == "__main__":
+    main()
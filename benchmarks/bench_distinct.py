@@ -0,0 +1,85 @@
+"""
+Memory and accuracy of exact sets vs HyperLogLog sketches for unique
+customers per day and distinct products per customer.
+
+For every mode, aggregate_transactions runs once under tracemalloc (all
+retained accumulators) and the distinct-value containers are sized on their
+own. The sketched counts are then compared with the exact ones, and a merge
+of two half-file partials is compared with the single-pass result.
+
+Usage: python benchmarks/bench_distinct.py [rows] [customers] [days]
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from benchmarks.synthetic import make_transactions
+from utils.data_processor import aggregate_transactions, merge_aggregates, _daily_view
+from utils.sketches import HyperLogLog
+
+ERRORS = [None, 0.05, 0.01, 0.005]
+
+
+def distinct_counts(stats):
+    daily = {date: data['unique_customers'] for date, data in _daily_view(stats).items()}
+    per_customer = {cust_id: len(data['products_bought']) for cust_id, data in stats['customers'].items()}
+    return daily, per_customer
+
+
+def container_bytes(stats):
+    """
+    Bytes held by the sets / sketches themselves (members are shared strings).
+    """
+    containers = [data['unique_customers_set'] for data in stats['daily'].values()]
+    containers += [data['products_bought'] for data in stats['customers'].values()]
+    return sum(
+        sys.getsizeof(c) + sys.getsizeof(c.registers) if isinstance(c, HyperLogLog) else sys.getsizeof(c)
+        for c in containers
+    )
+
+
+def relative_errors(exact, approx):
+    errors = [abs(approx[key] - value) / value for key, value in exact.items() if value]
+    return max(errors), sum(errors) / len(errors)
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    customers = int(sys.argv[2]) if len(sys.argv) > 2 else 100_000
+    days = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+    transactions = make_transactions(rows, n_customers=customers, n_days=days)
+    half = len(transactions) // 2
+    print(f"Input: {rows:,} rows, {customers:,} customers, {days} days")
+
+    exact = None
+    for error in ERRORS:
+        tracemalloc.start()
+        start = time.perf_counter()
+        stats = aggregate_transactions(transactions, distinct_error=error)
+        elapsed = time.perf_counter() - start
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        daily, per_customer = distinct_counts(stats)
+        label = "exact sets" if error is None else f"HLL {error:.1%}"
+        memory = f"retained {size / 2**20:7.1f} MiB | distinct containers {container_bytes(stats) / 2**20:6.1f} MiB"
+        if exact is None:
+            exact = (daily, per_customer)
+            print(f"{label:<11} | {elapsed:6.2f}s | {memory}")
+            continue
+
+        day_max, day_mean = relative_errors(exact[0], daily)
+        cust_max, _ = relative_errors(exact[1], per_customer)
+        merged = aggregate_transactions(transactions[:half], distinct_error=error)
+        merge_aggregates(merged, aggregate_transactions(transactions[half:], distinct_error=error))
+        same = distinct_counts(merged) == (daily, per_customer)
+        print(f"{label:<11} | {elapsed:6.2f}s | {memory} | "
+              f"daily error max {day_max:.2%} mean {day_mean:.2%} | "
+              f"per-customer max {cust_max:.2%} | merged == single pass: {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark: per-row copy enrichment + a separate API_Match scan (previous
+enrich_sales_data) vs the hash-join enrichment that attaches shared
+API_* columns in place and counts matches as it goes.
+
+Reports time and peak traced memory of enriching plus counting, and checks
+that both give the same records and match counts.
+
+Usage: python benchmarks/bench_enrichment.py [rows]
+"""
+import copy
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from benchmarks.synthetic import make_transactions
+from utils.data_processor import enrich_sales_data, summarize_enrichment, normalize_product_id
+
+
+def copying_enrichment(transactions, product_mapping):
+    # enrich_sales_data before the join: a dict copy and an ID parse per row
+    enriched = []
+    for t in transactions:
+        enriched_t = t.copy()
+        product_id = normalize_product_id(t['ProductID'])
+        if product_id and product_id in product_mapping:
+            api_data = product_mapping[product_id]
+            enriched_t['API_Category'] = api_data.get('category')
+            enriched_t['API_Brand'] = api_data.get('brand')
+            enriched_t['API_Rating'] = api_data.get('rating')
+            enriched_t['API_Match'] = True
+        else:
+            enriched_t['API_Category'] = "N/A"
+            enriched_t['API_Brand'] = "N/A"
+            enriched_t['API_Rating'] = "N/A"
+            enriched_t['API_Match'] = False
+        enriched.append(enriched_t)
+    matches = sum(1 for t in enriched if t.get('API_Match'))
+    return enriched, matches
+
+
+def join_enrichment(transactions, product_mapping):
+    summary = summarize_enrichment([])
+    enriched = enrich_sales_data(transactions, product_mapping, summary=summary)
+    return enriched, summary['matches']
+
+
+def measure(func, transactions, product_mapping):
+    start = time.perf_counter()
+    result = func(transactions, product_mapping)
+    elapsed = time.perf_counter() - start
+    del result
+    tracemalloc.start()
+    result = func(transactions, product_mapping)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    catalog = {101 + i: {'category': 'laptops', 'brand': f"Brand {i}", 'rating': 4.5}
+               for i in range(0, 100, 2)}
+    transactions = make_transactions(rows)
+    print(f"{rows:,} rows")
+
+    (old, old_matches), old_time, old_peak = measure(copying_enrichment, transactions, catalog)
+    print(f"  copy per row + scan   | {old_time:6.2f}s | peak {old_peak / 2**20:7.1f} MiB")
+    # The join enriches in place, so it gets its own rows
+    fresh = copy.deepcopy(transactions)
+    (new, new_matches), new_time, new_peak = measure(join_enrichment, fresh, catalog)
+    print(f"  hash join, in place   | {new_time:6.2f}s | peak {new_peak / 2**20:7.1f} MiB")
+    print(f"  same records: {old == new} | same matches: {old_matches == new_matches} ({new_matches:,})")
+
+
+if __name__ == "__main__":
+    main()
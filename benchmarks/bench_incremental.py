@@ -0,0 +1,70 @@
+"""
+Compares ten incremental runs over an append-only sales file with
+reprocessing the whole file on each run.
+
+Usage: python benchmarks/bench_incremental.py [base_rows] [rows_per_append]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from benchmarks.synthetic import HEADER, iter_sales_lines
+from utils.file_handler import iter_sales_data
+from utils.data_processor import iter_parse_transactions, iter_validate_and_filter, aggregate_transactions
+from utils.incremental import process_incremental, save_state
+
+
+def full_run(path):
+    return aggregate_transactions(iter_validate_and_filter(iter_parse_transactions(iter_sales_data(path))))
+
+
+def incremental_run(path, state_file):
+    state, new_rows, _ = process_incremental(path, state_file=state_file)
+    save_state(state, state_file)
+    return state['stats']
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    base_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    per_append = int(sys.argv[2]) if len(sys.argv) > 2 else 5_000
+    runs = 10
+
+    lines = iter_sales_lines(base_rows + runs * per_append)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'sales_data.txt')
+        state_file = os.path.join(tmp, 'state.pickle')
+
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(HEADER + "\n")
+            for _ in range(base_rows):
+                file.write(next(lines) + "\n")
+        _, initial = timed(incremental_run, path, state_file)
+        print(f"initial run over {base_rows:,} rows: {initial:.2f}s")
+
+        total_incremental = 0.0
+        total_full = 0.0
+        for run in range(1, runs + 1):
+            with open(path, 'a', encoding='utf-8') as file:
+                for _ in range(per_append):
+                    file.write(next(lines) + "\n")
+            inc_stats, inc_time = timed(incremental_run, path, state_file)
+            full_stats, full_time = timed(full_run, path)
+            total_incremental += inc_time
+            total_full += full_time
+            print(f"run {run:>2}: +{per_append:,} rows | incremental {inc_time:6.3f}s | "
+                  f"full {full_time:6.2f}s | same totals: {inc_stats['transaction_count'] == full_stats['transaction_count']}")
+
+        print(f"10 runs: incremental {total_incremental:.2f}s vs full reprocessing {total_full:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Compares peak RSS and throughput of the current reader (iter_sales_data ->
+iter_parse_transactions) with the memory-mapped reader
+(iter_mapped_transactions), both streaming into aggregate_transactions and
+both loading every row into a list. Each run happens in a fresh process
+that reports its own peak RSS (ru_maxrss). Mapped pages are file-backed and count
+toward RSS while they are resident, but the kernel can drop them at any time,
+so the streaming run keeps working on files larger than RAM.
+
+To reproduce the out-of-core case, pass a row count whose file is bigger
+than half of the machine's RAM (about 57 bytes per row).
+
+First, files that are not valid UTF-8 past the encoding detection sample
+are read both ways (serially, and through the mapped parallel path) to
+check that both fall back to the same encoding and return the same rows.
+
+Usage: python benchmarks/bench_mmap_reader.py [rows]
+"""
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from benchmarks.synthetic import write_sales_file
+from utils.file_handler import iter_sales_data, read_sales_data, DETECT_SAMPLE_SIZE
+from utils.data_processor import iter_parse_transactions, aggregate_transactions, parse_transactions, validate_and_filter
+from utils.mmap_reader import MappedSalesFile, iter_mapped_transactions
+from utils.parallel import process_file_parallel, process_range
+
+HEADER = b"TransactionID|Date|ProductID|ProductName|Quantity|UnitPrice|CustomerID|Region\n"
+
+# A latin-1 byte (0xE9) after the detection sample, in a place the mapped
+# parser never decodes: the whole file must then be read as latin-1
+FALLBACK_CASES = {
+    'skipped line': b"X0000002|2024-12-01|P102|Mug\xe9|2|500|C00002|North\n",
+    'quantity': b"T0000002|2024-12-01|P102|Mug|2\xe9|500|C00002|North\n",
+    'product name': b"T0000002|2024-12-01|P102|Mug\xe9|2|500|C00002|North\n",
+}
+
+
+def text_rows(path):
+    return iter_parse_transactions(iter_sales_data(path))
+
+
+def check_fallback(tmp):
+    """
+    Prints whether the serial and the mapped readers agree on files whose
+    first row is UTF-8 ("Café") and which turn out to be latin-1 later on.
+    """
+    filler_rows = DETECT_SAMPLE_SIZE // 40 + 1
+    padding = b''.join(b"T%07d|2024-12-02|P103|Pad|1|100|C00003|South\n" % (i + 3)
+                       for i in range(filler_rows))
+    first = "T0000001|2024-12-01|P101|Café Mug|2|500|C00001|North\n".encode('utf-8')
+    path = os.path.join(tmp, 'latin1_sales.txt')
+    for name, line in FALLBACK_CASES.items():
+        with open(path, 'wb') as file:
+            file.write(HEADER + first + padding + line)
+        serial = validate_and_filter(parse_transactions(read_sales_data(path)))[0]
+        single = process_range(path, 0, os.path.getsize(path), None)[2]
+        pooled = process_file_parallel(path, workers=2)[2]
+        same = serial == single == pooled
+        print(f"non-UTF-8 byte in {name:<12} | {'same rows' if same else 'MISMATCH'} "
+              f"| first product read as {serial[0]['ProductName']!r}")
+
+
+def run_mode(reader, mode, path):
+    start = time.perf_counter()
+    if reader == 'text':
+        rows = text_rows(path)
+        result = aggregate_transactions(rows) if mode == 'stream' else list(rows)
+    else:
+        with MappedSalesFile(path) as mapped:
+            rows = iter_mapped_transactions(mapped)
+            result = aggregate_transactions(rows) if mode == 'stream' else list(rows)
+    count = result['transaction_count'] if mode == 'stream' else len(result)
+    return count, time.perf_counter() - start, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def run_in_subprocess(reader, mode, path):
+    output = subprocess.check_output(
+        [sys.executable, os.path.abspath(__file__), '--run', reader, mode, path], cwd=ROOT, text=True
+    )
+    count, elapsed, peak_kib = output.split()
+    return int(count), float(elapsed), int(peak_kib)
+
+
+def main():
+    if len(sys.argv) == 5 and sys.argv[1] == '--run':
+        print(*run_mode(*sys.argv[2:]))
+        return
+
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    with tempfile.TemporaryDirectory() as tmp:
+        check_fallback(tmp)
+
+        path = os.path.join(tmp, 'sales_data.txt')
+        write_sales_file(path, rows)
+        print(f"Input: {rows:,} rows, {os.path.getsize(path) / 2**20:.1f} MiB")
+
+        for mode in ('stream', 'load'):
+            for reader in ('text', 'mmap'):
+                count, elapsed, peak_kib = run_in_subprocess(reader, mode, path)
+                print(f"{mode:<6} | {reader:<4} | rows: {count:<9} | {elapsed:6.2f}s | "
+                      f"{count / elapsed:>9,.0f} rows/s | peak RSS: {peak_kib / 1024:8.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
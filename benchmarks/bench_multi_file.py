@@ -0,0 +1,146 @@
+"""
+Benchmark: ingesting a directory of per-store sales files, some gzipped,
+with skewed sizes (a few big stores, many small ones).
+
+Compares:
+  - one file at a time in this process,
+  - a process pool taking whole files in file order (a big file that comes
+    last finishes last, with the other workers idle),
+  - process_files_parallel: largest work items first, big plain files split
+    into byte ranges, results merged in file order.
+
+Checks that all three give the same rows and filter summary, and the same
+aggregates within a cent. Every other store writes its prices in cents, and
+per-range float sums merged in a different grouping can differ in the last
+bits (see bench_parallel.py).
+Wall times only show the scheduling effect with several CPUs, so the
+makespan of both pool schedules is also simulated from the measured time
+of every work item, for 2 to 16 workers.
+
+Usage: python benchmarks/bench_multi_file.py [--rows N] [--files N] [--workers N]
+"""
+import argparse
+import gzip
+import heapq
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from benchmarks.bench_parallel import close
+from benchmarks.synthetic import write_sales_file
+from utils.file_handler import expand_sales_paths
+from utils.parallel import plan_file_tasks, process_files_parallel, _process_file_task
+from utils.data_processor import aggregate_transactions, merge_aggregates, merge_filter_summaries
+
+# Split size used for the largest-first run; small enough to split the biggest stores
+SPLIT_BYTES = 4 * 1024 * 1024
+
+
+def write_store_files(directory, rows, files):
+    """
+    Splits rows over files with sizes proportional to 1, 1/2, 1/3, ... and
+    gzips every other file. The biggest store goes last in name order.
+    Every other store, starting with the biggest, has its prices in cents.
+    """
+    weights = [1 / (i + 1) for i in range(files)]
+    total = sum(weights)
+    for i, weight in enumerate(weights):
+        name = os.path.join(directory, f"store_{files - i:04d}.txt")
+        write_sales_file(name, max(1, int(rows * weight / total)), seed=i, decimal_prices=i % 2 == 0)
+        if i % 2:
+            with open(name, 'rb') as source, gzip.open(name + '.gz', 'wb', compresslevel=1) as target:
+                shutil.copyfileobj(source, target)
+            os.remove(name)
+
+
+def merged(results):
+    stats = aggregate_transactions([])
+    summary = {}
+    rows = []
+    for part_stats, part_summary, part_rows in results:
+        merge_aggregates(stats, part_stats)
+        merge_filter_summaries(summary, part_summary)
+        rows.extend(part_rows)
+    return stats, summary, rows
+
+
+def one_at_a_time(paths, workers):
+    tasks = plan_file_tasks(paths, split_bytes=float('inf'))
+    return merged(_process_file_task(task) for _, task in tasks)
+
+
+def whole_files_in_order(paths, workers):
+    tasks = plan_file_tasks(paths, split_bytes=float('inf'))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return merged(pool.map(_process_file_task, [task for _, task in tasks]))
+
+
+def largest_first(paths, workers):
+    return process_files_parallel(paths, workers, split_bytes=SPLIT_BYTES)
+
+
+def item_times(tasks):
+    times = []
+    for _, task in tasks:
+        start = time.perf_counter()
+        _process_file_task(task)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def makespan(times, workers):
+    # Each item goes to the worker that frees up first, as in a process pool
+    free_at = [0.0] * workers
+    for duration in times:
+        heapq.heappush(free_at, heapq.heappop(free_at) + duration)
+    return max(free_at)
+
+
+def simulate(paths):
+    whole = plan_file_tasks(paths, split_bytes=float('inf'))
+    in_order = item_times(whole)
+    split = plan_file_tasks(paths, split_bytes=SPLIT_BYTES)
+    split_times = item_times(split)
+    by_size = [split_times[i] for i in sorted(range(len(split)), key=lambda i: split[i][0], reverse=True)]
+    print(f"  simulated makespan from measured item times (longest item {max(in_order):.2f}s):")
+    for workers in (2, 4, 8, 16):
+        print(f"    {workers:2d} workers | whole files, order {makespan(in_order, workers):6.2f}s | "
+              f"largest first {makespan(by_size, workers):6.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--files', type=int, default=200)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        write_store_files(directory, args.rows, args.files)
+        paths = expand_sales_paths([directory])
+        print(f"{args.rows:,} rows in {len(paths)} files ({sum(p.endswith('.gz') for p in paths)} gzipped), "
+              f"{args.workers} workers")
+
+        results = {}
+        for label, func in (("one file at a time       ", one_at_a_time),
+                            ("pool, whole files, order ", whole_files_in_order),
+                            ("pool, largest first      ", largest_first)):
+            start = time.perf_counter()
+            results[label] = func(paths, args.workers)
+            elapsed = time.perf_counter() - start
+            print(f"  {label} {elapsed:7.2f}s | {args.rows / elapsed:10,.0f} rows/s")
+
+        (first_stats, first_summary, first_rows), *others = results.values()
+        same = all(rows == first_rows and summary == first_summary for _, summary, rows in others)
+        print(f"  same rows and summary: {same} | "
+              f"aggregates within a cent: {all(close(stats, first_stats) for stats, _, _ in others)}")
+        simulate(paths)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Scaling benchmark for process_file_parallel with 1, 2, 4 and 8 workers.
+Checks that every run merges to the same report metrics as the 1-worker run.
+
+Those rows have whole-number prices, so every sum is exact in floating
+point. A second file with prices in cents checks the parallel runs against
+a serial run. There, each chunk sums its floats before the chunks are
+merged, so sums can differ in the last bits. A value the views round to
+cents (average order value, percentages) can then land one cent apart
+when the exact value is on a half cent. Both runs must agree within
+CENT, the precision the report prints.
+
+Usage: python benchmarks/bench_parallel.py [rows]   (default: 2,000,000)
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from benchmarks.synthetic import write_sales_file
+from utils.parallel import process_file_parallel
+from utils.file_handler import read_sales_data
+from utils.data_processor import (
+    _region_view, _top_products_view, _customer_view, _daily_view,
+    aggregate_transactions, parse_transactions, validate_and_filter
+)
+
+DECIMAL_ROWS = 200_000
+CENT = 0.01
+
+
+def report_metrics(stats):
+    # products_bought comes from a set, so its order is not part of the result
+    customers = {
+        cust_id: dict(data, products_bought=sorted(data['products_bought']))
+        for cust_id, data in _customer_view(stats).items()
+    }
+    return (_region_view(stats), _top_products_view(stats, 5),
+            list(customers.items()), _daily_view(stats))
+
+
+def close(a, b):
+    # Same structure and values, floats at most a cent apart
+    if isinstance(a, float) and isinstance(b, float):
+        return round(abs(a - b), 6) <= CENT
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(close(a[key], b[key]) for key in a)
+    if isinstance(a, (list, tuple)) and isinstance(b, (list, tuple)):
+        return len(a) == len(b) and all(close(x, y) for x, y in zip(a, b))
+    return a == b
+
+
+def check_decimal_prices(tmp, rows):
+    """
+    Compares the report metrics of parallel runs over a file with prices in
+    cents against a serial run over the same file.
+    """
+    path = os.path.join(tmp, 'sales_cents.txt')
+    write_sales_file(path, rows, decimal_prices=True, dirty_rate=0.001)
+    serial = report_metrics(aggregate_transactions(
+        validate_and_filter(parse_transactions(read_sales_data(path)))[0]))
+    for workers in (1, 2, 4):
+        metrics = report_metrics(process_file_parallel(path, workers, keep_rows=False)[0])
+        print(f"prices in cents, {rows:,} rows | workers: {workers} | bit-identical to serial: "
+              f"{metrics == serial} | within a cent: {close(metrics, serial)}")
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    print(f"CPU cores: {os.cpu_count()}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'sales_data.txt')
+        write_sales_file(path, rows)
+        print(f"Input: {rows:,} rows, {os.path.getsize(path) / 2**20:.1f} MiB")
+
+        baseline = None
+        base_time = None
+        for workers in (1, 2, 4, 8):
+            start = time.perf_counter()
+            stats, summary, _ = process_file_parallel(path, workers, keep_rows=False)
+            elapsed = time.perf_counter() - start
+
+            metrics = report_metrics(stats)
+            if baseline is None:
+                baseline, base_time = metrics, elapsed
+            print(f"workers: {workers} | {elapsed:7.2f}s | speedup: {base_time / elapsed:4.2f}x | "
+                  f"rows: {summary['final_count']:,} | matches 1-worker: {metrics == baseline}")
+
+        check_decimal_prices(tmp, min(rows, DECIMAL_ROWS))
+
+
+if __name__ == "__main__":
+    main()
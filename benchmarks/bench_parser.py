@@ -0,0 +1,143 @@
+"""
+Benchmark: rows/sec of the sales file reader + parser (read_sales_data ->
+parse_transactions) against the bulk-parsing designs tried for it, on a
+clean file and on files with a share of dirty rows. Each candidate must
+return exactly the rows parse_transactions returns, and each timing runs in
+a fresh process so no candidate pays for memory another one touched.
+
+Candidates:
+  bulk      whole file read as bytes and decoded once, then the usual parser
+  fastpath  one loop that skips the comma cleaning for comma-free rows
+  columns   rows split per block of 512 and converted a column at a time
+            with map(int)/map(float); blocks with a dirty row fall back
+
+None of them has been a measurable win (see README, "Parsing"), so the
+line reader stays the only parser; this script is kept to re-check that.
+
+Usage: python benchmarks/bench_parser.py [rows]
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from benchmarks.synthetic import write_sales_file
+from utils.file_handler import read_sales_data, detect_encoding
+from utils.data_processor import parse_transactions, iter_parse_transactions
+
+DIRTY_RATES = [0.0, 0.001, 0.05]
+BLOCK_ROWS = 512
+
+
+def line_parser(path):
+    return parse_transactions(read_sales_data(path))
+
+
+def bulk_parser(path):
+    with open(path, 'rb') as file:
+        text = file.read().decode(detect_encoding(path))
+    lines = [line.strip() for line in text.splitlines()[1:]]
+    return parse_transactions([line for line in lines if line])
+
+
+def fastpath_parser(path):
+    transactions = []
+    append = transactions.append
+    for line in read_sales_data(path):
+        if ',' in line:
+            transactions.extend(iter_parse_transactions((line,)))
+            continue
+        parts = line.split('|')
+        if len(parts) != 8:
+            continue
+        trans_id, date, prod_id, prod_name, qty_str, price_str, cust_id, region = parts
+        if not trans_id.startswith('T') or not cust_id or not region:
+            continue
+        try:
+            quantity = int(qty_str)
+            unit_price = float(price_str)
+        except ValueError:
+            continue
+        if quantity <= 0 or unit_price <= 0:
+            continue
+        append({'TransactionID': trans_id, 'Date': date, 'ProductID': prod_id, 'ProductName': prod_name,
+                'Quantity': quantity, 'UnitPrice': unit_price, 'CustomerID': cust_id, 'Region': region})
+    return transactions
+
+
+def columns_parser(path):
+    lines = read_sales_data(path)
+    transactions = []
+    for start in range(0, len(lines), BLOCK_ROWS):
+        block = lines[start:start + BLOCK_ROWS]
+        try:
+            trans_ids, dates, prod_ids, names, qtys, prices, cust_ids, regions = zip(
+                *[line.split('|') for line in block])
+            quantities = list(map(int, qtys))
+            unit_prices = list(map(float, prices))
+            clean = (min(quantities) > 0 and min(unit_prices) > 0 and all(cust_ids) and all(regions)
+                     and all(trans_id.startswith('T') for trans_id in trans_ids)
+                     and ',' not in ''.join(names))
+        except ValueError:
+            clean = False
+        if not clean:
+            transactions.extend(iter_parse_transactions(block))
+            continue
+        transactions.extend([
+            {'TransactionID': t, 'Date': d, 'ProductID': p, 'ProductName': n,
+             'Quantity': q, 'UnitPrice': u, 'CustomerID': c, 'Region': r}
+            for t, d, p, n, q, u, c, r in zip(trans_ids, dates, prod_ids, names, quantities,
+                                              unit_prices, cust_ids, regions)
+        ])
+    return transactions
+
+
+PARSERS = {'line': line_parser, 'bulk': bulk_parser, 'fastpath': fastpath_parser, 'columns': columns_parser}
+
+
+def time_parser(name, path):
+    start = time.perf_counter()
+    rows = PARSERS[name](path)
+    return len(rows), time.perf_counter() - start
+
+
+def run_in_subprocess(name, path):
+    output = subprocess.check_output(
+        [sys.executable, os.path.abspath(__file__), '--time', name, path], cwd=ROOT, text=True
+    )
+    rows, elapsed = output.split()
+    return int(rows), float(elapsed)
+
+
+def main():
+    if len(sys.argv) == 4 and sys.argv[1] == '--time':
+        rows, elapsed = time_parser(sys.argv[2], sys.argv[3])
+        print(rows, elapsed)
+        return
+
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    with tempfile.TemporaryDirectory() as tmp:
+        for dirty_rate in DIRTY_RATES:
+            path = os.path.join(tmp, f'sales_{dirty_rate}.txt')
+            write_sales_file(path, rows, dirty_rate=dirty_rate)
+            expected = line_parser(path)
+            mismatched = [name for name, parser in PARSERS.items() if parser(path) != expected]
+            if mismatched:
+                print(f"dirty {dirty_rate:.1%}: MISMATCH in {', '.join(mismatched)}")
+                continue
+            del expected
+
+            results = {name: run_in_subprocess(name, path) for name in PARSERS}
+            line_rate = results['line'][0] / results['line'][1]
+            for name, (parsed, elapsed) in results.items():
+                rate = parsed / elapsed
+                print(f"dirty {dirty_rate:>5.1%} | {name:<8} | rows: {parsed:<9} | {elapsed:6.2f}s | "
+                      f"{rate:>11,.0f} rows/s | x{rate / line_rate:.2f}")
+
+
+if __name__ == "__main__":
+    main()
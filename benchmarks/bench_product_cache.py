@@ -0,0 +1,63 @@
+"""
+Exercises the product catalog cache offline against the local mock API:
+miss -> hit -> stale (background refresh) -> stale with the API down, and
+a catalog lookup after demand lookups left only a partial mapping cached.
+
+Usage: python benchmarks/bench_product_cache.py [--delay SECONDS]
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from benchmarks.mock_product_api import MockProductAPI
+from utils import product_cache
+
+
+def timed_lookup(label, api, **kwargs):
+    before = api.request_count
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        mapping, status = product_cache.get_product_mapping(**kwargs)
+        elapsed = time.perf_counter() - start
+        # let a background revalidation finish before counting its requests
+        product_cache.wait_for_refresh()
+    print(f"{label:<22} | status: {status:<5} | products: {len(mapping):<4} | "
+          f"API requests: {api.request_count - before} | {elapsed * 1000:8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--delay', type=float, default=0.5, help="simulated API latency in seconds")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_file = os.path.join(tmp, 'product_cache.pickle')
+        api = MockProductAPI(products=100, delay=args.delay).start()
+        options = {'cache_file': cache_file, 'base_url': api.base_url}
+
+        timed_lookup("cold run", api, **options)
+        timed_lookup("repeat run", api, **options)
+        timed_lookup("expired (refresh)", api, ttl=0, **options)
+
+        # A partial mapping from demand lookups must not pass for the catalog
+        demand_file = os.path.join(tmp, 'demand_cache.pickle')
+        with contextlib.redirect_stdout(io.StringIO()):
+            product_cache.get_product_mapping_for_ids([1, 2, 3], demand_file, base_url=api.base_url)
+        timed_lookup("after demand lookups", api, cache_file=demand_file, base_url=api.base_url)
+        timed_lookup("other API URL", api, cache_file=demand_file, base_url=api.base_url + "/")
+
+        api.stop()
+        timed_lookup("expired, API down", api, ttl=0, **options)
+        timed_lookup("fresh, API down", api, **options)
+
+    print(f"cache stats: {product_cache.cache_stats}")
+
+
+if __name__ == "__main__":
+    main()
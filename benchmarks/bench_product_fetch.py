@@ -0,0 +1,54 @@
+"""
+Benchmarks catalog fetching against the local mock API serving 50k products:
+the old single request, sequential paging, and concurrent paging over a
+pooled session.
+
+Usage: python benchmarks/bench_product_fetch.py [--products N] [--delay SECONDS]
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from benchmarks.mock_product_api import MockProductAPI
+from utils.api_handler import fetch_all_products
+
+
+def single_request(base_url):
+    """The previous behaviour: one unpooled request for the first 100 products."""
+    response = requests.get(f"{base_url}/products?limit=100", timeout=10)
+    response.raise_for_status()
+    return response.json().get('products', [])
+
+
+def run(label, api, func):
+    before = api.request_count
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        products = func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} | products: {len(products):>6} | requests: {api.request_count - before:>4} | {elapsed:7.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--products', type=int, default=50_000)
+    parser.add_argument('--delay', type=float, default=0.02, help="simulated per-request latency")
+    args = parser.parse_args()
+
+    with MockProductAPI(products=args.products, delay=args.delay) as api:
+        url = api.base_url
+        run("single request (old)", api, lambda: single_request(url))
+        run("paged, 1 worker", api, lambda: fetch_all_products(url, max_workers=1))
+        run("paged, 8 workers", api, lambda: fetch_all_products(url, max_workers=8))
+        run("paged, 16 workers, 500/page", api, lambda: fetch_all_products(url, page_size=500, max_workers=16))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Benchmark: answering date-window questions by rescanning the transactions
+vs adding up buckets of the rollup cube.
+
+Workloads over a year of data:
+  - revenue per ISO week and per month (one rollup each),
+  - 50 random date ranges, each for one region,
+  - full report stats (aggregate_transactions vs cube_stats) for 12 monthly windows.
+
+Checks that both give the same numbers. The scans get the rows in memory
+for free; a real run would read and parse the file first, which the cube
+(loaded from its pickle, timed below) does not need. Every workload is
+timed with the garbage collector paused, so neither side pays for full
+collections over the other's objects.
+
+Usage: python benchmarks/bench_rollup.py [rows]
+"""
+import datetime
+import gc
+import os
+import pickle
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from benchmarks.synthetic import make_transactions, REGIONS
+from utils.data_processor import aggregate_transactions
+from utils.rollup import build_cube, cube_rollup, cube_totals, cube_stats
+
+
+def scan_rollup(transactions, by):
+    buckets = {}
+    for t in transactions:
+        day = datetime.date.fromisoformat(t['Date'])
+        if by == 'week':
+            year, week, _ = day.isocalendar()
+            key = f"{year}-W{week:02d}"
+        else:
+            key = f"{day.year}-{day.month:02d}"
+        buckets[key] = buckets.get(key, 0.0) + t['Quantity'] * t['UnitPrice']
+    return dict(sorted(buckets.items()))
+
+
+def scan_totals(transactions, start, end, region):
+    revenue = 0.0
+    for t in transactions:
+        if start <= t['Date'] <= end and t['Region'] == region:
+            revenue += t['Quantity'] * t['UnitPrice']
+    return revenue
+
+
+def month_windows():
+    first = datetime.date(2024, 12, 1)
+    windows = []
+    for i in range(12):
+        start = datetime.date(first.year + (first.month + i - 1) // 12, (first.month + i - 1) % 12 + 1, 1)
+        end = datetime.date(start.year + start.month // 12, start.month % 12 + 1, 1) - datetime.timedelta(days=1)
+        windows.append((start.isoformat(), end.isoformat()))
+    return windows
+
+
+def timed(func):
+    gc.collect()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        result = func()
+        return result, time.perf_counter() - start
+    finally:
+        gc.enable()
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    transactions = make_transactions(rows, n_days=365, n_customers=20_000)
+    rng = random.Random(7)
+    days = sorted({t['Date'] for t in transactions})
+    ranges = []
+    for _ in range(50):
+        a, b = sorted(rng.sample(days, 2))
+        ranges.append((a, b, rng.choice(REGIONS)))
+    print(f"{rows:,} rows over {len(days)} days")
+
+    cube, build_time = timed(lambda: build_cube(transactions))
+    blob = pickle.dumps(cube, protocol=pickle.HIGHEST_PROTOCOL)
+    _, load_time = timed(lambda: pickle.loads(blob))
+    print(f"  cube build {build_time:.2f}s (once, then kept up to date) | "
+          f"pickle {len(blob) / 2**20:.1f} MiB, loads in {load_time:.2f}s")
+
+    for by in ('week', 'month'):
+        scanned, scan_time = timed(lambda: scan_rollup(transactions, by))
+        rolled, cube_time = timed(lambda: cube_rollup(cube, by))
+        same = all(abs(scanned[key] - rolled[key]['revenue']) < 1e-6 * max(1.0, scanned[key]) for key in scanned)
+        print(f"  revenue per {by:<5} | scan {scan_time:7.3f}s | cube {cube_time:7.4f}s | same: {same}")
+
+    scanned, scan_time = timed(lambda: [scan_totals(transactions, a, b, r) for a, b, r in ranges])
+    totals, cube_time = timed(lambda: [cube_totals(cube, a, b, region=r)['revenue'] for a, b, r in ranges])
+    same = all(abs(x - y) < 1e-6 * max(1.0, x) for x, y in zip(scanned, totals))
+    print(f"  50 region ranges   | scan {scan_time:7.3f}s | cube {cube_time:7.4f}s | same: {same}")
+
+    windows = month_windows()
+
+    def scan_reports():
+        return [aggregate_transactions([t for t in transactions if a <= t['Date'] <= b]) for a, b in windows]
+
+    scanned, scan_time = timed(scan_reports)
+    built, cube_time = timed(lambda: [cube_stats(cube, a, b) for a, b in windows])
+    same = all(x['total_revenue'] == y['total_revenue'] and x['products'] == y['products']
+               and x['regions'] == y['regions'] for x, y in zip(scanned, built))
+    print(f"  12 monthly reports | scan {scan_time:7.3f}s | cube {cube_time:7.4f}s | same: {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""
+Benchmark: query latency of the warm analytics service (main.py --serve)
+under concurrent clients, against answering each question with a new
+main.py process.
+
+A seeded synthetic file is served against the local mock product API.
+Clients keep one HTTP/1.1 connection each and send a mix of metric
+queries over a fixed set of filters (the first query for a filter
+aggregates its rows, later ones are answered from the cached aggregate).
+p50/p99 latency and throughput are reported for 1, 4 and 16 clients. Then
+rows are appended to the file while clients keep querying, and the time
+until the appended rows show up in /health is measured. Last, a service in
+--enrich-mode demand gets a row with a product the file did not reference,
+which must be fetched and enriched on the next refresh.
+
+Clients run as threads in this process and share its CPU with the service,
+so on a machine with few cores the numbers are an upper bound.
+
+Usage: python benchmarks/bench_service.py [--rows N] [--queries N] [--clients 1 4 16]
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from benchmarks.mock_product_api import MockProductAPI
+from benchmarks.synthetic import iter_sales_lines, write_sales_file, REGIONS
+
+ENDPOINTS = ['/summary', '/regions', '/top-products?n=5', '/customers?n=10', '/daily',
+             '/peak-day', '/low-performers?threshold=10&n=5']
+
+
+def make_queries(count, seed):
+    """
+    Returns: list of request paths mixing every endpoint with 12 filter combinations.
+    """
+    filters = ['']
+    for region in REGIONS[:3]:
+        filters.append(f"region={region}")
+    for low, high in ((1000, 100000), (50000, 400000), (200000, None), (None, 20000)):
+        parts = [f"min={low}"] if low is not None else []
+        parts += [f"max={high}"] if high is not None else []
+        filters.append('&'.join(parts))
+    for region, low in (('North', 10000), ('West', 100000), ('East', 300000), ('South', 5000)):
+        filters.append(f"region={region}&min={low}")
+
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(count):
+        endpoint = rng.choice(ENDPOINTS)
+        query = rng.choice(filters)
+        separator = '&' if '?' in endpoint else '?'
+        queries.append(endpoint + (separator + query if query else ''))
+    return queries
+
+
+def start_service(workdir, base_url, enrich_mode='catalog'):
+    """
+    Starts main.py --serve on a free port in workdir.
+    Returns: tuple (process, host, port, seconds until it was serving)
+    """
+    command = [sys.executable, os.path.join(ROOT, 'main.py'), '--serve', '--port', '0',
+               '--watch-interval', '0.2', '--no-cache', '--api-url', base_url, '--profile', '',
+               '--enrich-mode', enrich_mode]
+    start = time.perf_counter()
+    process = subprocess.Popen(command, cwd=workdir, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    for line in process.stdout:
+        if 'Serving on http://' in line:
+            host, port = line.split('http://')[1].split()[0].split(':')
+            threading.Thread(target=process.stdout.read, daemon=True).start()
+            return process, host, int(port), time.perf_counter() - start
+    raise RuntimeError("main.py --serve exited before serving")
+
+
+def get(connection, path):
+    connection.request('GET', path)
+    response = connection.getresponse()
+    body = response.read()
+    if response.status != 200:
+        raise RuntimeError(f"{path}: HTTP {response.status} {body[:200]!r}")
+    return json.loads(body)
+
+
+def run_clients(host, port, queries, clients):
+    """
+    Sends the queries from `clients` threads, each over its own connection.
+    Returns: tuple (list of latencies in seconds, elapsed seconds)
+    """
+    latencies = []
+    lock = threading.Lock()
+
+    def client(share):
+        connection = http.client.HTTPConnection(host, port, timeout=60)
+        mine = []
+        for path in share:
+            start = time.perf_counter()
+            get(connection, path)
+            mine.append(time.perf_counter() - start)
+        connection.close()
+        with lock:
+            latencies.extend(mine)
+
+    threads = [threading.Thread(target=client, args=(queries[i::clients],)) for i in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, time.perf_counter() - start
+
+
+def percentiles(latencies):
+    cuts = statistics.quantiles(latencies, n=100)
+    return cuts[49] * 1000, cuts[98] * 1000
+
+
+def append_rows(path, count, seed):
+    lines = iter_sales_lines(count, seed=seed)
+    with open(path, 'a', encoding='utf-8') as file:
+        file.write(''.join(line + '\n' for line in lines))
+
+
+def check_demand_refresh(workdir, path, base_url):
+    """
+    Appends a row whose product (P50) the synthetic file never references to
+    a service in demand mode and waits until it is enriched from the API.
+    Returns: seconds until the row showed up as matched.
+    Raises RuntimeError if it is not applied within 10 seconds.
+    """
+    process, host, port, _ = start_service(workdir, base_url, enrich_mode='demand')
+    try:
+        connection = http.client.HTTPConnection(host, port, timeout=60)
+        before = get(connection, '/summary')['result']['enrichment']
+        start = time.perf_counter()
+        with open(path, 'a', encoding='utf-8') as file:
+            file.write("T9999999|2024-12-05|P50|Unseen Product|1|100|C00001|North\n")
+        while True:
+            enrichment = get(connection, '/summary')['result']['enrichment']
+            if enrichment['matches'] == before['matches'] + 1:
+                break
+            if time.perf_counter() - start > 10:
+                raise RuntimeError(f"appended row with a new product was not applied: {enrichment}")
+            time.sleep(0.05)
+        connection.close()
+        return time.perf_counter() - start
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--queries', type=int, default=2000, help="queries per client count")
+    parser.add_argument('--clients', type=int, nargs='+', default=[1, 4, 16])
+    parser.add_argument('--append', type=int, default=1000, help="rows appended during the last run")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir, MockProductAPI(200) as api:
+        os.makedirs(os.path.join(workdir, 'data'))
+        path = os.path.join(workdir, 'data', 'sales_data.txt')
+        write_sales_file(path, args.rows, seed=args.seed)
+
+        start = time.perf_counter()
+        subprocess.run([sys.executable, os.path.join(ROOT, 'main.py'), '--no-prompt', '--no-cache',
+                        '--api-url', api.base_url, '--profile', ''],
+                       cwd=workdir, capture_output=True, check=True)
+        one_shot = time.perf_counter() - start
+        print(f"{args.rows:,} rows | one main.py run per question: {one_shot:.2f}s each")
+
+        process, host, port, load_time = start_service(workdir, api.base_url)
+        try:
+            print(f"  service loaded and serving after {load_time:.2f}s")
+            queries = make_queries(args.queries, args.seed)
+            first = {}
+            connection = http.client.HTTPConnection(host, port, timeout=60)
+            for path_query in dict.fromkeys(queries):
+                begin = time.perf_counter()
+                get(connection, path_query)
+                first[path_query] = time.perf_counter() - begin
+            connection.close()
+            cold = sorted(first.values())
+            print(f"  first query of each of {len(first)} distinct queries: "
+                  f"median {statistics.median(cold) * 1000:.1f} ms, max {cold[-1] * 1000:.1f} ms")
+
+            for clients in args.clients:
+                latencies, elapsed = run_clients(host, port, queries, clients)
+                p50, p99 = percentiles(latencies)
+                print(f"  {clients:3d} clients | p50 {p50:7.2f} ms | p99 {p99:7.2f} ms | "
+                      f"{len(latencies) / elapsed:8.0f} queries/s")
+
+            connection = http.client.HTTPConnection(host, port, timeout=60)
+            rows_before = get(connection, '/health')['rows']
+            clients = max(args.clients)
+            result = {}
+            load = threading.Thread(target=lambda: result.update(zip(
+                ('latencies', 'elapsed'), run_clients(host, port, queries, clients))))
+            load.start()
+            appended = time.perf_counter()
+            append_rows(path, args.append, args.seed + 1)
+            while get(connection, '/health')['rows'] < rows_before + args.append:
+                time.sleep(0.01)
+            visible = time.perf_counter() - appended
+            load.join()
+            connection.close()
+            p50, p99 = percentiles(result['latencies'])
+            print(f"  {clients:3d} clients while {args.append} rows are appended | p50 {p50:7.2f} ms | "
+                  f"p99 {p99:7.2f} ms | rows visible after {visible:.2f}s (polling every 0.2s)")
+        finally:
+            process.terminate()
+            process.wait()
+
+        applied = check_demand_refresh(workdir, path, api.base_url)
+        print(f"  demand mode: row with a new product fetched and enriched after {applied:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark and round-trip check: text files vs binary snapshots.
+
+Parsed rows: reading + parsing the sales text file vs load_snapshot (dicts)
+and load_snapshot_table (TransactionTable). Enriched rows:
+save_enriched_data vs save_snapshot, and load_snapshot. Checks that every
+restored row equals the original, and that writing the restored enriched
+rows with save_enriched_data gives a byte-identical text file.
+
+Usage: python benchmarks/bench_snapshot.py [rows]
+"""
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from benchmarks.synthetic import write_sales_file
+from utils.file_handler import read_sales_data, save_enriched_data
+from utils.data_processor import parse_transactions, enrich_sales_data
+from utils.snapshot import save_snapshot, load_snapshot, load_snapshot_table
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def mib(path):
+    return os.path.getsize(path) / 2**20
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    with tempfile.TemporaryDirectory() as tmp:
+        sales_path = os.path.join(tmp, 'sales.txt')
+        write_sales_file(sales_path, rows)
+        print(f"{rows:,} rows")
+
+        raw, read_time = timed(read_sales_data, sales_path)
+        parsed, parse_time = timed(parse_transactions, raw)
+        del raw
+        parsed_path = os.path.join(tmp, 'parsed.snapshot')
+        _, snap_time = timed(save_snapshot, parsed, parsed_path, source=sales_path)
+        restored, load_time = timed(load_snapshot, parsed_path)
+        table, table_time = timed(load_snapshot_table, parsed_path)
+        same = restored == parsed and [row.copy() for row in table] == parsed
+        del restored, table
+
+        print("Parsed rows:")
+        print(f"  text   {mib(sales_path):7.1f} MiB | read + parse      {read_time + parse_time:6.2f}s")
+        print(f"  binary {mib(parsed_path):7.1f} MiB | save {snap_time:6.2f}s | load dicts {load_time:6.2f}s"
+              f" | load table {table_time * 1000:7.1f} ms | same rows: {same}")
+
+        # Half the products match, with the API value types (str, float, None)
+        catalog = {101 + i: {'category': 'laptops', 'brand': f"Brand {i}", 'rating': 4.5 if i % 3 else None}
+                   for i in range(0, 100, 2)}
+        enriched = enrich_sales_data(parsed, catalog)
+        del parsed
+        text_path = os.path.join(tmp, 'enriched.txt')
+        enriched_path = os.path.join(tmp, 'enriched.snapshot')
+        _, text_time = timed(save_enriched_data, enriched, text_path)
+        _, snap_time = timed(save_snapshot, enriched, enriched_path)
+        restored, load_time = timed(load_snapshot, enriched_path)
+
+        round_trip_path = os.path.join(tmp, 'round_trip.txt')
+        timed(save_enriched_data, restored, round_trip_path)
+        with open(text_path, 'rb') as a, open(round_trip_path, 'rb') as b:
+            identical = a.read() == b.read()
+
+        print("Enriched rows:")
+        print(f"  text   {mib(text_path):7.1f} MiB | save {text_time:6.2f}s")
+        print(f"  binary {mib(enriched_path):7.1f} MiB | save {snap_time:6.2f}s | load dicts {load_time:6.2f}s"
+              f" | same rows: {restored == enriched} | text round trip identical: {identical}")
+
+
+if __name__ == "__main__":
+    main()
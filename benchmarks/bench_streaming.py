@@ -0,0 +1,60 @@
+"""
+Compares peak Python memory of the list-based pipeline with the streaming
+generator pipeline (read -> parse -> validate -> aggregate).
+
+Usage: python benchmarks/bench_streaming.py [rows]
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from benchmarks.synthetic import write_sales_file
+from utils.file_handler import read_sales_data, iter_sales_data
+from utils.data_processor import (
+    parse_transactions,
+    iter_parse_transactions,
+    iter_validate_and_filter,
+    aggregate_transactions
+)
+
+
+def list_pipeline(path):
+    raw = read_sales_data(path)
+    parsed = parse_transactions(raw)
+    summary = {}
+    valid = list(iter_validate_and_filter(parsed, summary=summary))
+    return aggregate_transactions(valid), summary
+
+
+def streaming_pipeline(path):
+    summary = {}
+    stream = iter_validate_and_filter(iter_parse_transactions(iter_sales_data(path)), summary=summary)
+    return aggregate_transactions(stream), summary
+
+
+def run(label, func, path):
+    tracemalloc.start()
+    start = time.perf_counter()
+    stats, summary = func(path)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"{label:<10} | rows: {summary['final_count']:<9} | peak: {peak / 2**20:8.1f} MiB | {elapsed:7.2f}s")
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'sales_data.txt')
+        write_sales_file(path, rows)
+        print(f"Input: {rows:,} rows, {os.path.getsize(path) / 2**20:.1f} MiB")
+        run("list", list_pipeline, path)
+        run("streaming", streaming_pipeline, path)
+
+
+if __name__ == "__main__":
+    main()
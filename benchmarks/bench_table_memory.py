@@ -0,0 +1,50 @@
+"""
+Measures the memory held by parsed transactions as a list of dicts versus
+a columnar TransactionTable.
+
+Usage: python benchmarks/bench_table_memory.py [--table-only] [rows ...]
+       (default sizes: 1,000,000 and 10,000,000 rows)
+"""
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from benchmarks.synthetic import iter_sales_lines
+from utils.data_processor import parse_transactions, iter_parse_transactions
+from utils.transaction_table import TransactionTable
+
+
+def measure(build, rows):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    data = build(iter_sales_lines(rows))
+    elapsed = time.perf_counter() - start
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del data
+    gc.collect()
+    return held, elapsed
+
+
+def main():
+    args = sys.argv[1:]
+    table_only = '--table-only' in args
+    sizes = [int(a) for a in args if a != '--table-only'] or [1_000_000, 10_000_000]
+
+    print(f"{'Rows':>12} | {'Representation':<16} | {'Memory':>10} | {'Bytes/row':>9} | {'Build':>7}")
+    for rows in sizes:
+        builders = [("TransactionTable", lambda lines: TransactionTable.from_transactions(iter_parse_transactions(lines)))]
+        if not table_only:
+            builders.insert(0, ("list of dicts", parse_transactions))
+        for label, build in builders:
+            held, elapsed = measure(build, rows)
+            print(f"{rows:>12,} | {label:<16} | {held / 2**20:>6.1f} MiB | {held / rows:>9.1f} | {elapsed:>6.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Top-k benchmarks.
+
+1. Exact: ranking views over aggregate stats with many distinct products and
+   customers, full sort (previous views) vs size-k heap (current views).
+2. Approximate: top-5 customers and products of a skewed stream with many
+   distinct keys, exact aggregation vs the Space-Saving summaries, comparing
+   peak traced memory and how many of the true top 5 were found.
+
+Usage: python benchmarks/bench_topk.py [rows] [distinct_keys]
+"""
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from utils.data_processor import (
+    aggregate_transactions,
+    _top_products_view,
+    _customer_view,
+    approximate_top_products,
+    approximate_top_customers
+)
+
+
+def iter_skewed_transactions(n, distinct, seed=42):
+    """
+    Yields minimal transactions whose products and customers follow a
+    heavy-tailed distribution over `distinct` keys.
+    """
+    rng = random.Random(seed)
+    for i in range(n):
+        yield {
+            'ProductName': f"Product {int(distinct * rng.random() ** 4)}",
+            'CustomerID': f"C{int(distinct * rng.random() ** 4):07d}",
+            'Quantity': rng.randint(1, 10),
+            'UnitPrice': float(rng.randint(100, 90000)),
+            'Region': 'North',
+            'Date': '2024-12-01'
+        }
+
+
+def sorted_top_products(stats, n):
+    product_list = [(name, d['total_qty'], d['total_revenue']) for name, d in stats['products'].items()]
+    return sorted(product_list, key=lambda x: x[1], reverse=True)[:n]
+
+
+def sorted_top_customers(stats, n):
+    customers = stats['customers']
+    return sorted(customers, key=lambda c: customers[c]['total_spent'], reverse=True)[:n]
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def traced(func, make_args):
+    """
+    Times one run of func, then measures its peak traced memory in a second
+    run (tracing slows the run down too much to time it).
+    """
+    result, elapsed = timed(func, *make_args())
+    tracemalloc.start()
+    func(*make_args())
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def exact_views(rows, distinct):
+    stats = aggregate_transactions(iter_skewed_transactions(rows, distinct))
+    print(f"Exact views: {len(stats['products']):,} products, {len(stats['customers']):,} customers")
+
+    old, old_time = timed(sorted_top_products, stats, 5)
+    new, new_time = timed(_top_products_view, stats, 5)
+    print(f"  top 5 products : sort {old_time * 1000:7.1f} ms | heap {new_time * 1000:7.1f} ms | same: {old == new}")
+
+    old, old_time = timed(sorted_top_customers, stats, 5)
+    new, new_time = timed(_customer_view, stats, 5)
+    print(f"  top 5 customers: sort {old_time * 1000:7.1f} ms | heap {new_time * 1000:7.1f} ms | same: {old == list(new)}")
+
+
+def approximate(rows, distinct):
+    print(f"Approximate top 5 over {rows:,} rows, up to {distinct:,} distinct keys:")
+    stats, exact_time, exact_peak = traced(aggregate_transactions,
+                                           lambda: (iter_skewed_transactions(rows, distinct),))
+    true_products = [name for name, _, _ in _top_products_view(stats, 5)]
+    true_customers = list(_customer_view(stats, 5))
+    del stats
+    print(f"  exact aggregation      | {exact_time:6.2f}s | peak {exact_peak / 2**20:8.1f} MiB")
+
+    for label, func, truth in (("space-saving products ", approximate_top_products, true_products),
+                               ("space-saving customers", approximate_top_customers, true_customers)):
+        top, elapsed, peak = traced(func, lambda: (iter_skewed_transactions(rows, distinct), 5))
+        found = len({item for item, _, _ in top} & set(truth))
+        print(f"  {label} | {elapsed:6.2f}s | peak {peak / 2**20:8.1f} MiB | found {found}/5 of true top 5")
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 300_000
+    distinct = int(sys.argv[2]) if len(sys.argv) > 2 else 200_000
+    exact_views(rows, distinct)
+    approximate(rows, distinct)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""
+Times the pure-Python and NumPy aggregation backends over the same
+TransactionTable and checks that they produce identical results.
+
+Usage: python benchmarks/bench_vectorized.py [rows]   (default: 10,000,000)
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from benchmarks.synthetic import iter_transactions
+from utils.data_processor import aggregate_transactions
+from utils.transaction_table import TransactionTable
+
+
+def timed(backend, table):
+    start = time.perf_counter()
+    stats = aggregate_transactions(table, backend=backend)
+    return stats, time.perf_counter() - start
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    print(f"Building a {rows:,}-row TransactionTable...")
+    table = TransactionTable.from_transactions(iter_transactions(rows, n_customers=100_000))
+
+    python_stats, python_time = timed('python', table)
+    numpy_stats, numpy_time = timed('numpy', table)
+
+    print(f"python backend: {python_time:8.2f}s")
+    print(f"numpy backend:  {numpy_time:8.2f}s  ({python_time / numpy_time:.1f}x faster)")
+    print(f"identical results: {repr(python_stats) == repr(numpy_stats)}")
+
+
+if __name__ == "__main__":
+    main()
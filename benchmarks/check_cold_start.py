@@ -0,0 +1,96 @@
+"""
+Cold-start budget check for the CLI.
+
+Runs `python -X importtime -c "import main"` in fresh interpreters and
+fails (exit status 1) when importing main.py and everything it pulls in
+takes longer than the budget, or when one of the heavy modules that are
+meant to be imported on first use (requests, NumPy, asyncio, the process
+pool) is imported at startup. Interpreter start-up and site-packages
+hooks are not counted.
+
+The modules are byte-compiled first, as they are after the first run of a
+cron job, so the check measures imports rather than compilation. The
+median of several runs is compared against the budget, and the slowest
+imports are listed to show where the time goes.
+
+Usage: python benchmarks/check_cold_start.py [--budget-ms 75] [--runs 7]
+"""
+import argparse
+import compileall
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Imported by the code paths that need them, never at startup
+DEFERRED_MODULES = ('requests', 'urllib3', 'numpy', 'asyncio', 'multiprocessing', 'concurrent.futures')
+
+DEFAULT_BUDGET_MS = 75.0
+
+
+def import_times():
+    """
+    Imports main in a fresh interpreter with -X importtime.
+    Returns: dict mapping module name -> (self us, cumulative us) for main's imports.
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import main'],
+                            cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"importing main failed:\n{result.stderr[-2000:]}")
+
+    # Each line is "import time: self | cumulative | name"; children come before their parent
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        entries.append((name.rstrip()[1:], int(self_us), int(cumulative_us)))
+
+    # main's own imports are the entries between the previous top-level import and main
+    times = {}
+    for name, self_us, cumulative_us in reversed(entries):
+        if times and not name.startswith(' '):
+            break
+        times[name.strip()] = (self_us, cumulative_us)
+    if 'main' not in times:
+        raise RuntimeError("no import time reported for main")
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fail when the CLI's import time exceeds a budget")
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument('--runs', type=int, default=7)
+    parser.add_argument('--top', type=int, default=10, help="list this many of the slowest imports")
+    args = parser.parse_args()
+
+    compileall.compile_file(os.path.join(ROOT, 'main.py'), quiet=1)
+    compileall.compile_dir(os.path.join(ROOT, 'utils'), quiet=1)
+
+    runs = [import_times() for _ in range(args.runs)]
+    total_ms = statistics.median(times['main'][1] for times in runs) / 1000
+    last = runs[-1]
+
+    print(f"import main: {total_ms:.1f} ms (median of {args.runs}, budget {args.budget_ms:.0f} ms)")
+    print("  slowest imports (self time, last run):")
+    for name, (self_us, cumulative_us) in sorted(last.items(), key=lambda item: -item[1][0])[:args.top]:
+        print(f"    {name:<32} {self_us / 1000:7.2f} ms self {cumulative_us / 1000:8.2f} ms cumulative")
+
+    failures = []
+    eager = [name for name in DEFERRED_MODULES if name in last]
+    if eager:
+        failures.append(f"imported at startup, should be deferred: {', '.join(eager)}")
+    if total_ms > args.budget_ms:
+        failures.append(f"import main took {total_ms:.1f} ms, over the {args.budget_ms:.0f} ms budget")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if not failures:
+        print("OK: within the cold-start budget")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
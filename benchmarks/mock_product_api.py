@@ -0,0 +1,151 @@
+"""
+Local stand-in for the DummyJSON products API, for offline tests and benchmarks.
+
+Serves GET /products?limit=&skip=&select= and GET /products/<id> for a
+configurable number of generated products, with an optional per-request delay.
+
+Usage: python benchmarks/mock_product_api.py [--products N] [--delay SECONDS] [--port PORT]
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+CATEGORIES = ['laptops', 'smartphones', 'accessories', 'monitors', 'audio']
+BRANDS = ['Acme', 'Globex', 'Initech', 'Umbrella', 'Hooli']
+
+
+def make_product(product_id):
+    return {
+        'id': product_id,
+        'title': f"Product {product_id}",
+        'description': f"Generated product number {product_id}",
+        'category': CATEGORIES[product_id % len(CATEGORIES)],
+        'brand': BRANDS[product_id % len(BRANDS)],
+        'price': round(10 + (product_id * 7.31) % 990, 2),
+        'rating': round(1 + (product_id * 0.37) % 4, 2),
+        'stock': product_id % 150
+    }
+
+
+class MockProductAPI:
+    """
+    Threaded HTTP server running in the background.
+    Use as a context manager; base_url points at the running server.
+    """
+
+    def __init__(self, products=100, delay=0.0, port=0):
+        self.products = products
+        self.delay = delay
+        self.request_count = 0
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _make_handler(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                with api._lock:
+                    api.request_count += 1
+                if api.delay:
+                    time.sleep(api.delay)
+
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                parts = url.path.strip('/').split('/')
+
+                if parts == ['products']:
+                    body = api.list_products(query)
+                elif len(parts) == 2 and parts[0] == 'products' and parts[1].isdigit():
+                    body = api.get_product(int(parts[1]), query)
+                else:
+                    body = None
+
+                if body is None:
+                    self.send_response(404)
+                    payload = json.dumps({'message': 'Not found'}).encode()
+                else:
+                    self.send_response(200)
+                    payload = json.dumps(body).encode()
+                with api._lock:
+                    api.bytes_sent += len(payload)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def list_products(self, query):
+        limit = int(query.get('limit', ['30'])[0])
+        skip = int(query.get('skip', ['0'])[0])
+        if limit == 0:
+            limit = self.products
+        fields = query.get('select', [''])[0]
+        ids = range(skip + 1, min(skip + limit, self.products) + 1)
+        products = [self._select(make_product(i), fields) for i in ids]
+        return {'products': products, 'total': self.products, 'skip': skip, 'limit': len(products)}
+
+    def get_product(self, product_id, query=None):
+        if not 1 <= product_id <= self.products:
+            return None
+        fields = (query or {}).get('select', [''])[0]
+        return self._select(make_product(product_id), fields)
+
+    @staticmethod
+    def _select(product, fields):
+        if not fields:
+            return product
+        keep = set(fields.split(',')) | {'id'}
+        return {key: value for key, value in product.items() if key in keep}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local mock of the DummyJSON products API")
+    parser.add_argument('--products', type=int, default=100)
+    parser.add_argument('--delay', type=float, default=0.0)
+    parser.add_argument('--port', type=int, default=8000)
+    args = parser.parse_args()
+
+    api = MockProductAPI(args.products, args.delay, args.port)
+    print(f"Serving {args.products} products at {api.base_url} (Ctrl+C to stop)")
+    try:
+        api._server.serve_forever()
+    except KeyboardInterrupt:
+        api.stop()
+
+
+if __name__ == "__main__":
+    main()
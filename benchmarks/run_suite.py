@@ -0,0 +1,196 @@
+"""
+Reproducible end-to-end benchmark suite.
+
+For every row count, a seeded synthetic sales file (see synthetic.py) is
+generated with the requested cardinalities and dirty-row rate, and main.py
+is run on it once per mode in a scratch directory, against the local mock
+product API and with the catalog cache off. Each run writes its stage
+profile (output/profile.json, see utils/profiler.py); the suite collects the
+per-stage wall time, CPU time and rows/sec of every run, plus the run's peak
+RSS, into one JSON results file.
+
+Two results files can be compared with --compare OLD.json: stages of the
+same (rows, mode) pair are printed side by side with the speed-up.
+
+Modes that hold every row in memory (serial, async, parallel) need roughly
+1 GB per 2M rows; use --modes stream for the largest row counts.
+
+Usage:
+    python benchmarks/run_suite.py [--rows 10000 100000 1000000] [--modes serial stream]
+                                   [--regions N] [--products N] [--customers N] [--days N]
+                                   [--dirty-rate RATE] [--seed N] [--data-dir DIR]
+                                   [--results FILE] [--compare OLD.json]
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from benchmarks.mock_product_api import MockProductAPI
+from benchmarks.synthetic import write_sales_file
+
+MODES = {
+    'serial': [],
+    'stream': ['--stream'],
+    'parallel': ['--workers', '2'],
+    'async': ['--async'],
+    'incremental': ['--incremental'],
+}
+
+
+def sales_file(data_dir, rows, args):
+    """
+    Returns: path of the synthetic file for these settings, generated on first use.
+    """
+    name = (f"sales_{rows}_s{args.seed}_r{args.regions}_p{args.products}_c{args.customers}"
+            f"_d{args.days}_x{args.dirty_rate}.txt")
+    path = os.path.join(data_dir, name)
+    if not os.path.exists(path):
+        start = time.perf_counter()
+        write_sales_file(path + '.tmp', rows, seed=args.seed, dirty_rate=args.dirty_rate,
+                         n_products=args.products, n_customers=args.customers,
+                         n_days=args.days, n_regions=args.regions)
+        os.replace(path + '.tmp', path)
+        print(f"  generated {name} in {time.perf_counter() - start:.1f}s")
+    return path
+
+
+def run_main(path, mode, base_url, extra_args):
+    """
+    Runs main.py on path in a scratch directory and answers 'n' to the filter prompt.
+    Returns: dict (the run's profile, with elapsed_s and peak_rss_kib added)
+    """
+    with tempfile.TemporaryDirectory() as workdir:
+        os.makedirs(os.path.join(workdir, 'data'))
+        os.symlink(os.path.abspath(path), os.path.join(workdir, 'data', 'sales_data.txt'))
+        command = ([sys.executable, os.path.join(ROOT, 'main.py'), '--no-cache', '--api-url', base_url]
+                   + MODES[mode] + extra_args)
+        log_path = os.path.join(workdir, 'run.log')
+
+        start = time.perf_counter()
+        with open(log_path, 'w') as log:
+            process = subprocess.Popen(command, cwd=workdir, stdin=subprocess.PIPE,
+                                       stdout=log, stderr=subprocess.STDOUT, text=True)
+            process.stdin.write('n\n')
+            process.stdin.close()
+            # wait4 gives this child's own resource usage, including its peak RSS
+            _, status, usage = os.wait4(process.pid, 0)
+            process.returncode = os.waitstatus_to_exitcode(status)
+        elapsed = time.perf_counter() - start
+
+        profile_path = os.path.join(workdir, 'output', 'profile.json')
+        if process.returncode != 0 or not os.path.exists(profile_path):
+            with open(log_path) as log:
+                raise RuntimeError(f"main.py {' '.join(MODES[mode])} failed:\n{log.read()[-2000:]}")
+        with open(profile_path) as file:
+            profile = json.load(file)
+
+    profile['elapsed_s'] = round(elapsed, 3)
+    profile['peak_rss_kib'] = usage.ru_maxrss
+    return profile
+
+
+def print_run(rows, mode, profile):
+    print(f"  {rows:>11,} rows | {mode:<11} | {profile['elapsed_s']:8.2f}s | "
+          f"peak RSS {profile['peak_rss_kib'] / 1024:8.1f} MiB")
+    for stage in profile['stages']:
+        rate = f"{stage['rows_per_s']:>12,.0f} rows/s" if stage['rows_per_s'] else ""
+        print(f"      {stage['name']:<32} {stage['wall_s']:8.3f}s wall {stage['cpu_s']:8.3f}s cpu {rate}")
+
+
+def compare(old_results, new_results):
+    """
+    Prints the stages of runs present in both results files side by side.
+    """
+    old_runs = {(run['rows'], run['mode']): run for run in old_results['runs']}
+    print(f"\nCompared with {old_results['generated']}:")
+    for run in new_results['runs']:
+        old = old_runs.get((run['rows'], run['mode']))
+        if old is None:
+            continue
+        print(f"  {run['rows']:>11,} rows | {run['mode']:<11} | "
+              f"{old['elapsed_s']:8.2f}s -> {run['elapsed_s']:8.2f}s ({old['elapsed_s'] / run['elapsed_s']:.2f}x)")
+        old_stages = {stage['name']: stage for stage in old['stages']}
+        for stage in run['stages']:
+            before = old_stages.get(stage['name'])
+            if before and stage['wall_s'] > 0:
+                print(f"      {stage['name']:<32} {before['wall_s']:8.3f}s -> {stage['wall_s']:8.3f}s "
+                      f"({before['wall_s'] / stage['wall_s']:.2f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reproducible end-to-end benchmark suite")
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--modes', nargs='+', choices=sorted(MODES), default=['serial', 'stream'])
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--regions', type=int, default=4)
+    parser.add_argument('--products', type=int, default=100)
+    parser.add_argument('--customers', type=int, default=1000)
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--dirty-rate', type=float, default=0.02)
+    parser.add_argument('--api-delay', type=float, default=0.0, help="seconds added to every mock API request")
+    parser.add_argument('--profile-memory', action='store_true',
+                        help="also record per-stage traced memory (slows every run down)")
+    parser.add_argument('--data-dir', default=None,
+                        help="keep generated sales files here and reuse them (default: a temporary directory)")
+    parser.add_argument('--results', default=None,
+                        help="results file (default: benchmarks/results/suite-<timestamp>.json)")
+    parser.add_argument('--compare', default=None, metavar='OLD.json')
+    args = parser.parse_args()
+
+    started = datetime.datetime.now()
+    results_path = args.results or os.path.join(
+        ROOT, 'benchmarks', 'results', f"suite-{started:%Y%m%d-%H%M%S}.json")
+    extra_args = ['--profile-memory'] if args.profile_memory else []
+    results = {
+        'generated': started.isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'machine': {'platform': platform.platform(), 'cpus': os.cpu_count()},
+        'settings': {
+            'seed': args.seed, 'regions': args.regions, 'products': args.products,
+            'customers': args.customers, 'days': args.days, 'dirty_rate': args.dirty_rate,
+            'api_delay': args.api_delay, 'profile_memory': args.profile_memory
+        },
+        'runs': []
+    }
+
+    with tempfile.TemporaryDirectory() as scratch, \
+            MockProductAPI(args.products + 100, args.api_delay) as api:
+        data_dir = args.data_dir or scratch
+        os.makedirs(data_dir, exist_ok=True)
+        for rows in args.rows:
+            path = sales_file(data_dir, rows, args)
+            for mode in args.modes:
+                profile = run_main(path, mode, api.base_url, extra_args)
+                print_run(rows, mode, profile)
+                results['runs'].append({
+                    'rows': rows,
+                    'mode': mode,
+                    'elapsed_s': profile['elapsed_s'],
+                    'peak_rss_kib': profile['peak_rss_kib'],
+                    'total_wall_s': profile['total_wall_s'],
+                    'peak_memory_bytes': profile.get('peak_memory_bytes'),
+                    'stages': profile['stages'],
+                    'functions': profile['functions']
+                })
+
+    os.makedirs(os.path.dirname(os.path.abspath(results_path)), exist_ok=True)
+    with open(results_path, 'w', encoding='utf-8') as file:
+        json.dump(results, file, indent=2)
+    print(f"\nResults saved to: {results_path}")
+
+    if args.compare:
+        with open(args.compare) as file:
+            compare(json.load(file), results)
+
+
+if __name__ == "__main__":
+    main()
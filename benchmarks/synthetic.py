@@ -0,0 +1,182 @@
+"""
+Seeded synthetic sales data for the benchmark scripts.
+Rows follow the same shape as the dictionaries produced by parse_transactions.
+"""
+import argparse
+import datetime
+import random
+import time
+
+HEADER = "TransactionID|Date|ProductID|ProductName|Quantity|UnitPrice|CustomerID|Region"
+REGIONS = ['North', 'South', 'East', 'West']
+PRODUCT_NAMES = ['Laptop', 'Mouse', 'Keyboard', 'Monitor', 'Webcam',
+                 'Headphones', 'USB Cable', 'External Hard Drive',
+                 'Wireless Mouse', 'Laptop Charger']
+
+
+def _region_names(n_regions):
+    """
+    Returns: list of n_regions region names, starting with the four real ones.
+    """
+    if n_regions is None:
+        return REGIONS
+    return (REGIONS + [f"Region {i + 1}" for i in range(len(REGIONS), n_regions)])[:n_regions]
+
+
+def _draws(n, seed, n_products, n_customers, n_days, n_regions):
+    """
+    Lazily yields (row number, product, day, quantity, price, customer, region)
+    index tuples. Both the dictionary and the raw line generators draw from
+    here, so a given seed describes the same transactions in either form.
+    """
+    rng = random.Random(seed)
+    # randrange draws exactly what randint/choice would, with less overhead
+    randrange = rng.randrange
+    n_regions = len(_region_names(n_regions))
+    for i in range(n):
+        yield (i, randrange(n_products), randrange(n_days), randrange(1, 11),
+               randrange(100, 90001), randrange(n_customers), randrange(n_regions))
+
+
+def _day_names(n_days):
+    # Consecutive days from 2024-12-01; runs past December into 2025 when n_days > 31
+    first_day = datetime.date(2024, 12, 1)
+    return [(first_day + datetime.timedelta(days=day)).isoformat() for day in range(n_days)]
+
+
+def iter_transactions(n, seed=42, n_products=100, n_customers=1000, n_days=30, n_regions=None):
+    """
+    Lazily yields n parsed transaction dictionaries with a fixed random seed.
+    n_regions (default: the four real regions) adds generated region names.
+    """
+    dates = _day_names(n_days)
+    regions = _region_names(n_regions)
+
+    for i, prod_num, day, qty, price, cust, region in _draws(n, seed, n_products, n_customers,
+                                                             n_days, n_regions):
+        yield {
+            'TransactionID': f"T{i + 1:07d}",
+            'Date': dates[day],
+            'ProductID': f"P{101 + prod_num}",
+            'ProductName': f"{PRODUCT_NAMES[prod_num % len(PRODUCT_NAMES)]} {prod_num}",
+            'Quantity': qty,
+            'UnitPrice': float(price),
+            'CustomerID': f"C{cust + 1:05d}",
+            'Region': regions[region]
+        }
+
+
+def make_transactions(n, seed=42, **kwargs):
+    """
+    Builds n parsed transaction dictionaries with a fixed random seed.
+    Returns: list of transaction dictionaries.
+    """
+    return list(iter_transactions(n, seed=seed, **kwargs))
+
+
+def _dirty_line(t, rng):
+    """
+    Renders a transaction with one of the defects found in the real sales file.
+    """
+    kind = rng.randrange(5)
+    name, price, cust, trans_id, qty = (t['ProductName'], f"{int(t['UnitPrice'])}",
+                                        t['CustomerID'], t['TransactionID'], t['Quantity'])
+    if kind == 0:
+        price = f"{int(t['UnitPrice']):,}"
+    elif kind == 1:
+        name = name.replace(' ', ',', 1)
+    elif kind == 2:
+        cust = ''
+    elif kind == 3:
+        trans_id = 'X' + trans_id[1:]
+    else:
+        qty = 0
+    return f"{trans_id}|{t['Date']}|{t['ProductID']}|{name}|{qty}|{price}|{cust}|{t['Region']}"
+
+
+def iter_sales_lines(n, seed=42, dirty_rate=0.0, n_products=100, n_customers=1000, n_days=30,
+                     n_regions=None, decimal_prices=False):
+    """
+    Lazily yields n raw pipe-delimited data lines (no header, no newline).
+    A dirty_rate fraction of them carry a defect (thousands separators,
+    commas in names, missing CustomerID, bad TransactionID or zero quantity).
+    With decimal_prices, prices are written in cents (e.g. 123.45 instead
+    of 12345), so revenue sums are no longer exact in floating point.
+    """
+    dates = _day_names(n_days)
+    regions = _region_names(n_regions)
+    products = {}
+    dirty_rng = random.Random(seed + 1)
+    dirty_draw = dirty_rng.random
+
+    for i, prod_num, day, qty, price, cust, region in _draws(n, seed, n_products, n_customers,
+                                                             n_days, n_regions):
+        if dirty_rate and dirty_draw() < dirty_rate:
+            t = {
+                'TransactionID': f"T{i + 1:07d}",
+                'Date': dates[day],
+                'ProductID': f"P{101 + prod_num}",
+                'ProductName': f"{PRODUCT_NAMES[prod_num % len(PRODUCT_NAMES)]} {prod_num}",
+                'Quantity': qty,
+                'UnitPrice': price / 100 if decimal_prices else float(price),
+                'CustomerID': f"C{cust + 1:05d}",
+                'Region': regions[region]
+            }
+            yield _dirty_line(t, dirty_rng)
+            continue
+        # 'P<id>|<name>' is formatted once per product, not once per row
+        product = products.get(prod_num)
+        if product is None:
+            product = products[prod_num] = (
+                f"P{101 + prod_num}|{PRODUCT_NAMES[prod_num % len(PRODUCT_NAMES)]} {prod_num}"
+            )
+        if decimal_prices:
+            price = f"{price // 100}.{price % 100:02d}"
+        yield f"T{i + 1:07d}|{dates[day]}|{product}|{qty}|{price}|C{cust + 1:05d}|{regions[region]}"
+
+
+def write_sales_file(path, n, seed=42, **kwargs):
+    """
+    Writes n synthetic transactions to path in the raw pipe-delimited format.
+    Keyword arguments are passed to iter_sales_lines.
+    Returns: int (number of data rows written)
+    """
+    with open(path, 'w', encoding='utf-8', buffering=1 << 20) as file:
+        file.write(HEADER + "\n")
+        batch = []
+        for line in iter_sales_lines(n, seed=seed, **kwargs):
+            batch.append(line)
+            if len(batch) == 8192:
+                batch.append('')
+                file.write("\n".join(batch))
+                batch = []
+        if batch:
+            batch.append('')
+            file.write("\n".join(batch))
+    return n
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a seeded synthetic sales_data.txt")
+    parser.add_argument('path')
+    parser.add_argument('--rows', type=int, default=10_000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--regions', type=int, default=len(REGIONS))
+    parser.add_argument('--products', type=int, default=100)
+    parser.add_argument('--customers', type=int, default=1000)
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--dirty-rate', type=float, default=0.0,
+                        help="fraction of rows with a defect the parser has to clean or reject")
+    parser.add_argument('--decimal-prices', action='store_true', help="write prices in cents, e.g. 123.45")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    write_sales_file(args.path, args.rows, seed=args.seed, dirty_rate=args.dirty_rate,
+                     n_products=args.products, n_customers=args.customers,
+                     n_days=args.days, n_regions=args.regions, decimal_prices=args.decimal_prices)
+    elapsed = time.perf_counter() - start
+    print(f"Wrote {args.rows:,} rows to {args.path} in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
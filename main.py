@@ -1,134 +1,1230 @@
-import sys
-from utils.file_handler import read_sales_data, save_enriched_data
-from utils.api_handler import fetch_all_products, create_product_mapping
-from utils.data_processor import (
-    parse_transactions, 
-    validate_and_filter, 
-    enrich_sales_data, 
-    generate_sales_report
-)
-
-def main():
-    print("==========================================")
-    print("          SALES ANALYTICS SYSTEM          ")
-    print("==========================================")
-    
-    try:
-        # --- STEP 1: LOAD DATA ---
-        print("\n[1/10] Reading sales data...")
-        file_path = "data/sales_data.txt"
-        raw_data = read_sales_data(file_path)
-        if not raw_data:
-            print("[FAIL] No data found. Exiting.")
-            return
-        print(f" ✓ Successfully read {len(raw_data)} transactions")
-
-        # --- STEP 2: PARSE DATA ---
-        print("\n[2/10] Parsing and cleaning data...")
-        parsed_data = parse_transactions(raw_data)
-        print(f" ✓ Parsed {len(parsed_data)} records")
-
-        # --- STEP 3: DISPLAY FILTER OPTIONS ---
-        print("\n[3/10] Filter Options Available:")
-        # Calculate options to show the user
-        regions = sorted(list(set(t['Region'] for t in parsed_data)))
-        amounts = [t['Quantity'] * t['UnitPrice'] for t in parsed_data]
-        min_amt = min(amounts) if amounts else 0
-        max_amt = max(amounts) if amounts else 0
-        
-        print(f" Regions: {', '.join(regions)}")
-        print(f" Amount Range: ${min_amt:,.2f} - ${max_amt:,.2f}")
-
-        # --- STEP 4 & 5: USER INTERACTION ---
-        filter_region = None
-        filter_min = None
-        filter_max = None
-        
-        user_choice = input("\nDo you want to filter data? (y/n): ").strip().lower()
-        
-        if user_choice == 'y':
-            print("\n--- Enter Filter Criteria (Press Enter to skip) ---")
-            
-          
-            reg_input = input(f"Region ({'/'.join(regions)}): ").strip()
-            if reg_input in regions:
-                filter_region = reg_input
-            
-            min_input = input("Min Transaction Amount: ").strip()
-            if min_input:
-                try:
-                    filter_min = float(min_input)
-                except ValueError:
-                    print(" ! Invalid number, ignoring min amount.")
-
-            max_input = input("Max Transaction Amount: ").strip()
-            if max_input:
-                try:
-                    filter_max = float(max_input)
-                except ValueError:
-                    print(" ! Invalid number, ignoring max amount.")
-
-        # --- STEP 6: VALIDATE & FILTER ---
-        print("\n[4/10] Validating transactions...")
-        valid_data, invalid_count, summary = validate_and_filter(
-            parsed_data, 
-            region=filter_region, 
-            min_amount=filter_min, 
-            max_amount=filter_max
-        )
-        print(f" ✓ Valid: {len(valid_data)} | Invalid: {invalid_count}")
-        if filter_region or filter_min or filter_max:
-             print(f" ✓ Filtered Result: Keeping {len(valid_data)} out of {summary['total_input']} records")
-
-        if not valid_data:
-            print("[FAIL] No valid data remaining after filtering. Exiting.")
-            return
-
-        # --- STEP 7: ANALYSIS ---
-        print("\n[5/10] Analyzing sales data...")
-        # (The actual analysis happens inside generate_sales_report, but we acknowledge the step here)
-        print(" ✓ Analysis complete")
-
-        # --- STEP 8: API FETCH ---
-        print("\n[6/10] Fetching product data from API...")
-        api_products = fetch_all_products()
-        if api_products:
-             print(f" ✓ Fetched {len(api_products)} products")
-        else:
-             print(" ! API fetch failed. Proceeding without enrichment.")
-
-        # --- STEP 9: ENRICHMENT ---
-        print("\n[7/10] Enriching sales data...")
-        product_map = create_product_mapping(api_products) if api_products else {}
-        enriched_data = enrich_sales_data(valid_data, product_map)
-        
-        matches = sum(1 for t in enriched_data if t.get('API_Match'))
-        if len(valid_data) > 0:
-            match_rate = (matches / len(valid_data)) * 100
-        else:
-            match_rate = 0
-        print(f" ✓ Enriched {matches}/{len(valid_data)} transactions ({match_rate:.1f}%)")
-
-        # --- STEP 10: SAVE DATA ---
-        print("\n[8/10] Saving enriched data...")
-        save_success = save_enriched_data(enriched_data, "data/enriched_sales_data.txt")
-        if save_success:
-            print(" ✓ Saved to: data/enriched_sales_data.txt")
-
-        # --- STEP 11: GENERATE REPORT ---
-        print("\n[9/10] Generating report...")
-        report_success = generate_sales_report(valid_data, enriched_data, "output/sales_report.txt")
-        if report_success:
-            print(" ✓ Report saved to: output/sales_report.txt")
-
-        # --- FINAL SUCCESS ---
-        print("\n[10/10] Process Complete!")
-        print("==========================================")
-
-    except Exception as e:
-        print(f"\n[CRITICAL ERROR] An unexpected error occurred: {e}")
-        import traceback
-        traceback.print_exc()
-
-if __name__ == "__main__":
-    main()
\ No newline at end of file
+import os
+import re
+import sys
+import time
+import argparse
+from utils.file_handler import read_sales_data, save_enriched_data, detect_encoding, iter_sales_data, expand_sales_paths
+from utils.parallel import process_file_parallel, process_files_parallel
+from utils.incremental import process_incremental, save_state
+from utils.transaction_index import TransactionIndex
+from utils.snapshot import save_snapshot, load_snapshot, snapshot_matches
+from utils.rollup import (
+    DEFAULT_CUBE_FILE, ROLLUP_BUCKETS, new_cube, update_cube, iter_update_cube, load_cube, save_cube, cube_rollup
+)
+from utils.profiler import profiler
+from utils.sketches import HyperLogLog
+from utils.vectorized import HAS_NUMPY
+from utils.service import SalesDataset, serve, DEFAULT_HOST, DEFAULT_PORT, DEFAULT_WATCH_INTERVAL
+from utils import data_processor
+from utils.api_handler import API_BASE_URL, fetch_all_products, create_product_mapping
+from utils.product_cache import get_product_mapping, get_product_mapping_for_ids, cache_stats, DEFAULT_TTL
+from utils.data_processor import (
+    parse_transactions, 
+    enrich_sales_data, 
+    generate_sales_report,
+    iter_parse_transactions,
+    iter_validate_and_filter,
+    iter_enrich_sales_data,
+    iter_aggregate,
+    aggregate_transactions,
+    collect_product_ids,
+    summarize_enrichment
+)
+
+PARSED_SNAPSHOT = "data/sales_data.snapshot"
+PROFILE_FILE = "output/profile.json"
+REPORTS_DIR = "output/reports"
+DEFAULT_CUSTOMER_COUNTERS = 1000
+
+# data_processor functions whose calls are timed in the profile
+METRIC_FUNCTIONS = (
+    'aggregate_transactions',
+    'merge_aggregates',
+    'calculate_total_revenue',
+    'region_wise_sales',
+    'top_selling_products',
+    'customer_analysis',
+    'daily_sales_trend',
+    'find_peak_sales_day',
+    'low_performing_products',
+    '_region_view',
+    '_top_products_view',
+    '_customer_view',
+    '_daily_view',
+    '_peak_day_view',
+    '_low_performers_view'
+)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Sales Analytics System")
+    parser.add_argument(
+        '--stream', action='store_true',
+        help="stream records through lazy generator stages so memory stays flat"
+    )
+    parser.add_argument(
+        '--workers', type=int, default=1,
+        help="parse, validate and aggregate the file in N worker processes (not with --stream, "
+             "--async, --incremental, --serve or scenario runs)"
+    )
+    parser.add_argument(
+        '--cache-ttl', type=float, default=DEFAULT_TTL,
+        help="seconds a cached product catalog stays fresh (default: 1 day)"
+    )
+    parser.add_argument(
+        '--no-cache', action='store_true',
+        help="always fetch the product catalog from the API"
+    )
+    parser.add_argument(
+        '--incremental', action='store_true',
+        help="process only rows appended since the last run and merge them into the saved aggregates"
+    )
+    parser.add_argument(
+        '--enrich-mode', choices=('catalog', 'demand'), default='catalog',
+        help="'demand' fetches only the products referenced by the sales data "
+             "that are missing from the local catalog"
+    )
+    parser.add_argument(
+        '--distinct-error', type=float, default=None, metavar='ERROR',
+        help="count unique customers per day and products per customer with "
+             "HyperLogLog sketches at this relative error (e.g. 0.01) instead of exact sets"
+    )
+    parser.add_argument(
+        '--approx-customers', type=int, nargs='?', const=DEFAULT_CUSTOMER_COUNTERS, default=None,
+        metavar='COUNTERS',
+        help=f"with --stream, rank the top customers with a Space-Saving summary of COUNTERS "
+             f"counters (default: {DEFAULT_CUSTOMER_COUNTERS}) instead of keeping every customer's "
+             f"totals, so memory no longer grows with the number of customers; the report's "
+             f"customer ranking becomes approximate"
+    )
+    parser.add_argument(
+        '--backend', choices=('python', 'numpy'), default='python',
+        help="aggregation backend of interactive and scenario runs: the pure-Python loop, or "
+             "'numpy', which copies the filtered rows into a columnar TransactionTable and "
+             "aggregates it with NumPy (same results; needs NumPy)"
+    )
+    parser.add_argument(
+        '--async', dest='use_async', action='store_true',
+        help="fetch the product catalog in the background while the sales file is read, "
+             "parsed and validated"
+    )
+    parser.add_argument(
+        '--api-url', default=API_BASE_URL,
+        help="base URL of the product API (default: DummyJSON)"
+    )
+    parser.add_argument(
+        '--snapshot', action='store_true',
+        help="in interactive runs, reuse parsed rows from a binary snapshot while the sales file "
+             "is unchanged, and save a new snapshot when it changed"
+    )
+    parser.add_argument(
+        '--input', dest='inputs', action='extend', nargs='+', metavar='PATH',
+        help="read these sales files instead of data/sales_data.txt: files, directories "
+             "(every *.txt, *.txt.gz and *.txt.zst under them) or quoted globs. "
+             "Files are processed concurrently with --workers (parallel and scenario runs only)"
+    )
+    parser.add_argument(
+        '--cube', nargs='?', const=DEFAULT_CUBE_FILE, default=None, metavar='FILE',
+        help=f"keep a day x region x product rollup cube of the run's (filtered) rows in FILE "
+             f"(default: {DEFAULT_CUBE_FILE}); incremental runs add their new rows to it. "
+             "--from/--to/--rollup read the cube from FILE. Not for scenario or --serve runs"
+    )
+    parser.add_argument(
+        '--from', dest='date_from', metavar='YYYY-MM-DD',
+        help="report only from this date on, straight from the saved rollup cube (--cube FILE, "
+             f"default: {DEFAULT_CUBE_FILE}; no pipeline run)"
+    )
+    parser.add_argument(
+        '--to', dest='date_to', metavar='YYYY-MM-DD',
+        help="report only up to this date (inclusive), straight from the saved rollup cube"
+    )
+    parser.add_argument(
+        '--rollup', choices=ROLLUP_BUCKETS, default=None,
+        help="print revenue, quantity and transactions per day, week, month, region or product "
+             "from the saved rollup cube (with --from/--to for a window)"
+    )
+    parser.add_argument(
+        '--scenario', action='append', type=scenario_arg, metavar='[NAME=]REGION:MIN:MAX',
+        help="run non-interactively and report on this filter scenario; repeat it for more. "
+             "Parts may be left empty (e.g. North, ::500, big=West:1000:). All scenarios "
+             "share one read, parse, enrichment and save"
+    )
+    parser.add_argument(
+        '--scenarios', dest='scenarios_file', metavar='FILE',
+        help="read more filter scenarios from FILE, one [NAME=]REGION:MIN:MAX per line ('#' comments)"
+    )
+    parser.add_argument(
+        '--reports-dir', default=REPORTS_DIR, metavar='DIR',
+        help=f"where scenario runs write one report per scenario (default: {REPORTS_DIR})"
+    )
+    parser.add_argument(
+        '--no-prompt', action='store_true',
+        help="do not ask for filters; run over all valid rows"
+    )
+    parser.add_argument(
+        '--serve', action='store_true',
+        help="load and enrich the sales file once, keep it in memory and answer metric queries "
+             "over HTTP until stopped with Ctrl+C; appended rows are applied as they arrive"
+    )
+    parser.add_argument(
+        '--host', default=DEFAULT_HOST,
+        help=f"address the service listens on (default: {DEFAULT_HOST})"
+    )
+    parser.add_argument(
+        '--port', type=int, default=DEFAULT_PORT,
+        help=f"port the service listens on (default: {DEFAULT_PORT}; 0 picks a free one)"
+    )
+    parser.add_argument(
+        '--socket', metavar='PATH', default=None,
+        help="serve on this Unix socket instead of a TCP port"
+    )
+    parser.add_argument(
+        '--watch-interval', type=float, default=DEFAULT_WATCH_INTERVAL, metavar='SECONDS',
+        help=f"how often the service checks the sales file for appended rows "
+             f"(default: {DEFAULT_WATCH_INTERVAL:g}; 0 to stop watching)"
+    )
+    parser.add_argument(
+        '--profile', default=PROFILE_FILE, metavar='FILE',
+        help=f"write per-stage wall/CPU time and rows/sec as JSON to FILE (default: {PROFILE_FILE}; "
+             "'' to disable)"
+    )
+    parser.add_argument(
+        '--profile-memory', action='store_true',
+        help="also record the peak traced memory of every stage (slows the run down)"
+    )
+    parser.add_argument(
+        '--cprofile', nargs='?', const="output/profile.prof", default=None, metavar='FILE',
+        help="dump a cProfile of the run to FILE (default: output/profile.prof)"
+    )
+    args = parser.parse_args(argv)
+
+    if args.distinct_error is not None:
+        try:
+            HyperLogLog.precision_for(args.distinct_error)
+        except ValueError as e:
+            parser.error(f"--distinct-error: {e}")
+
+    mode = pick_mode(args)
+    if args.inputs and mode not in ('parallel', 'batch'):
+        parser.error(f"--input applies to parallel and scenario runs, not to {mode} mode")
+    if args.workers > 1 and mode != 'parallel':
+        parser.error(f"--workers applies to parallel runs, not to {mode} mode")
+    if args.snapshot and mode != 'serial':
+        parser.error(f"--snapshot applies to interactive runs, not to {mode} mode")
+    if args.cube and mode in ('batch', 'serve'):
+        parser.error(f"--cube applies to pipeline and --from/--to/--rollup runs, not to {mode} mode")
+    if mode == 'cube' and not args.cube:
+        args.cube = DEFAULT_CUBE_FILE
+    if args.approx_customers is not None:
+        if mode != 'stream':
+            parser.error(f"--approx-customers applies to --stream runs, not to {mode} mode")
+        if args.approx_customers < 1:
+            parser.error("--approx-customers needs at least 1 counter")
+    if args.backend == 'numpy':
+        if mode not in ('serial', 'batch'):
+            parser.error(f"--backend numpy applies to interactive and scenario runs, not to {mode} mode")
+        if not HAS_NUMPY:
+            parser.error("--backend numpy needs NumPy to be installed")
+    return args
+
+
+def pick_mode(args):
+    """
+    Returns: name of the run mode the arguments select
+    ('cube', 'serve', 'batch', 'async', 'stream', 'incremental', 'parallel' or 'serial').
+    """
+    if args.date_from or args.date_to or args.rollup:
+        return 'cube'
+    if args.serve:
+        return 'serve'
+    if args.scenario or args.scenarios_file:
+        return 'batch'
+    if args.use_async:
+        return 'async'
+    if args.stream:
+        return 'stream'
+    if args.incremental:
+        return 'incremental'
+    if args.inputs or args.workers > 1:
+        return 'parallel'
+    return 'serial'
+
+
+def parse_scenario(spec):
+    """
+    Parses one filter scenario written as [NAME=]REGION:MIN:MAX. Empty parts
+    mean no filter, so 'North', '::500' and 'big=West:1000:' are all valid.
+    Without a name, one is made up from the filters.
+    Returns: dict with name, region, min_amount and max_amount.
+    Raises ValueError if the scenario is malformed.
+    """
+    name, _, filters = spec.strip().rpartition('=')
+    parts = filters.split(':')
+    if len(parts) > 3:
+        raise ValueError(f"expected REGION:MIN:MAX, got {spec!r}")
+    parts += [''] * (3 - len(parts))
+    region = parts[0].strip() or None
+    amounts = []
+    for label, part in (('min', parts[1]), ('max', parts[2])):
+        part = part.strip()
+        try:
+            amounts.append(float(part) if part else None)
+        except ValueError:
+            raise ValueError(f"invalid {label} amount {part!r} in {spec!r}") from None
+    min_amount, max_amount = amounts
+
+    if not name.strip():
+        labels = [region or 'all']
+        if min_amount is not None:
+            labels.append(f"min{min_amount:g}")
+        if max_amount is not None:
+            labels.append(f"max{max_amount:g}")
+        name = '_'.join(labels)
+    return {'name': name.strip(), 'region': region, 'min_amount': min_amount, 'max_amount': max_amount}
+
+
+def scenario_arg(spec):
+    # argparse type for --scenario: report malformed scenarios as usage errors
+    try:
+        return parse_scenario(spec)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def load_scenarios(filename):
+    """
+    Reads filter scenarios from a file, one per line. Blank lines and lines
+    starting with '#' are skipped, and so are malformed lines (with a warning).
+    Returns: list of scenario dicts (see parse_scenario).
+    """
+    scenarios = []
+    try:
+        with open(filename, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                try:
+                    scenarios.append(parse_scenario(line))
+                except ValueError as e:
+                    print(f" ! {filename}:{line_number}: {e}; skipped")
+    except FileNotFoundError:
+        print(f"Error: Could not find the scenarios file at {filename}")
+    return scenarios
+
+
+def prompt_filters(regions=None, interactive=True):
+    """
+    Asks the user for optional filter criteria.
+    If regions is None, any region name is accepted.
+    With interactive=False (--no-prompt) nothing is asked and no filter is applied.
+    Returns: tuple (region, min_amount, max_amount)
+    """
+    filter_region = None
+    filter_min = None
+    filter_max = None
+
+    if not interactive:
+        print("\n ✓ Not prompting for filters (--no-prompt); using all valid rows")
+        return filter_region, filter_min, filter_max
+    
+    user_choice = input("\nDo you want to filter data? (y/n): ").strip().lower()
+    
+    if user_choice == 'y':
+        print("\n--- Enter Filter Criteria (Press Enter to skip) ---")
+        
+        if regions is None:
+            reg_input = input("Region: ").strip()
+            if reg_input:
+                filter_region = reg_input
+        else:
+            reg_input = input(f"Region ({'/'.join(regions)}): ").strip()
+            if reg_input in regions:
+                filter_region = reg_input
+        
+        min_input = input("Min Transaction Amount: ").strip()
+        if min_input:
+            try:
+                filter_min = float(min_input)
+            except ValueError:
+                print(" ! Invalid number, ignoring min amount.")
+
+        max_input = input("Max Transaction Amount: ").strip()
+        if max_input:
+            try:
+                filter_max = float(max_input)
+            except ValueError:
+                print(" ! Invalid number, ignoring max amount.")
+
+    return filter_region, filter_min, filter_max
+
+
+def analysis_backend(args):
+    """
+    Returns: the aggregation backend that --backend resolves to in this run.
+    """
+    # The HyperLogLog sketches of --distinct-error are only filled by the pure-Python loop
+    if args.backend == 'numpy' and args.distinct_error is None:
+        return 'numpy'
+    return 'python'
+
+
+def load_product_map(args, product_ids=None, log=print):
+    """
+    Loads the product mapping, through the on-disk cache unless --no-cache is set.
+    In demand mode, product_ids (from collect_product_ids) limits fetching to
+    the products the sales data actually references. Status lines go to
+    log, so a background fetch can hand them over instead of printing.
+    Returns: dict (product ID -> details), empty if nothing could be loaded.
+    """
+    if args.enrich_mode == 'demand' and product_ids is not None:
+        ttl = 0 if args.no_cache else args.cache_ttl
+        product_map, fetched = get_product_mapping_for_ids(product_ids.values(), ttl=ttl, base_url=args.api_url)
+        log(f" ✓ {len(product_ids)} distinct products referenced, {fetched} fetched from API")
+        return product_map
+    if args.enrich_mode == 'demand':
+        log(" ! Demand mode needs the product IDs up front; using the full catalog")
+
+    if args.no_cache:
+        api_products = fetch_all_products(args.api_url)
+        if api_products:
+             log(f" ✓ Fetched {len(api_products)} products")
+        else:
+             log(" ! API fetch failed. Proceeding without enrichment.")
+        return create_product_mapping(api_products) if api_products else {}
+
+    product_map, status = get_product_mapping(ttl=args.cache_ttl, base_url=args.api_url)
+    if status == 'hit':
+        log(f" ✓ Loaded {len(product_map)} products from cache")
+    elif status == 'stale':
+        log(f" ✓ Loaded {len(product_map)} products from stale cache (refreshing in background)")
+    elif status == 'miss':
+        log(f" ✓ Fetched {len(product_map)} products and cached them")
+    else:
+        log(" ! API fetch failed and no cached catalog. Proceeding without enrichment.")
+    log(f" ✓ Cache stats: {cache_stats['hit']} hit / {cache_stats['miss']} miss / {cache_stats['stale']} stale")
+    return product_map
+
+
+def rollup_cube(args, enriched_rows, extend=False):
+    """
+    With --cube, folds this run's enriched rows into the rollup cube and saves
+    it. The cube is rebuilt from the rows, or with extend=True they are added
+    to the saved cube (incremental runs).
+    Returns: the cube, or None without --cube.
+    """
+    if not args.cube:
+        return None
+    with profiler.stage('cube') as stage:
+        cube = (load_cube(args.cube) if extend else None) or new_cube()
+        update_cube(cube, enriched_rows)
+        save_cube(cube, args.cube)
+        stage['rows'] = len(enriched_rows)
+    print(f" ✓ Rollup cube saved to: {args.cube} ({len(cube['days'])} days, {cube['rows']} rows)")
+    return cube
+
+
+def run_streaming(file_path, args):
+    """
+    Runs the pipeline with lazy generator stages: every record flows from the
+    file through parsing, validation, enrichment, aggregation and saving
+    one at a time, so memory stays flat regardless of the input size.
+    """
+    # --- STEP 1: LOAD DATA ---
+    print("\n[1/10] Reading sales data (streaming)...")
+    try:
+        encoding = detect_encoding(file_path)
+    except FileNotFoundError:
+        print(f"Error: Could not find the file at {file_path}")
+        encoding = None
+    if encoding is None:
+        print("[FAIL] No data found. Exiting.")
+        return
+    line_count = [0]
+
+    def counted_lines():
+        for line in iter_sales_data(file_path, encoding):
+            line_count[0] += 1
+            yield line
+
+    print(f" ✓ Opened {file_path} ({encoding})")
+
+    # --- STEP 2: PARSE DATA ---
+    print("\n[2/10] Parsing and cleaning data (lazy)...")
+    parsed_stream = iter_parse_transactions(counted_lines())
+    print(" ✓ Parser stage ready")
+
+    # --- STEP 3: DISPLAY FILTER OPTIONS ---
+    print("\n[3/10] Filter Options Available:")
+    print(" Not listed in streaming mode (it would need an extra pass over the file)")
+
+    # --- STEP 4 & 5: USER INTERACTION ---
+    filter_region, filter_min, filter_max = prompt_filters(interactive=not args.no_prompt)
+
+    # --- STEP 6: VALIDATE & FILTER ---
+    print("\n[4/10] Validating transactions (lazy)...")
+    summary = {}
+    valid_stream = iter_validate_and_filter(
+        parsed_stream,
+        region=filter_region,
+        min_amount=filter_min,
+        max_amount=filter_max,
+        summary=summary
+    )
+    print(" ✓ Validation stage ready")
+
+    # --- STEP 7: ANALYSIS ---
+    print("\n[5/10] Analyzing sales data...")
+    print(" ✓ Metrics will be aggregated while the enriched data is saved")
+
+    # --- STEP 8: API FETCH ---
+    print("\n[6/10] Fetching product data from API...")
+    with profiler.stage('fetch') as stage:
+        product_map = load_product_map(args)
+        stage['rows'] = len(product_map)
+
+    # --- STEP 9: ENRICHMENT ---
+    print("\n[7/10] Enriching sales data (lazy)...")
+    stats = aggregate_transactions([], distinct_error=args.distinct_error, customer_counters=args.approx_customers)
+    if args.approx_customers:
+        print(f" ✓ Top customers are tracked in {args.approx_customers} Space-Saving counters (approximate)")
+    enrichment_summary = summarize_enrichment([])
+    enriched_stream = iter_aggregate(
+        iter_enrich_sales_data(valid_stream, product_map, summary=enrichment_summary),
+        stats
+    )
+    cube = None
+    if args.cube:
+        cube = new_cube()
+        enriched_stream = iter_update_cube(enriched_stream, cube)
+
+    # --- STEP 10: SAVE DATA ---
+    print("\n[8/10] Streaming records to enriched data file...")
+    # Reading, parsing, validation, enrichment and aggregation all run inside this stage
+    with profiler.stage('read+parse+validate+enrich+save') as stage:
+        # The rows are only known once they have streamed through, so an empty
+        # result must not replace the file saved by an earlier run
+        save_success = save_enriched_data(enriched_stream, "data/enriched_sales_data.txt", require_rows=True)
+        stage['rows'] = line_count[0]
+    if save_success:
+        print(" ✓ Saved to: data/enriched_sales_data.txt")
+        if cube is not None:
+            save_cube(cube, args.cube)
+            print(f" ✓ Rollup cube saved to: {args.cube} ({len(cube['days'])} days, {cube['rows']} rows)")
+    print(f" ✓ Read {line_count[0]} lines | Parsed {summary.get('total_input', 0)} records")
+    print(f" ✓ Valid: {summary.get('final_count', 0)} | Invalid: {summary.get('invalid', 0)}")
+    if filter_region or filter_min or filter_max:
+         print(f" ✓ Filtered Result: Keeping {summary.get('final_count', 0)} out of {summary.get('total_input', 0)} records")
+
+    matches = enrichment_summary['matches']
+    total = enrichment_summary['total']
+    match_rate = (matches / total) * 100 if total > 0 else 0
+    print(f" ✓ Enriched {matches}/{total} transactions ({match_rate:.1f}%)")
+
+    if not stats['transaction_count']:
+        print("[FAIL] No valid data remaining after filtering. Exiting.")
+        return
+
+    # --- STEP 11: GENERATE REPORT ---
+    print("\n[9/10] Generating report...")
+    with profiler.stage('report') as stage:
+        report_success = generate_sales_report(
+            None, None, "output/sales_report.txt",
+            stats=stats, enrichment_summary=enrichment_summary
+        )
+        stage['rows'] = stats['transaction_count']
+    if report_success:
+        print(" ✓ Report saved to: output/sales_report.txt")
+
+
+def run_parallel(file_path, args):
+    """
+    Runs the pipeline with parsing, validation and aggregation spread over
+    a process pool. The partial aggregates are merged in file order, so
+    the saved data and the report match the serial run. With --input, the
+    listed files are processed concurrently and merged into one result.
+    """
+    # --- STEP 1-3: FILTER OPTIONS ---
+    workers = args.workers
+    print(f"\n[1/10] Reading sales data ({workers} workers)...")
+    if args.inputs:
+        paths = expand_sales_paths(args.inputs)
+        if not paths:
+            print(f"Error: No sales files found in {', '.join(args.inputs)}")
+            print("[FAIL] No data found. Exiting.")
+            return
+        print(f" ✓ Found {len(paths)} sales files")
+    print("\n[2/10] Parsing and cleaning data (in workers)...")
+    print("\n[3/10] Filter Options Available:")
+    print(" Not listed in parallel mode (it would need an extra pass over the file)")
+
+    # --- STEP 4 & 5: USER INTERACTION ---
+    filter_region, filter_min, filter_max = prompt_filters(interactive=not args.no_prompt)
+
+    # --- STEP 6: VALIDATE & FILTER ---
+    print("\n[4/10] Parsing and validating transactions in parallel...")
+    try:
+        # Worker CPU time is not part of this stage's cpu_s
+        with profiler.stage('read+parse+validate+aggregate') as stage:
+            if args.inputs:
+                stats, summary, valid_data = process_files_parallel(
+                    paths, workers,
+                    region=filter_region,
+                    min_amount=filter_min,
+                    max_amount=filter_max,
+                    distinct_error=args.distinct_error
+                )
+            else:
+                stats, summary, valid_data = process_file_parallel(
+                    file_path, workers,
+                    region=filter_region,
+                    min_amount=filter_min,
+                    max_amount=filter_max,
+                    distinct_error=args.distinct_error
+                )
+            stage['rows'] = summary['total_input']
+    except FileNotFoundError as e:
+        print(f"Error: Could not find the file at {e.filename or file_path}")
+        print("[FAIL] No data found. Exiting.")
+        return
+    print(f" ✓ Parsed {summary['total_input']} records")
+    print(f" ✓ Valid: {len(valid_data)} | Invalid: {summary['invalid']}")
+    if filter_region or filter_min or filter_max:
+         print(f" ✓ Filtered Result: Keeping {len(valid_data)} out of {summary['total_input']} records")
+
+    if not valid_data:
+        print("[FAIL] No valid data remaining after filtering. Exiting.")
+        return
+
+    # --- STEP 7: ANALYSIS ---
+    print("\n[5/10] Analyzing sales data...")
+    print(" ✓ Partial aggregates merged from all workers")
+
+    # --- STEP 8: API FETCH ---
+    print("\n[6/10] Fetching product data from API...")
+    with profiler.stage('fetch') as stage:
+        product_ids = collect_product_ids(valid_data)
+        product_map = load_product_map(args, product_ids)
+        stage['rows'] = len(product_map)
+
+    # --- STEP 9: ENRICHMENT ---
+    print("\n[7/10] Enriching sales data...")
+    with profiler.stage('enrich') as stage:
+        enrichment_summary = summarize_enrichment([])
+        enriched_data = enrich_sales_data(valid_data, product_map, product_ids, enrichment_summary)
+        stage['rows'] = len(enriched_data)
+    matches = enrichment_summary['matches']
+    match_rate = (matches / len(valid_data)) * 100
+    print(f" ✓ Enriched {matches}/{len(valid_data)} transactions ({match_rate:.1f}%)")
+
+    # --- STEP 10: SAVE DATA ---
+    print("\n[8/10] Saving enriched data...")
+    with profiler.stage('save') as stage:
+        save_success = save_enriched_data(enriched_data, "data/enriched_sales_data.txt")
+        stage['rows'] = len(enriched_data)
+    if save_success:
+        print(" ✓ Saved to: data/enriched_sales_data.txt")
+    rollup_cube(args, enriched_data)
+
+    # --- STEP 11: GENERATE REPORT ---
+    print("\n[9/10] Generating report...")
+    with profiler.stage('report') as stage:
+        report_success = generate_sales_report(
+            valid_data, enriched_data, "output/sales_report.txt",
+            stats=stats, enrichment_summary=enrichment_summary
+        )
+        stage['rows'] = stats['transaction_count']
+    if report_success:
+        print(" ✓ Report saved to: output/sales_report.txt")
+
+
+def run_incremental(file_path, args):
+    """
+    Processes only the rows appended to the sales file since the last run.
+    Their aggregates are merged into the persisted state, the enriched rows are
+    appended to the enriched data file, and the report is regenerated from
+    the merged state.
+    """
+    # --- STEP 1-3: FILTER OPTIONS ---
+    print("\n[1/10] Reading sales data (incremental)...")
+    print("\n[2/10] Parsing and cleaning data (new rows only)...")
+    print("\n[3/10] Filter Options Available:")
+    print(" Not listed in incremental mode (it would need a pass over the whole file)")
+
+    # --- STEP 4 & 5: USER INTERACTION ---
+    filter_region, filter_min, filter_max = prompt_filters(interactive=not args.no_prompt)
+
+    # --- STEP 6: VALIDATE & FILTER ---
+    print("\n[4/10] Validating new transactions...")
+    try:
+        with profiler.stage('read+parse+validate+aggregate') as stage:
+            state, new_rows, resumed = process_incremental(
+                file_path,
+                region=filter_region,
+                min_amount=filter_min,
+                max_amount=filter_max,
+                distinct_error=args.distinct_error
+            )
+            stage['rows'] = len(new_rows)
+    except FileNotFoundError:
+        print(f"Error: Could not find the file at {file_path}")
+        print("[FAIL] No data found. Exiting.")
+        return
+    if resumed:
+        print(f" ✓ Resumed from saved state; processed up to byte {state['offset']}")
+    else:
+        print(f" ✓ No usable saved state; processed the whole file ({state['offset']} bytes)")
+    print(f" ✓ New valid rows: {len(new_rows)} | Total valid: {state['summary'].get('final_count', 0)}"
+          f" | Total invalid: {state['summary'].get('invalid', 0)}")
+
+    if not state['stats']['transaction_count']:
+        print("[FAIL] No valid data remaining after filtering. Exiting.")
+        return
+
+    # --- STEP 7: ANALYSIS ---
+    print("\n[5/10] Analyzing sales data...")
+    print(" ✓ New rows merged into the saved aggregates")
+
+    # --- STEP 8: API FETCH ---
+    print("\n[6/10] Fetching product data from API...")
+    with profiler.stage('fetch') as stage:
+        product_ids = collect_product_ids(new_rows)
+        product_map = load_product_map(args, product_ids) if new_rows else {}
+        stage['rows'] = len(product_map)
+    if not new_rows:
+        print(" ✓ No new rows to enrich")
+
+    # --- STEP 9: ENRICHMENT ---
+    print("\n[7/10] Enriching new sales data...")
+    with profiler.stage('enrich') as stage:
+        enriched_rows = enrich_sales_data(new_rows, product_map, product_ids, state['enrichment'])
+        stage['rows'] = len(enriched_rows)
+    print(f" ✓ Enriched {state['enrichment']['matches']}/{state['enrichment']['total']} transactions in total")
+
+    # --- STEP 10: SAVE DATA ---
+    print("\n[8/10] Saving enriched data...")
+    with profiler.stage('save') as stage:
+        save_success = save_enriched_data(enriched_rows, "data/enriched_sales_data.txt", append=resumed)
+        stage['rows'] = len(enriched_rows)
+    if save_success:
+        save_state(state)
+        print(" ✓ Saved to: data/enriched_sales_data.txt")
+        rollup_cube(args, enriched_rows, extend=resumed)
+
+    # --- STEP 11: GENERATE REPORT ---
+    print("\n[9/10] Generating report...")
+    with profiler.stage('report') as stage:
+        report_success = generate_sales_report(
+            None, None, "output/sales_report.txt",
+            stats=state['stats'], enrichment_summary=state['enrichment']
+        )
+        stage['rows'] = state['stats']['transaction_count']
+    if report_success:
+        print(" ✓ Report saved to: output/sales_report.txt")
+
+
+def run_async(file_path, args):
+    """
+    Runs the serial pipeline with the product catalog fetch started at once
+    in the background. Reading, parsing, indexing and the filter prompt run
+    while the catalog downloads; enrichment waits for both. Each stage's
+    start and end time (seconds since start) is printed, along with how long
+    the fetch overlapped the local work.
+    """
+    # asyncio is only imported for this mode; it is one of the slowest imports at startup
+    import asyncio
+
+    return asyncio.run(_run_async(file_path, args))
+
+
+async def _run_async(file_path, args):
+    import asyncio
+
+    started = time.perf_counter()
+    spans = {}
+
+    def profiled(stage, rows, func, *func_args):
+        # Runs in the worker thread, so the stage's CPU time is that thread's
+        with profiler.stage(stage) as record:
+            result = func(*func_args)
+            if rows is None and isinstance(result, list):
+                rows = len(result)
+            record['rows'] = rows
+            return result
+
+    async def in_thread(stage, func, *func_args, rows=None):
+        begin = time.perf_counter() - started
+        try:
+            return await asyncio.to_thread(profiled, stage, rows, func, *func_args)
+        finally:
+            spans[stage] = (begin, time.perf_counter() - started)
+            print(f" ⏱ {stage}: {begin:.2f}s → {spans[stage][1]:.2f}s")
+
+    # Catalog status lines are printed at step 6 instead of mid-way through parsing
+    catalog_log = []
+    fetch = None
+    if args.enrich_mode == 'demand':
+        print("\n ! Demand mode needs the product IDs first; the fetch starts after validation")
+    else:
+        fetch = asyncio.create_task(in_thread('catalog fetch', load_product_map, args, None, catalog_log.append))
+        print("\n ✓ Product catalog fetch started in the background")
+
+    # --- STEP 1: LOAD DATA ---
+    print("\n[1/10] Reading sales data...")
+    raw_data = await in_thread('read', read_sales_data, file_path)
+    if not raw_data:
+        print("[FAIL] No data found. Exiting.")
+        if fetch is not None:
+            await fetch
+        return
+    print(f" ✓ Successfully read {len(raw_data)} transactions")
+
+    # --- STEP 2: PARSE DATA ---
+    print("\n[2/10] Parsing and cleaning data...")
+    parsed_data = await in_thread('parse', parse_transactions, raw_data, rows=len(raw_data))
+    del raw_data
+    print(f" ✓ Parsed {len(parsed_data)} records")
+
+    # --- STEP 3: DISPLAY FILTER OPTIONS ---
+    print("\n[3/10] Filter Options Available:")
+    index = await in_thread('index', TransactionIndex, parsed_data, rows=len(parsed_data))
+    regions, min_amt, max_amt = index.options
+    print(f" Regions: {', '.join(regions)}")
+    print(f" Amount Range: ${min_amt or 0:,.2f} - ${max_amt or 0:,.2f}")
+
+    # --- STEP 4 & 5: USER INTERACTION ---
+    # input() blocks the event loop, but the fetch keeps running in its thread
+    filter_region, filter_min, filter_max = prompt_filters(regions, interactive=not args.no_prompt)
+
+    # --- STEP 6: VALIDATE & FILTER ---
+    print("\n[4/10] Validating transactions...")
+    with profiler.stage('validate') as stage:
+        valid_data, invalid_count, summary = index.filter(filter_region, filter_min, filter_max)
+        stage['rows'] = summary['total_input']
+    print(f" ✓ Valid: {len(valid_data)} | Invalid: {invalid_count}")
+    if filter_region or filter_min or filter_max:
+         print(f" ✓ Filtered Result: Keeping {len(valid_data)} out of {summary['total_input']} records")
+    local_done = time.perf_counter() - started
+
+    if not valid_data:
+        print("[FAIL] No valid data remaining after filtering. Exiting.")
+        if fetch is not None:
+            await fetch
+        return
+
+    # --- STEP 7: ANALYSIS ---
+    print("\n[5/10] Analyzing sales data...")
+    stats = await in_thread('analyze', index.aggregate, filter_region, filter_min, filter_max,
+                            args.distinct_error, rows=len(valid_data))
+    print(" ✓ Analysis complete")
+
+    # --- STEP 8: API FETCH ---
+    print("\n[6/10] Fetching product data from API...")
+    product_ids = collect_product_ids(valid_data)
+    if fetch is None:
+        fetch = in_thread('catalog fetch', load_product_map, args, product_ids, catalog_log.append)
+    product_map = await fetch
+    for line in catalog_log:
+        print(line)
+    fetch_start, fetch_end = spans['catalog fetch']
+    overlap = max(0.0, min(fetch_end, local_done) - fetch_start)
+    waited = max(0.0, fetch_end - spans['analyze'][1])
+    print(f" ✓ Fetch overlapped local work for {overlap:.2f}s; enrichment waited {waited:.2f}s for it")
+
+    # --- STEP 9: ENRICHMENT ---
+    print("\n[7/10] Enriching sales data...")
+    with profiler.stage('enrich') as stage:
+        enrichment_summary = summarize_enrichment([])
+        enriched_data = enrich_sales_data(valid_data, product_map, product_ids, enrichment_summary)
+        stage['rows'] = len(enriched_data)
+    matches = enrichment_summary['matches']
+    match_rate = (matches / len(valid_data)) * 100
+    print(f" ✓ Enriched {matches}/{len(valid_data)} transactions ({match_rate:.1f}%)")
+
+    # --- STEP 10: SAVE DATA ---
+    print("\n[8/10] Saving enriched data...")
+    save_success = await in_thread('save', save_enriched_data, enriched_data, "data/enriched_sales_data.txt",
+                                   rows=len(enriched_data))
+    if save_success:
+        print(" ✓ Saved to: data/enriched_sales_data.txt")
+    rollup_cube(args, enriched_data)
+
+    # --- STEP 11: GENERATE REPORT ---
+    print("\n[9/10] Generating report...")
+    with profiler.stage('report') as stage:
+        report_success = generate_sales_report(
+            valid_data, enriched_data, "output/sales_report.txt",
+            stats=stats, enrichment_summary=enrichment_summary
+        )
+        stage['rows'] = stats['transaction_count']
+    if report_success:
+        print(" ✓ Report saved to: output/sales_report.txt")
+    print(f" ✓ End to end: {time.perf_counter() - started:.2f}s")
+
+
+def run_cube_report(file_path, args):
+    """
+    Answers from the saved rollup cube without reading the sales file: the
+    report for the --from/--to window and, with --rollup, a table of the
+    window's buckets.
+    """
+    cube_file = args.cube
+    print(f"\n[1/10] Loading rollup cube from {cube_file}...")
+    with profiler.stage('load cube') as stage:
+        cube = load_cube(cube_file)
+        stage['rows'] = cube['rows'] if cube else 0
+    if cube is None:
+        print(f"[FAIL] No rollup cube at {cube_file}. Run the pipeline with --cube first.")
+        return
+    window = f"{args.date_from or 'first day'} to {args.date_to or 'last day'}"
+    print(f" ✓ {cube['rows']} rows over {len(cube['days'])} days; window: {window}")
+
+    if args.rollup:
+        print(f"\n Sales per {args.rollup}:")
+        print(f" {args.rollup.title():<25} | {'Revenue':<15} | {'Qty':<8} | {'Trans':<6}")
+        print(" " + "-" * 62)
+        with profiler.stage('rollup'):
+            buckets = cube_rollup(cube, args.rollup, args.date_from, args.date_to)
+        for key, data in buckets.items():
+            print(f" {key:<25} | ${data['revenue']:<14,.2f} | {data['quantity']:<8} | {data['transaction_count']:<6}")
+
+    if args.date_from or args.date_to or not args.rollup:
+        print("\n[9/10] Generating report...")
+        with profiler.stage('report') as stage:
+            report_success = generate_sales_report(
+                None, None, "output/sales_report.txt",
+                cube=cube, start_date=args.date_from, end_date=args.date_to
+            )
+        if report_success:
+            print(f" ✓ Report for {window} saved to: output/sales_report.txt")
+
+
+def run_batch(file_path, args):
+    """
+    Runs every --scenario/--scenarios filter without prompting. The sales
+    data is read, parsed, indexed, enriched and saved once; each scenario
+    then takes its rows from the index (the rows validate_and_filter would
+    keep) and gets its own report in the reports directory.
+    """
+    scenarios = list(args.scenario or [])
+    if args.scenarios_file:
+        scenarios.extend(load_scenarios(args.scenarios_file))
+    if not scenarios:
+        print("[FAIL] No filter scenarios given. Exiting.")
+        return
+
+    # Report file names come from the scenario names, made unique
+    used_names = set()
+    for scenario in scenarios:
+        base = re.sub(r'[^\w.-]+', '_', scenario['name']).strip('._') or 'scenario'
+        name = base
+        suffix = 2
+        while name in used_names:
+            name = f"{base}_{suffix}"
+            suffix += 1
+        used_names.add(name)
+        scenario['report'] = os.path.join(args.reports_dir, f"{name}.txt")
+
+    # --- STEP 1: LOAD DATA ---
+    print(f"\n[1/10] Reading sales data ({len(scenarios)} scenarios)...")
+    paths = [file_path]
+    if args.inputs:
+        paths = expand_sales_paths(args.inputs)
+        print(f" ✓ Found {len(paths)} sales files")
+    with profiler.stage('read') as stage:
+        raw_data = []
+        for path in paths:
+            raw_data.extend(read_sales_data(path))
+        stage['rows'] = len(raw_data)
+    if not raw_data:
+        print("[FAIL] No data found. Exiting.")
+        return
+    print(f" ✓ Successfully read {len(raw_data)} transactions")
+
+    # --- STEP 2: PARSE DATA ---
+    print("\n[2/10] Parsing and cleaning data...")
+    with profiler.stage('parse') as stage:
+        parsed_data = parse_transactions(raw_data)
+        stage['rows'] = len(raw_data)
+    del raw_data
+    print(f" ✓ Parsed {len(parsed_data)} records")
+
+    # --- STEP 3: DISPLAY FILTER OPTIONS ---
+    print("\n[3/10] Filter Options Available:")
+    # One validation pass builds the index every scenario is answered from
+    with profiler.stage('index') as stage:
+        index = TransactionIndex(parsed_data)
+        stage['rows'] = len(parsed_data)
+    regions, min_amt, max_amt = index.options
+    print(f" Regions: {', '.join(regions)}")
+    print(f" Amount Range: ${min_amt or 0:,.2f} - ${max_amt or 0:,.2f}")
+
+    # --- STEP 6: VALIDATE & FILTER ---
+    print("\n[4/10] Validating transactions...")
+    with profiler.stage('validate') as stage:
+        valid_data, invalid_count, _ = index.filter()
+        stage['rows'] = len(parsed_data)
+    print(f" ✓ Valid: {len(valid_data)} | Invalid: {invalid_count}")
+    for scenario in scenarios:
+        if scenario['region'] and scenario['region'] not in regions:
+            print(f" ! Scenario {scenario['name']}: no transactions in region {scenario['region']}")
+
+    if not valid_data:
+        print("[FAIL] No valid data remaining after filtering. Exiting.")
+        return
+
+    # --- STEP 8: API FETCH ---
+    # Every scenario's rows are valid rows, so fetching and enriching them all once covers each one
+    print("\n[6/10] Fetching product data from API...")
+    with profiler.stage('fetch') as stage:
+        product_ids = collect_product_ids(valid_data)
+        product_map = load_product_map(args, product_ids)
+        stage['rows'] = len(product_map)
+
+    # --- STEP 9: ENRICHMENT ---
+    print("\n[7/10] Enriching sales data...")
+    with profiler.stage('enrich') as stage:
+        enrichment_summary = summarize_enrichment([])
+        enriched_data = enrich_sales_data(valid_data, product_map, product_ids, enrichment_summary)
+        stage['rows'] = len(enriched_data)
+    matches = enrichment_summary['matches']
+    print(f" ✓ Enriched {matches}/{len(valid_data)} transactions ({matches / len(valid_data) * 100:.1f}%)")
+
+    # --- STEP 10: SAVE DATA ---
+    print("\n[8/10] Saving enriched data...")
+    with profiler.stage('save') as stage:
+        save_success = save_enriched_data(enriched_data, "data/enriched_sales_data.txt")
+        stage['rows'] = len(enriched_data)
+    if save_success:
+        print(" ✓ Saved to: data/enriched_sales_data.txt")
+
+    # --- STEP 7 & 11: ANALYSIS & REPORTS ---
+    # Rows are enriched in place, so each scenario's rows already carry their API columns
+    print(f"\n[9/10] Analyzing and reporting {len(scenarios)} scenarios ({analysis_backend(args)} backend)...")
+    results = []
+    with profiler.stage('scenarios') as stage:
+        stage['rows'] = 0
+        for scenario in scenarios:
+            region = scenario['region']
+            min_amount = scenario['min_amount']
+            max_amount = scenario['max_amount']
+            rows = index.filter(region, min_amount, max_amount)[0]
+            stage['rows'] += len(rows)
+            if not rows:
+                results.append((scenario, 0, 0.0, None))
+                continue
+            stats = index.aggregate(region, min_amount, max_amount, distinct_error=args.distinct_error,
+                                    backend=args.backend)
+            report_success = generate_sales_report(
+                None, None, scenario['report'],
+                stats=stats, enrichment_summary=summarize_enrichment(rows)
+            )
+            results.append((scenario, len(rows), stats['total_revenue'],
+                            scenario['report'] if report_success else None))
+
+    print(f"\n {'Scenario':<30} | {'Rows':<8} | {'Revenue':<15} | Report")
+    print(" " + "-" * 80)
+    for scenario, row_count, revenue, report in results:
+        if report is None:
+            report = "(no rows, not written)" if not row_count else "(failed)"
+        print(f" {scenario['name']:<30} | {row_count:<8} | ${revenue:<14,.2f} | {report}")
+
+
+def run_serve(file_path, args):
+    """
+    Loads, indexes and enriches the sales file once, then answers metric
+    queries over HTTP from memory until interrupted. Rows appended to the
+    file meanwhile are folded in by a watcher (see utils/service.py).
+    """
+    # --- STEP 1-9: LOAD, INDEX & ENRICH ONCE ---
+    print("\n[1/10] Loading sales data into memory...")
+    dataset = SalesDataset(
+        file_path,
+        lambda product_ids: load_product_map(args, product_ids),
+        refetch_missing=args.enrich_mode == 'demand',
+        distinct_error=args.distinct_error
+    )
+    try:
+        with profiler.stage('load') as stage:
+            dataset.load()
+            stage['rows'] = len(dataset.index)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"Error: Could not load {file_path}: {e}")
+        print("[FAIL] No data found. Exiting.")
+        return
+    regions, min_amt, max_amt = dataset.index.options
+    enrichment = dataset.enrichment
+    print(f" ✓ Loaded {len(dataset.index)} records ({dataset.index.invalid} invalid) "
+          f"| Enriched {enrichment['matches']}/{enrichment['total']} transactions")
+    print(f" Regions: {', '.join(regions)}")
+    print(f" Amount Range: ${min_amt or 0:,.2f} - ${max_amt or 0:,.2f}")
+
+    # --- STEP 10: SERVE QUERIES ---
+    print("\n[9/10] Serving metric queries...")
+    serve(dataset, args.host, args.port, socket_path=args.socket, watch_interval=args.watch_interval)
+
+
+def run_serial(file_path, args):
+    """
+    Runs the pipeline one step after another with all rows in memory.
+    """
+    # --- STEP 1: LOAD DATA ---
+    print("\n[1/10] Reading sales data...")
+    parsed_data = None
+    if args.snapshot and snapshot_matches(PARSED_SNAPSHOT, file_path):
+        with profiler.stage('load snapshot') as stage:
+            parsed_data = load_snapshot(PARSED_SNAPSHOT)
+            stage['rows'] = len(parsed_data or ())
+
+    if parsed_data is not None:
+        print(f" ✓ Restored {len(parsed_data)} parsed records from {PARSED_SNAPSHOT}")
+
+        # --- STEP 2: PARSE DATA ---
+        print("\n[2/10] Parsing and cleaning data...")
+        print(" ✓ Skipped, the snapshot matches the sales file")
+    else:
+        with profiler.stage('read') as stage:
+            raw_data = read_sales_data(file_path)
+            stage['rows'] = len(raw_data)
+        if not raw_data:
+            print("[FAIL] No data found. Exiting.")
+            return
+        print(f" ✓ Successfully read {len(raw_data)} transactions")
+
+        # --- STEP 2: PARSE DATA ---
+        print("\n[2/10] Parsing and cleaning data...")
+        with profiler.stage('parse') as stage:
+            parsed_data = parse_transactions(raw_data)
+            stage['rows'] = len(raw_data)
+        del raw_data
+        print(f" ✓ Parsed {len(parsed_data)} records")
+        if args.snapshot:
+            with profiler.stage('save snapshot') as stage:
+                stage['rows'] = len(parsed_data)
+                if save_snapshot(parsed_data, PARSED_SNAPSHOT, source=file_path):
+                    print(f" ✓ Snapshot saved to: {PARSED_SNAPSHOT}")
+
+    # --- STEP 3: DISPLAY FILTER OPTIONS ---
+    print("\n[3/10] Filter Options Available:")
+    # Index the parsed rows once; options, filtering and stats come from it
+    with profiler.stage('index') as stage:
+        index = TransactionIndex(parsed_data)
+        stage['rows'] = len(parsed_data)
+    regions, min_amt, max_amt = index.options
+    min_amt = min_amt or 0
+    max_amt = max_amt or 0
+
+    print(f" Regions: {', '.join(regions)}")
+    print(f" Amount Range: ${min_amt:,.2f} - ${max_amt:,.2f}")
+
+    # --- STEP 4 & 5: USER INTERACTION ---
+    filter_region, filter_min, filter_max = prompt_filters(regions, interactive=not args.no_prompt)
+
+    # --- STEP 6: VALIDATE & FILTER ---
+    print("\n[4/10] Validating transactions...")
+    with profiler.stage('validate') as stage:
+        valid_data, invalid_count, summary = index.filter(
+            region=filter_region,
+            min_amount=filter_min,
+            max_amount=filter_max
+        )
+        stage['rows'] = summary['total_input']
+    print(f" ✓ Valid: {len(valid_data)} | Invalid: {invalid_count}")
+    if filter_region or filter_min or filter_max:
+         print(f" ✓ Filtered Result: Keeping {len(valid_data)} out of {summary['total_input']} records")
+
+    if not valid_data:
+        print("[FAIL] No valid data remaining after filtering. Exiting.")
+        return
+
+    # --- STEP 7: ANALYSIS ---
+    print("\n[5/10] Analyzing sales data...")
+    with profiler.stage('analyze') as stage:
+        stats = index.aggregate(filter_region, filter_min, filter_max, distinct_error=args.distinct_error,
+                                backend=args.backend)
+        stage['rows'] = len(valid_data)
+    print(f" ✓ Analysis complete ({analysis_backend(args)} backend): {stats['transaction_count']} transactions, "
+          f"{len(stats['products'])} products, {len(stats['customers'])} customers")
+
+    # --- STEP 8: API FETCH ---
+    print("\n[6/10] Fetching product data from API...")
+    with profiler.stage('fetch') as stage:
+        product_ids = collect_product_ids(valid_data)
+        product_map = load_product_map(args, product_ids)
+        stage['rows'] = len(product_map)
+
+    # --- STEP 9: ENRICHMENT ---
+    print("\n[7/10] Enriching sales data...")
+    with profiler.stage('enrich') as stage:
+        enrichment_summary = summarize_enrichment([])
+        enriched_data = enrich_sales_data(valid_data, product_map, product_ids, enrichment_summary)
+        stage['rows'] = len(enriched_data)
+
+    matches = enrichment_summary['matches']
+    if len(valid_data) > 0:
+        match_rate = (matches / len(valid_data)) * 100
+    else:
+        match_rate = 0
+    print(f" ✓ Enriched {matches}/{len(valid_data)} transactions ({match_rate:.1f}%)")
+
+    # --- STEP 10: SAVE DATA ---
+    print("\n[8/10] Saving enriched data...")
+    with profiler.stage('save') as stage:
+        save_success = save_enriched_data(enriched_data, "data/enriched_sales_data.txt")
+        stage['rows'] = len(enriched_data)
+    if save_success:
+        print(" ✓ Saved to: data/enriched_sales_data.txt")
+    rollup_cube(args, enriched_data)
+
+    # --- STEP 11: GENERATE REPORT ---
+    print("\n[9/10] Generating report...")
+    with profiler.stage('report') as stage:
+        report_success = generate_sales_report(
+            valid_data, enriched_data, "output/sales_report.txt",
+            stats=stats, enrichment_summary=enrichment_summary
+        )
+        stage['rows'] = stats['transaction_count']
+    if report_success:
+        print(" ✓ Report saved to: output/sales_report.txt")
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    print("==========================================")
+    print("          SALES ANALYTICS SYSTEM          ")
+    print("==========================================")
+
+    mode = pick_mode(args)
+    run = {
+        'cube': run_cube_report,
+        'serve': run_serve,
+        'batch': run_batch,
+        'async': run_async,
+        'stream': run_streaming,
+        'incremental': run_incremental,
+        'parallel': run_parallel,
+        'serial': run_serial
+    }[mode]
+
+    profiler.start(trace_memory=args.profile_memory, cprofile=bool(args.cprofile))
+    profiler.instrument(data_processor, METRIC_FUNCTIONS)
+    try:
+        run("data/sales_data.txt", args)
+
+        # --- FINAL SUCCESS ---
+        print("\n[10/10] Process Complete!")
+        print("==========================================")
+
+    except Exception as e:
+        print(f"\n[CRITICAL ERROR] An unexpected error occurred: {e}")
+        import traceback
+        traceback.print_exc()
+
+    finally:
+        profile = profiler.finish(args.profile, args.cprofile, {'mode': mode, 'backend': args.backend})
+        if args.profile:
+            print(f" ⏱ {profile['total_wall_s']:.2f}s in total; profile saved to: {args.profile}")
+
+if __name__ == "__main__":
+    main()
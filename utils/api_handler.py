@@ -1,63 +1,167 @@
-import requests
-
-def fetch_all_products():
-    """
-    Fetches all available products from the DummyJSON API (limit=100).
-    Returns: list of simplified product dictionaries.
-    """
-    url = "https://dummyjson.com/products?limit=100"
-    
-    print(f"Connecting to API: {url}")
-    
-    try:
-        response = requests.get(url, timeout=10)
-        
-        response.raise_for_status()
-        
-        data = response.json()
-        raw_products = data.get('products', [])
-        
-        
-        if raw_products:
-            print(f"Success: Fetched {len(raw_products)} products.")
-        else:
-            print("Warning: API returned 0 products.")
-            
-        return raw_products
-
-    except requests.exceptions.RequestException as e:
-        print(f"API Error: {e}")
-        return []
-
-if __name__ == "__main__":
-    products = fetch_all_products()
-    if products:
-        print("\n--- Sample Product ---")
-        print(products[0])
-
-
-    # ...Part 3.2(b) ...
-
-def create_product_mapping(api_products):
-    """
-    Creates a mapping of product IDs to product info.
-    Args:
-        api_products (list): List of product dictionaries from the API.
-    Returns:
-        dict: Mapping where key is Product ID and value is product details.
-    """
-    mapping = {}
-    
-    for product in api_products:
-        p_id = product.get('id')
-        
-        details = {
-            'title': product.get('title'),
-            'category': product.get('category'),
-            'brand': product.get('brand'),
-            'rating': product.get('rating')
-        }
-        
-        mapping[p_id] = details
-        
+# requests (with urllib3) and the thread pool are imported by the functions
+# that talk to the API, so runs served from the catalog cache never pay for them
+
+API_BASE_URL = "https://dummyjson.com"
+
+# The only product fields create_product_mapping uses ('id' is always returned)
+PRODUCT_FIELDS = ('title', 'category', 'brand', 'rating')
+
+def create_session(pool_size=8, retries=3, backoff=0.5):
+    """
+    Creates a requests.Session with a connection pool sized for pool_size
+    concurrent requests, retrying connection errors, 429 and 5xx responses
+    with exponential backoff.
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=('GET',)
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def fetch_all_products(base_url=API_BASE_URL, page_size=100, max_workers=8, session=None):
+    """
+    Fetches the whole product catalog from the DummyJSON API.
+    The first page reports the catalog size; the remaining pages are fetched
+    with skip/limit by up to max_workers threads sharing one pooled session.
+    base_url can point at another server with the same API (e.g. a local stub).
+    Returns: list of simplified product dictionaries.
+    """
+    import requests
+    from concurrent.futures import ThreadPoolExecutor
+
+    url = f"{base_url}/products"
+    select = ','.join(PRODUCT_FIELDS)
+    
+    print(f"Connecting to API: {url}")
+
+    own_session = session is None
+    if own_session:
+        session = create_session(pool_size=max_workers)
+
+    def fetch_page(skip):
+        params = {'limit': page_size, 'skip': skip, 'select': select}
+        response = session.get(url, params=params, timeout=10)
+        response.raise_for_status()
+        return response.json()
+    
+    try:
+        data = fetch_page(0)
+        raw_products = data.get('products', [])
+        total = data.get('total', len(raw_products))
+
+        # Step by what the server actually returned, in case it caps the limit
+        step = len(raw_products)
+        skips = range(step, total, step) if step else range(0)
+        if skips:
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                for page in pool.map(fetch_page, skips):
+                    raw_products.extend(page.get('products', []))
+        
+        if raw_products:
+            print(f"Success: Fetched {len(raw_products)} products.")
+        else:
+            print("Warning: API returned 0 products.")
+            
+        return raw_products
+
+    except (requests.exceptions.RequestException, ValueError) as e:
+        print(f"API Error: {e}")
+        return []
+
+    finally:
+        if own_session:
+            session.close()
+
+def fetch_products_by_ids(product_ids, base_url=API_BASE_URL, max_workers=8, session=None):
+    """
+    Fetches individual products by numeric ID (GET /products/<id>), up to
+    max_workers requests at a time over one pooled session.
+    IDs the API does not know (404) are reported separately instead of failing.
+    Returns: tuple (list of product dictionaries, set of IDs not found)
+    """
+    import requests
+    from concurrent.futures import ThreadPoolExecutor
+
+    product_ids = sorted(set(product_ids))
+    select = ','.join(PRODUCT_FIELDS)
+
+    if not product_ids:
+        return [], set()
+
+    print(f"Fetching {len(product_ids)} products by ID from: {base_url}/products/<id>")
+
+    own_session = session is None
+    if own_session:
+        session = create_session(pool_size=max_workers)
+
+    def fetch_one(product_id):
+        try:
+            response = session.get(f"{base_url}/products/{product_id}", params={'select': select}, timeout=10)
+            if response.status_code == 404:
+                return product_id, None
+            response.raise_for_status()
+            return product_id, response.json()
+        except (requests.exceptions.RequestException, ValueError) as e:
+            # False: the lookup failed, so the ID is neither found nor known to be missing
+            print(f"API Error for product {product_id}: {e}")
+            return product_id, False
+
+    products = []
+    not_found = set()
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            for product_id, product in pool.map(fetch_one, product_ids):
+                if product is None:
+                    not_found.add(product_id)
+                elif product:
+                    products.append(product)
+    finally:
+        if own_session:
+            session.close()
+
+    print(f"Success: Fetched {len(products)} products ({len(not_found)} not found).")
+    return products, not_found
+
+if __name__ == "__main__":
+    products = fetch_all_products()
+    if products:
+        print("\n--- Sample Product ---")
+        print(products[0])
+
+
+    # ...Part 3.2(b) ...
+
+def create_product_mapping(api_products):
+    """
+    Creates a mapping of product IDs to product info.
+    Args:
+        api_products (list): List of product dictionaries from the API.
+    Returns:
+        dict: Mapping where key is Product ID and value is product details.
+    """
+    mapping = {}
+    
+    for product in api_products:
+        p_id = product.get('id')
+        
+        details = {
+            'title': product.get('title'),
+            'category': product.get('category'),
+            'brand': product.get('brand'),
+            'rating': product.get('rating')
+        }
+        
+        mapping[p_id] = details
+        
     return mapping
\ No newline at end of file
@@ -1,511 +1,898 @@
-def parse_transactions(raw_lines):
-    """
-    Parses raw strings into a clean list of dictionaries.
-    Applies data cleaning rules (removes commas, checks types).
-    """
-    valid_transactions = []
-    
-    for line in raw_lines:
-        parts = line.split('|')
-        if len(parts) != 8:
-            continue
-        trans_id = parts[0]
-        date = parts[1]
-        prod_id = parts[2]
-        prod_name = parts[3]
-        qty_str = parts[4]
-        price_str = parts[5]
-        cust_id = parts[6]
-        region = parts[7]
-        
-        if not trans_id.startswith('T'):
-            continue
-            
-        if not cust_id or not region:
-            continue
-            
-        clean_prod_name = prod_name.replace(',', '')
-        
-        try:
-            clean_qty_str = qty_str.replace(',', '')
-            clean_price_str = price_str.replace(',', '')
-            
-            quantity = int(clean_qty_str)
-            unit_price = float(clean_price_str)
-            
-            if quantity <= 0 or unit_price <= 0:
-                continue
-                
-        except ValueError:
-            continue
-            
-        transaction = {
-            'TransactionID': trans_id,
-            'Date': date,
-            'ProductID': prod_id,
-            'ProductName': clean_prod_name,
-            'Quantity': quantity,
-            'UnitPrice': unit_price, 
-            'CustomerID': cust_id,
-            'Region': region
-        }
-        
-        valid_transactions.append(transaction)
-        
-    return valid_transactions
-
-
-def validate_and_filter(transactions, region=None, min_amount=None, max_amount=None):
-    """
-    Validates transactions and applies optional filters (Region and Amount).
-    Returns: tuple (valid_transactions, invalid_count, filter_summary)
-    """
-    valid_filtered_transactions = []
-    invalid_count = 0
-    
-    
-    dropped_by_region = 0
-    dropped_by_amount = 0
-    
-    
-    all_regions = sorted(list(set(t['Region'] for t in transactions if t.get('Region'))))
-    all_amounts = [t['Quantity'] * t['UnitPrice'] for t in transactions]
-    
-    print("\n--- Filter Options Available ---")
-    print(f"Regions found: {all_regions}")
-    if all_amounts:
-        print(f"Transaction Amounts range: {min(all_amounts)} to {max(all_amounts)}")
-    
-    
-    for t in transactions:
-        
-       
-        if (not t['TransactionID'].startswith('T') or
-            not t['ProductID'].startswith('P') or
-            not t['CustomerID'].startswith('C') or
-            t['Quantity'] <= 0 or 
-            t['UnitPrice'] <= 0):
-            
-            invalid_count += 1
-            continue 
-
-      
-        if region and t['Region'] != region:
-            dropped_by_region += 1
-            continue
-
-        
-        total_amount = t['Quantity'] * t['UnitPrice']
-
-        if min_amount is not None and total_amount < min_amount:
-            dropped_by_amount += 1
-            continue
-        if max_amount is not None and total_amount > max_amount:
-            dropped_by_amount += 1
-            continue
-
-        valid_filtered_transactions.append(t)
-
-    filter_summary = {
-        'total_input': len(transactions),
-        'invalid': invalid_count,
-        'filtered_by_region': dropped_by_region,
-        'filtered_by_amount': dropped_by_amount,
-        'final_count': len(valid_filtered_transactions)
-    }
-
-    return valid_filtered_transactions, invalid_count, filter_summary
-
-# ... Part 2(a)...
-
-def calculate_total_revenue(transactions):
-    """
-    Calculates total revenue from all transactions.
-    Returns: float (total revenue)
-    """
-    total_revenue = 0.0
-    
-    for t in transactions:
-        
-        amount = t['Quantity'] * t['UnitPrice']
-        
-        
-        total_revenue += amount
-        
-    return total_revenue
-
-# ... Part 2(b) ...
-
-def region_wise_sales(transactions):
-    """
-    Analyzes sales by region.
-    Returns: dictionary with region statistics, sorted by total sales (descending).
-    """
-    
-    region_stats = {}
-    total_revenue_all = 0.0
-
-    
-    for t in transactions:
-        region = t['Region']
-        amount = t['Quantity'] * t['UnitPrice']
-        
-        
-        total_revenue_all += amount
-
-        
-        if region not in region_stats:
-            region_stats[region] = {'total_sales': 0.0, 'transaction_count': 0}
-        
-        
-        region_stats[region]['total_sales'] += amount
-        region_stats[region]['transaction_count'] += 1
-
-    
-    final_stats = {}
-    
-    
-    sorted_regions = sorted(region_stats, key=lambda r: region_stats[r]['total_sales'], reverse=True)
-
-    for region in sorted_regions:
-        data = region_stats[region]
-        sales = data['total_sales']
-        count = data['transaction_count']
-        
-        
-        if total_revenue_all > 0:
-            percentage = (sales / total_revenue_all) * 100
-        else:
-            percentage = 0.0
-            
-        
-        final_stats[region] = {
-            'total_sales': sales,
-            'transaction_count': count,
-            'percentage': round(percentage, 2)
-        }
-        
-    return final_stats
-
-# ... Part 2(c) ...
-
-def top_selling_products(transactions, n=5):
-    """
-    Finds top n products by total quantity sold.
-    Returns: list of tuples (ProductName, TotalQuantity, TotalRevenue)
-    """
-    product_stats = {}
-
-    for t in transactions:
-        prod_name = t['ProductName']
-        qty = t['Quantity']
-        revenue = t['Quantity'] * t['UnitPrice']
-
-        if prod_name not in product_stats:
-            product_stats[prod_name] = {'total_qty': 0, 'total_revenue': 0.0}
-
-        product_stats[prod_name]['total_qty'] += qty
-        product_stats[prod_name]['total_revenue'] += revenue
-
-    product_list = []
-    for name, stats in product_stats.items():
-        product_list.append((name, stats['total_qty'], stats['total_revenue']))
-
-    sorted_products = sorted(product_list, key=lambda x: x[1], reverse=True)
-
-    return sorted_products[:n]
-
-# ... Part 2(d) ...
-
-def customer_analysis(transactions):
-    """
-    Analyzes customer purchase patterns.
-    Returns: dictionary of customer statistics, sorted by total spent (descending).
-    """
-    customer_stats = {}
-
-    for t in transactions:
-        cust_id = t['CustomerID']
-        amount = t['Quantity'] * t['UnitPrice']
-        prod_name = t['ProductName']
-
-        if cust_id not in customer_stats:
-            customer_stats[cust_id] = {
-                'total_spent': 0.0,
-                'purchase_count': 0,
-                'products_bought': set() 
-            }
-
-        customer_stats[cust_id]['total_spent'] += amount
-        customer_stats[cust_id]['purchase_count'] += 1
-        customer_stats[cust_id]['products_bought'].add(prod_name)
-
-    final_stats = {}
-    
-    sorted_customers = sorted(customer_stats, key=lambda c: customer_stats[c]['total_spent'], reverse=True)
-
-    for cust_id in sorted_customers:
-        data = customer_stats[cust_id]
-        spent = data['total_spent']
-        count = data['purchase_count']
-        
-        avg_value = spent / count if count > 0 else 0.0
-        
-        products_list = list(data['products_bought'])
-
-        final_stats[cust_id] = {
-            'total_spent': spent,
-            'purchase_count': count,
-            'avg_order_value': round(avg_value, 2),
-            'products_bought': products_list
-        }
-
-    return final_stats
-
-
-# ... Part 2.2(a) ...
-
-def daily_sales_trend(transactions):
-    """
-    Analyzes sales trends by date.
-    Returns: dictionary sorted by date with revenue, count, and unique customers.
-    """
-    daily_stats = {}
-
-    for t in transactions:
-        date = t['Date']
-        amount = t['Quantity'] * t['UnitPrice']
-        cust_id = t['CustomerID']
-
-        if date not in daily_stats:
-            daily_stats[date] = {
-                'revenue': 0.0,
-                'transaction_count': 0,
-                'unique_customers_set': set() 
-            }
-
-        daily_stats[date]['revenue'] += amount
-        daily_stats[date]['transaction_count'] += 1
-        daily_stats[date]['unique_customers_set'].add(cust_id)
-
-    final_stats = {}
-    
-    sorted_dates = sorted(daily_stats.keys())
-
-    for date in sorted_dates:
-        data = daily_stats[date]
-        
-        final_stats[date] = {
-            'revenue': data['revenue'],
-            'transaction_count': data['transaction_count'],
-            'unique_customers': len(data['unique_customers_set']) 
-        }
-
-    return final_stats
-
-# ... Part 2.2(b) ...
-
-def find_peak_sales_day(transactions):
-    """
-    Identifies the date with the highest revenue.
-    Returns: tuple (date, revenue, transaction_count)
-    """
-    daily_stats = daily_sales_trend(transactions)
-    
-    peak_date = None
-    max_revenue = -1.0
-    peak_count = 0
-    
-    for date, data in daily_stats.items():
-        if data['revenue'] > max_revenue:
-            max_revenue = data['revenue']
-            peak_date = date
-            peak_count = data['transaction_count']
-            
-    return (peak_date, max_revenue, peak_count)
-
-
-# ... Part 2.3(a) ...
-
-def low_performing_products(transactions, threshold=10):
-    """
-    Identifies products with sales quantity below a threshold.
-    Returns: list of tuples (ProductName, TotalQuantity, TotalRevenue) sorted by quantity (ascending).
-    """
-    product_stats = {}
-
-    for t in transactions:
-        prod_name = t['ProductName']
-        qty = t['Quantity']
-        revenue = t['Quantity'] * t['UnitPrice']
-
-        if prod_name not in product_stats:
-            product_stats[prod_name] = {'total_qty': 0, 'total_revenue': 0.0}
-
-        product_stats[prod_name]['total_qty'] += qty
-        product_stats[prod_name]['total_revenue'] += revenue
-
-    low_performers = []
-    
-    for name, stats in product_stats.items():
-        if stats['total_qty'] < threshold:
-            low_performers.append((name, stats['total_qty'], stats['total_revenue']))
-
-    sorted_low_performers = sorted(low_performers, key=lambda x: x[1])
-
-    return sorted_low_performers
-
-
-# ... Part 3.2 ...
-
-def enrich_sales_data(transactions, product_mapping):
-    """
-    Merges local sales data with API product details.
-    """
-    enriched_data = []
-    
-    for t in transactions:
-        enriched_t = t.copy()
-        
-        raw_prod_id = t['ProductID']
-        product_id = None
-        
-        try:
-            if raw_prod_id.startswith('P'):
-                product_id = int(raw_prod_id[1:])
-            else:
-                product_id = int(raw_prod_id)
-        except ValueError:
-            product_id = None
-
-        if product_id and product_id in product_mapping:
-            api_data = product_mapping[product_id]
-            
-            enriched_t['API_Category'] = api_data.get('category')
-            enriched_t['API_Brand'] = api_data.get('brand')
-            enriched_t['API_Rating'] = api_data.get('rating')
-            enriched_t['API_Match'] = True
-        else:
-            enriched_t['API_Category'] = "N/A"
-            enriched_t['API_Brand'] = "N/A"
-            enriched_t['API_Rating'] = "N/A"
-            enriched_t['API_Match'] = False
-            
-        enriched_data.append(enriched_t)
-        
-    return enriched_data
-
-
-# ... Part 4.1 ...
-
-import datetime
-import os
-
-def generate_sales_report(transactions, enriched_transactions, output_file='output/sales_report.txt'):
-    """
-    Generates a comprehensive text report with all analysis metrics.
-    """
-    os.makedirs(os.path.dirname(output_file), exist_ok=True)
-    
-    total_revenue = calculate_total_revenue(transactions)
-    region_stats = region_wise_sales(transactions)
-    top_products = top_selling_products(transactions, n=5)
-    customer_stats = customer_analysis(transactions)
-    daily_stats = daily_sales_trend(transactions)
-    peak_day_date, peak_day_rev, peak_day_trans = find_peak_sales_day(transactions)
-    low_performers = low_performing_products(transactions, threshold=5) 
-    
-    total_trans = len(transactions)
-    avg_order_val = total_revenue / total_trans if total_trans > 0 else 0
-    
-    dates = sorted([t['Date'] for t in transactions])
-    start_date = dates[0] if dates else "N/A"
-    end_date = dates[-1] if dates else "N/A"
-
-    total_enriched = len(enriched_transactions)
-    successful_matches = sum(1 for t in enriched_transactions if t.get('API_Match'))
-    success_rate = (successful_matches / total_enriched * 100) if total_enriched > 0 else 0.0
-    
-    failed_products = set()
-    for t in enriched_transactions:
-        if not t.get('API_Match'):
-            failed_products.add(t['ProductID'])
-
-    lines = []
-    
-    lines.append("=" * 60)
-    lines.append("              SALES ANALYTICS REPORT")
-    lines.append(f"          Generated: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    lines.append(f"          Records Processed: {total_trans}")
-    lines.append("=" * 60)
-    lines.append("\n")
-
-    lines.append("1. OVERALL SUMMARY")
-    lines.append("-" * 60)
-    lines.append(f"Total Revenue:       ${total_revenue:,.2f}")
-    lines.append(f"Total Transactions:  {total_trans}")
-    lines.append(f"Average Order Value: ${avg_order_val:,.2f}")
-    lines.append(f"Date Range:          {start_date} to {end_date}")
-    lines.append("\n")
-
-    lines.append("2. REGION-WISE PERFORMANCE")
-    lines.append("-" * 60)
-    lines.append(f"{'Region':<15} | {'Sales':<15} | {'% Total':<10} | {'Trans':<5}")
-    lines.append("-" * 60)
-    for region, data in region_stats.items():
-        lines.append(f"{region:<15} | ${data['total_sales']:<14,.2f} | {data['percentage']:<9}% | {data['transaction_count']:<5}")
-    lines.append("\n")
-
-    lines.append("3. TOP 5 PRODUCTS")
-    lines.append("-" * 60)
-    lines.append(f"{'Rank':<5} | {'Product':<25} | {'Qty':<5} | {'Revenue':<15}")
-    lines.append("-" * 60)
-    for idx, (name, qty, rev) in enumerate(top_products, 1):
-        lines.append(f"{idx:<5} | {name:<25} | {qty:<5} | ${rev:<14,.2f}")
-    lines.append("\n")
-
-    lines.append("4. TOP 5 CUSTOMERS")
-    lines.append("-" * 60)
-    lines.append(f"{'Rank':<5} | {'Customer ID':<15} | {'Total Spent':<15} | {'Orders':<5}")
-    lines.append("-" * 60)
-    sorted_customers = sorted(customer_stats.items(), key=lambda x: x[1]['total_spent'], reverse=True)[:5]
-    for idx, (cust_id, data) in enumerate(sorted_customers, 1):
-        lines.append(f"{idx:<5} | {cust_id:<15} | ${data['total_spent']:<14,.2f} | {data['purchase_count']:<5}")
-    lines.append("\n")
-
-    lines.append("5. DAILY SALES TREND")
-    lines.append("-" * 60)
-    lines.append(f"{'Date':<15} | {'Revenue':<15} | {'Trans':<5} | {'Unique Cust':<10}")
-    lines.append("-" * 60)
-    for date, data in daily_stats.items():
-        lines.append(f"{date:<15} | ${data['revenue']:<14,.2f} | {data['transaction_count']:<5} | {data['unique_customers']:<10}")
-    lines.append("\n")
-
-    lines.append("6. PRODUCT PERFORMANCE ANALYSIS")
-    lines.append("-" * 60)
-    lines.append(f"Best Selling Day: {peak_day_date} (${peak_day_rev:,.2f} with {peak_day_trans} orders)")
-    if low_performers:
-        lines.append("\nLow Performing Products (Warning: Check Inventory):")
-        for name, qty, rev in low_performers:
-            lines.append(f" - {name} (Qty: {qty}, Rev: ${rev:,.2f})")
-    else:
-        lines.append("\nNo products are performing below threshold.")
-    lines.append("\n")
-
-    lines.append("7. API ENRICHMENT SUMMARY")
-    lines.append("-" * 60)
-    lines.append(f"Total Records Enriched: {total_enriched}")
-    lines.append(f"Successful API Matches: {successful_matches}")
-    lines.append(f"Success Rate:           {success_rate:.2f}%")
-    if failed_products:
-        lines.append(f"Failed to Match Product IDs: {', '.join(map(str, list(failed_products)[:10]))}...")
-    lines.append("\n")
-
-    try:
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(lines))
-        print(f"\n[SUCCESS] Report generated successfully at: {output_file}")
-        return True
-    except IOError as e:
-        print(f"\n[ERROR] Could not write report: {e}")
-        return False
\ No newline at end of file
+import datetime
+import heapq
+import os
+import types
+
+from utils import vectorized
+from utils.file_handler import encode_text, open_output
+from utils.rollup import cube_stats, cube_enrichment_summary
+from utils.sketches import SpaceSaving, HyperLogLog
+from utils.transaction_table import TransactionTable
+
+def iter_parse_transactions(raw_lines):
+    """
+    Lazily parses raw strings into clean dictionaries, one line at a time.
+    Applies the same data cleaning rules as parse_transactions.
+    """
+    for line in raw_lines:
+        parts = line.split('|')
+        if len(parts) != 8:
+            continue
+        trans_id = parts[0]
+        date = parts[1]
+        prod_id = parts[2]
+        prod_name = parts[3]
+        qty_str = parts[4]
+        price_str = parts[5]
+        cust_id = parts[6]
+        region = parts[7]
+        
+        if not trans_id.startswith('T'):
+            continue
+            
+        if not cust_id or not region:
+            continue
+            
+        clean_prod_name = prod_name.replace(',', '')
+        
+        try:
+            clean_qty_str = qty_str.replace(',', '')
+            clean_price_str = price_str.replace(',', '')
+            
+            quantity = int(clean_qty_str)
+            unit_price = float(clean_price_str)
+            
+            if quantity <= 0 or unit_price <= 0:
+                continue
+                
+        except ValueError:
+            continue
+            
+        yield {
+            'TransactionID': trans_id,
+            'Date': date,
+            'ProductID': prod_id,
+            'ProductName': clean_prod_name,
+            'Quantity': quantity,
+            'UnitPrice': unit_price, 
+            'CustomerID': cust_id,
+            'Region': region
+        }
+
+
+def parse_transactions(raw_lines):
+    """
+    Parses raw strings into a clean list of dictionaries.
+    Applies data cleaning rules (removes commas, checks types).
+    """
+    return list(iter_parse_transactions(raw_lines))
+
+
+def iter_validate_and_filter(transactions, region=None, min_amount=None, max_amount=None, summary=None):
+    """
+    Lazily validates transactions and applies optional filters (Region and Amount).
+    Yields the transactions that pass. If a summary dict is given, it is filled
+    with the same counts as validate_and_filter's filter_summary once the
+    input is exhausted.
+    """
+    total_input = 0
+    invalid_count = 0
+    dropped_by_region = 0
+    dropped_by_amount = 0
+    final_count = 0
+
+    try:
+        for t in transactions:
+            total_input += 1
+
+            if (not t['TransactionID'].startswith('T') or
+                not t['ProductID'].startswith('P') or
+                not t['CustomerID'].startswith('C') or
+                t['Quantity'] <= 0 or 
+                t['UnitPrice'] <= 0):
+                
+                invalid_count += 1
+                continue 
+
+            if region and t['Region'] != region:
+                dropped_by_region += 1
+                continue
+
+            total_amount = t['Quantity'] * t['UnitPrice']
+
+            if min_amount is not None and total_amount < min_amount:
+                dropped_by_amount += 1
+                continue
+            if max_amount is not None and total_amount > max_amount:
+                dropped_by_amount += 1
+                continue
+
+            final_count += 1
+            yield t
+
+    finally:
+        if summary is not None:
+            summary.update({
+                'total_input': total_input,
+                'invalid': invalid_count,
+                'filtered_by_region': dropped_by_region,
+                'filtered_by_amount': dropped_by_amount,
+                'final_count': final_count
+            })
+
+
+def filter_options(transactions):
+    """
+    Collects the values a user can filter on, in one pass.
+    Returns: tuple (sorted_regions, min_amount, max_amount); the amounts are
+    None when there are no transactions.
+    """
+    regions = set()
+    min_amount = max_amount = None
+    for t in transactions:
+        if t.get('Region'):
+            regions.add(t['Region'])
+        amount = t['Quantity'] * t['UnitPrice']
+        if min_amount is None or amount < min_amount:
+            min_amount = amount
+        if max_amount is None or amount > max_amount:
+            max_amount = amount
+    return sorted(regions), min_amount, max_amount
+
+
+def validate_and_filter(transactions, region=None, min_amount=None, max_amount=None, show_options=False):
+    """
+    Validates transactions and applies optional filters (Region and Amount).
+    The available filter options are printed only if show_options is set;
+    callers that filter repeatedly should compute them once with filter_options.
+    Returns: tuple (valid_transactions, invalid_count, filter_summary)
+    """
+    if show_options:
+        all_regions, lowest, highest = filter_options(transactions)
+        print("\n--- Filter Options Available ---")
+        print(f"Regions found: {all_regions}")
+        if lowest is not None:
+            print(f"Transaction Amounts range: {lowest} to {highest}")
+
+    filter_summary = {}
+    valid_filtered_transactions = list(iter_validate_and_filter(
+        transactions, region, min_amount, max_amount, filter_summary
+    ))
+
+    return valid_filtered_transactions, filter_summary['invalid'], filter_summary
+
+# ... Part 2 (shared aggregation) ...
+
+def aggregate_transactions(transactions, stats=None, backend='auto', distinct_error=None, customer_counters=None):
+    """
+    Computes every sales metric accumulator in a single pass.
+    Each transaction's amount (Quantity * UnitPrice) is calculated once and
+    folded into the region, product, customer and daily accumulators.
+    If stats (a previous result of this function) is given, the transactions
+    are folded into it, so a stream can be aggregated chunk by chunk.
+    backend: 'auto' uses the NumPy backend for a TransactionTable when NumPy
+    is installed, 'python' always uses the loop below, 'numpy' requires NumPy.
+    distinct_error: None keeps exact sets of each day's customers and each
+    customer's products. With a relative error (e.g. 0.01), a set that grows
+    past the size of a sketch is replaced by a HyperLogLog sketch, so memory
+    no longer grows with those cardinalities while small counts stay exact.
+    customer_counters: None keeps every customer's totals. With a number, only
+    the heaviest spenders are kept, in a SpaceSaving summary of that many
+    counters (stats['top_customers']; stats['customers'] is None), so memory
+    no longer grows with the number of customers and the customer ranking
+    becomes approximate.
+    When folding into existing stats, their modes are kept.
+    Returns: dictionary of raw accumulators used by the analysis functions.
+    """
+    if stats is not None:
+        distinct_error = stats.get('distinct_error')
+    if customer_counters is None and aggregation_backend(transactions, stats, backend, distinct_error) == 'numpy':
+        return vectorized.aggregate_table(transactions)
+
+    if stats is None:
+        stats = {
+            'total_revenue': 0.0,
+            'transaction_count': 0,
+            'regions': {},
+            'products': {},
+            'customers': {},
+            'daily': {}
+        }
+        if distinct_error is not None:
+            stats['distinct_error'] = distinct_error
+        if customer_counters is not None:
+            stats['customers'] = None
+            stats['top_customers'] = SpaceSaving(customer_counters)
+
+    precision, sketch_limit = _distinct_settings(distinct_error)
+
+    total_revenue = stats['total_revenue']
+    transaction_count = stats['transaction_count']
+    region_stats = stats['regions']
+    product_stats = stats['products']
+    customer_stats = stats['customers']
+    top_customers = stats.get('top_customers')
+    daily_stats = stats['daily']
+
+    for t in transactions:
+        qty = t['Quantity']
+        amount = qty * t['UnitPrice']
+        region = t['Region']
+        prod_name = t['ProductName']
+        cust_id = t['CustomerID']
+        date = t['Date']
+
+        total_revenue += amount
+        transaction_count += 1
+
+        region_data = region_stats.get(region)
+        if region_data is None:
+            region_data = region_stats[region] = {'total_sales': 0.0, 'transaction_count': 0}
+        region_data['total_sales'] += amount
+        region_data['transaction_count'] += 1
+
+        product_data = product_stats.get(prod_name)
+        if product_data is None:
+            product_data = product_stats[prod_name] = {'total_qty': 0, 'total_revenue': 0.0}
+        product_data['total_qty'] += qty
+        product_data['total_revenue'] += amount
+
+        if customer_stats is None:
+            top_customers.add(cust_id, amount)
+        else:
+            customer_data = customer_stats.get(cust_id)
+            if customer_data is None:
+                customer_data = customer_stats[cust_id] = {
+                    'total_spent': 0.0,
+                    'purchase_count': 0,
+                    'products_bought': set()
+                }
+            customer_data['total_spent'] += amount
+            customer_data['purchase_count'] += 1
+            products = customer_data['products_bought']
+            products.add(prod_name)
+            if sketch_limit and products.__class__ is set and len(products) > sketch_limit:
+                customer_data['products_bought'] = HyperLogLog(precision, products)
+
+        day_data = daily_stats.get(date)
+        if day_data is None:
+            day_data = daily_stats[date] = {
+                'revenue': 0.0,
+                'transaction_count': 0,
+                'unique_customers_set': set()
+            }
+        day_data['revenue'] += amount
+        day_data['transaction_count'] += 1
+        day_customers = day_data['unique_customers_set']
+        day_customers.add(cust_id)
+        if sketch_limit and day_customers.__class__ is set and len(day_customers) > sketch_limit:
+            day_data['unique_customers_set'] = HyperLogLog(precision, day_customers)
+
+    stats['total_revenue'] = total_revenue
+    stats['transaction_count'] = transaction_count
+
+    return stats
+
+
+def aggregation_backend(transactions, stats=None, backend='auto', distinct_error=None):
+    """
+    Picks the backend aggregate_transactions runs with these arguments: NumPy
+    only for a TransactionTable aggregated from scratch with exact distinct
+    counts, the pure-Python loop for everything else.
+    Returns: 'numpy' or 'python'
+    Raises ImportError if backend is 'numpy' and NumPy is not installed.
+    """
+    if backend == 'numpy' and not vectorized.HAS_NUMPY:
+        raise ImportError("The 'numpy' backend requires NumPy to be installed")
+    if (stats is None and distinct_error is None and backend != 'python' and vectorized.HAS_NUMPY
+            and isinstance(transactions, TransactionTable)):
+        return 'numpy'
+    return 'python'
+
+
+def _distinct_settings(distinct_error):
+    """
+    Returns: tuple (HyperLogLog precision, set size at which to switch to a
+    sketch), or (None, 0) for exact counting.
+    """
+    if distinct_error is None:
+        return None, 0
+    precision = HyperLogLog.precision_for(distinct_error)
+    return precision, HyperLogLog.set_limit(precision)
+
+
+def _merge_distinct(current, other, precision, sketch_limit):
+    """
+    Unions two distinct-value containers (sets or HyperLogLog sketches).
+    Returns: the merged container, which may be a new sketch.
+    """
+    if isinstance(current, set) and isinstance(other, HyperLogLog):
+        current = HyperLogLog(precision, current)
+    current |= other
+    if sketch_limit and isinstance(current, set) and len(current) > sketch_limit:
+        current = HyperLogLog(precision, current)
+    return current
+
+
+def merge_aggregates(stats, other):
+    """
+    Merges a partial result of aggregate_transactions into stats (in place).
+    Merging partials in input order gives the same keys, counts and key
+    order as aggregating the combined input in one go. Both must use the
+    same distinct_error and customer_counters modes.
+    Returns: the merged stats dictionary.
+    """
+    stats['total_revenue'] += other['total_revenue']
+    stats['transaction_count'] += other['transaction_count']
+    precision, sketch_limit = _distinct_settings(stats.get('distinct_error'))
+    if stats['customers'] is None:
+        stats['top_customers'].merge(other['top_customers'])
+
+    for section in ('regions', 'products', 'customers', 'daily'):
+        target = stats[section]
+        if target is None:
+            continue
+        for key, data in other[section].items():
+            current = target.get(key)
+            if current is None:
+                target[key] = {
+                    field: value.copy() if isinstance(value, (set, HyperLogLog)) else value
+                    for field, value in data.items()
+                }
+                continue
+            for field, value in data.items():
+                if isinstance(value, (set, HyperLogLog)):
+                    current[field] = _merge_distinct(current[field], value, precision, sketch_limit)
+                else:
+                    current[field] += value
+
+    return stats
+
+
+def merge_filter_summaries(summary, other):
+    """
+    Adds the counts of another filter summary (from iter_validate_and_filter) into summary.
+    Returns: the merged summary dictionary.
+    """
+    for key, value in other.items():
+        summary[key] = summary.get(key, 0) + value
+    return summary
+
+
+def iter_aggregate(transactions, stats, enrichment_summary=None, chunk_size=10000):
+    """
+    Passes transactions through unchanged while folding them into stats
+    (and into enrichment_summary, if given) in fixed-size chunks.
+    Lets a streaming pipeline aggregate and save in the same pass.
+    """
+    chunk = []
+    for t in transactions:
+        chunk.append(t)
+        if len(chunk) >= chunk_size:
+            aggregate_transactions(chunk, stats)
+            if enrichment_summary is not None:
+                summarize_enrichment(chunk, enrichment_summary)
+            yield from chunk
+            chunk = []
+
+    if chunk:
+        aggregate_transactions(chunk, stats)
+        if enrichment_summary is not None:
+            summarize_enrichment(chunk, enrichment_summary)
+        yield from chunk
+
+
+def summarize_enrichment(enriched_transactions, summary=None):
+    """
+    Counts API matches over enriched transactions in a single pass.
+    If summary (a previous result of this function) is given, counts are added to it.
+    Returns: dictionary with total, matches and the set of failed product IDs.
+    """
+    if summary is None:
+        summary = {'total': 0, 'matches': 0, 'failed_products': set()}
+
+    total = summary['total']
+    matches = summary['matches']
+    failed_products = summary['failed_products']
+
+    for t in enriched_transactions:
+        total += 1
+        if t.get('API_Match'):
+            matches += 1
+        else:
+            failed_products.add(t['ProductID'])
+
+    summary['total'] = total
+    summary['matches'] = matches
+
+    return summary
+
+# ... Part 2(a)...
+
+def calculate_total_revenue(transactions):
+    """
+    Calculates total revenue from all transactions.
+    Returns: float (total revenue)
+    """
+    return aggregate_transactions(transactions)['total_revenue']
+
+# ... Part 2(b) ...
+
+def region_wise_sales(transactions):
+    """
+    Analyzes sales by region.
+    Returns: dictionary with region statistics, sorted by total sales (descending).
+    """
+    return _region_view(aggregate_transactions(transactions))
+
+
+def _region_view(stats):
+    region_stats = stats['regions']
+    total_revenue_all = stats['total_revenue']
+
+    final_stats = {}
+    
+    sorted_regions = sorted(region_stats, key=lambda r: region_stats[r]['total_sales'], reverse=True)
+
+    for region in sorted_regions:
+        data = region_stats[region]
+        sales = data['total_sales']
+        count = data['transaction_count']
+        
+        if total_revenue_all > 0:
+            percentage = (sales / total_revenue_all) * 100
+        else:
+            percentage = 0.0
+            
+        final_stats[region] = {
+            'total_sales': sales,
+            'transaction_count': count,
+            'percentage': round(percentage, 2)
+        }
+        
+    return final_stats
+
+# ... Part 2(c) ...
+
+def top_selling_products(transactions, n=5, stats=None):
+    """
+    Finds top n products by total quantity sold.
+    Precomputed stats (from aggregate_transactions) can be passed instead.
+    Returns: list of tuples (ProductName, TotalQuantity, TotalRevenue)
+    """
+    if stats is None:
+        stats = aggregate_transactions(transactions)
+    return _top_products_view(stats, n)
+
+
+def _top_products_view(stats, n):
+    # A size-n heap instead of sorting every product; ties keep insertion order like sorted()
+    product_list = (
+        (name, data['total_qty'], data['total_revenue'])
+        for name, data in stats['products'].items()
+    )
+    return heapq.nlargest(n, product_list, key=lambda x: x[1])
+
+
+def approximate_top_products(transactions, n=5, capacity=None):
+    """
+    Streaming top n products by quantity in memory bounded by capacity
+    (default 200 * n) rather than by the number of distinct products.
+    Estimates overcount by at most the reported error.
+    Returns: list of tuples (ProductName, EstimatedQuantity, MaxError)
+    """
+    summary = SpaceSaving(capacity or 200 * n)
+    for t in transactions:
+        summary.add(t['ProductName'], t['Quantity'])
+    return summary.top(n)
+
+# ... Part 2(d) ...
+
+def customer_analysis(transactions, stats=None, distinct_error=None):
+    """
+    Analyzes customer purchase patterns.
+    Precomputed stats (from aggregate_transactions) can be passed instead.
+    With distinct_error, customers with many products have them counted by a
+    HyperLogLog sketch; their products_bought is None, and distinct_products
+    holds the (approximate) count.
+    Returns: dictionary of customer statistics, sorted by total spent (descending).
+    """
+    if stats is None:
+        stats = aggregate_transactions(transactions, distinct_error=distinct_error)
+    return _customer_view(stats)
+
+
+def _customer_view(stats, n=None):
+    # With n, only the top n customers are ranked (size-n heap, no full sort)
+    customer_stats = stats['customers']
+    if customer_stats is None:
+        return _approximate_customer_view(stats['top_customers'], n)
+
+    final_stats = {}
+    
+    if n is None:
+        sorted_customers = sorted(customer_stats, key=lambda c: customer_stats[c]['total_spent'], reverse=True)
+    else:
+        sorted_customers = heapq.nlargest(n, customer_stats, key=lambda c: customer_stats[c]['total_spent'])
+
+    for cust_id in sorted_customers:
+        data = customer_stats[cust_id]
+        spent = data['total_spent']
+        count = data['purchase_count']
+        
+        avg_value = spent / count if count > 0 else 0.0
+        
+        # A HyperLogLog sketch (approximate mode) can only count its products
+        products = data['products_bought']
+        products_list = list(products) if isinstance(products, set) else None
+
+        final_stats[cust_id] = {
+            'total_spent': spent,
+            'purchase_count': count,
+            'avg_order_value': round(avg_value, 2),
+            'products_bought': products_list,
+            'distinct_products': len(products)
+        }
+
+    return final_stats
+
+
+def _approximate_customer_view(summary, n=None):
+    # Only the estimated spend (and its maximum overcount) is known per customer
+    return {
+        cust_id: {
+            'total_spent': spent,
+            'max_error': error,
+            'purchase_count': None,
+            'avg_order_value': None,
+            'products_bought': None,
+            'distinct_products': None
+        }
+        for cust_id, spent, error in summary.top(len(summary) if n is None else n)
+    }
+
+
+def approximate_top_customers(transactions, n=5, capacity=None):
+    """
+    Streaming top n customers by amount spent in memory bounded by capacity
+    (default 200 * n) rather than by the number of distinct customers.
+    Estimates overcount by at most the reported error.
+    Returns: list of tuples (CustomerID, EstimatedSpent, MaxError)
+    """
+    summary = SpaceSaving(capacity or 200 * n)
+    for t in transactions:
+        summary.add(t['CustomerID'], t['Quantity'] * t['UnitPrice'])
+    return summary.top(n)
+
+
+# ... Part 2.2(a) ...
+
+def daily_sales_trend(transactions, distinct_error=None):
+    """
+    Analyzes sales trends by date.
+    With distinct_error, unique customers are counted approximately (HyperLogLog).
+    Returns: dictionary sorted by date with revenue, count, and unique customers.
+    """
+    return _daily_view(aggregate_transactions(transactions, distinct_error=distinct_error))
+
+
+def _daily_view(stats):
+    daily_stats = stats['daily']
+
+    final_stats = {}
+    
+    sorted_dates = sorted(daily_stats.keys())
+
+    for date in sorted_dates:
+        data = daily_stats[date]
+        
+        final_stats[date] = {
+            'revenue': data['revenue'],
+            'transaction_count': data['transaction_count'],
+            'unique_customers': len(data['unique_customers_set']) 
+        }
+
+    return final_stats
+
+# ... Part 2.2(b) ...
+
+def find_peak_sales_day(transactions):
+    """
+    Identifies the date with the highest revenue.
+    Returns: tuple (date, revenue, transaction_count)
+    """
+    return _peak_day_view(_daily_view(aggregate_transactions(transactions)))
+
+
+def _peak_day_view(daily_stats):
+    peak_date = None
+    max_revenue = -1.0
+    peak_count = 0
+    
+    for date, data in daily_stats.items():
+        if data['revenue'] > max_revenue:
+            max_revenue = data['revenue']
+            peak_date = date
+            peak_count = data['transaction_count']
+            
+    return (peak_date, max_revenue, peak_count)
+
+
+# ... Part 2.3(a) ...
+
+def low_performing_products(transactions, threshold=10, n=None, stats=None):
+    """
+    Identifies products with sales quantity below a threshold.
+    With n, only the n lowest are returned. Precomputed stats (from
+    aggregate_transactions) can be passed instead of the transactions.
+    Returns: list of tuples (ProductName, TotalQuantity, TotalRevenue) sorted by quantity (ascending).
+    """
+    if stats is None:
+        stats = aggregate_transactions(transactions)
+    return _low_performers_view(stats, threshold, n)
+
+
+def _low_performers_view(stats, threshold, n=None):
+    low_performers = (
+        (name, data['total_qty'], data['total_revenue'])
+        for name, data in stats['products'].items()
+        if data['total_qty'] < threshold
+    )
+
+    if n is not None:
+        return heapq.nsmallest(n, low_performers, key=lambda x: x[1])
+    return sorted(low_performers, key=lambda x: x[1])
+
+
+# ... Part 3.2 ...
+
+def normalize_product_id(raw_prod_id):
+    """
+    Converts a sales ProductID ('P101' or '101') to the numeric API product ID.
+    Returns: int, or None if the ID is not numeric.
+    """
+    try:
+        if raw_prod_id.startswith('P'):
+            return int(raw_prod_id[1:])
+        return int(raw_prod_id)
+    except ValueError:
+        return None
+
+
+def collect_product_ids(transactions):
+    """
+    Finds the distinct ProductIDs in the transactions and normalizes each one once.
+    Returns: dict mapping raw ProductID -> numeric API ID (or None).
+    """
+    product_ids = {}
+    for t in transactions:
+        raw_prod_id = t['ProductID']
+        if raw_prod_id not in product_ids:
+            product_ids[raw_prod_id] = normalize_product_id(raw_prod_id)
+    return product_ids
+
+
+# Enrichment columns of a transaction whose product is not in the catalog.
+# Read-only, since every unmatched row is filled from this one mapping.
+UNMATCHED_ENRICHMENT = types.MappingProxyType({
+    'API_Category': "N/A",
+    'API_Brand': "N/A",
+    'API_Rating': "N/A",
+    'API_Match': False
+})
+
+
+def _enrichment_columns(product_id, product_mapping):
+    api_data = product_mapping.get(product_id) if product_id is not None else None
+    if api_data is None:
+        return UNMATCHED_ENRICHMENT
+    return {
+        'API_Category': api_data.get('category'),
+        'API_Brand': api_data.get('brand'),
+        'API_Rating': api_data.get('rating'),
+        'API_Match': True
+    }
+
+
+def build_enrichment_join(product_ids, product_mapping):
+    """
+    Builds the join table for enrichment: one dict of API_* columns per
+    distinct raw ProductID, shared by every transaction with that ID.
+    product_ids is the raw -> numeric mapping from collect_product_ids.
+    Returns: dict mapping raw ProductID -> enrichment columns.
+    """
+    return {
+        raw_prod_id: _enrichment_columns(product_id, product_mapping)
+        for raw_prod_id, product_id in product_ids.items()
+    }
+
+
+def iter_enrich_sales_data(transactions, product_mapping, product_ids=None, summary=None):
+    """
+    Lazily merges local sales data with API product details, one record at a time.
+    Each distinct ProductID is normalized and looked up once (product_ids
+    from collect_product_ids can be passed in); its API_* columns are then
+    attached to every matching transaction dict in place, without copying
+    the row, so the caller's dicts come back enriched too (pass copies to
+    keep the originals untouched). If a summary dict (as from summarize_enrichment) is given, the
+    match counts are added to it once the input is exhausted.
+    """
+    join = build_enrichment_join(product_ids or {}, product_mapping)
+    total = 0
+    matches = 0
+    failed_products = set()
+
+    try:
+        for t in transactions:
+            raw_prod_id = t['ProductID']
+            columns = join.get(raw_prod_id)
+            if columns is None:
+                product_id = normalize_product_id(raw_prod_id)
+                columns = join[raw_prod_id] = _enrichment_columns(product_id, product_mapping)
+            if columns is UNMATCHED_ENRICHMENT:
+                failed_products.add(raw_prod_id)
+
+            if t.__class__ is dict:
+                t.update(columns)
+            else:
+                # Read-only rows (e.g. TransactionRow views) get a merged dict instead
+                t = dict(t, **columns)
+
+            total += 1
+            matches += columns['API_Match']
+            yield t
+
+    finally:
+        if summary is not None:
+            summary['total'] += total
+            summary['matches'] += matches
+            summary['failed_products'] |= failed_products
+
+
+def enrich_sales_data(transactions, product_mapping, product_ids=None, summary=None):
+    """
+    Merges local sales data with API product details (see iter_enrich_sales_data).
+    Transaction dicts are enriched in place and returned in the list.
+    """
+    return list(iter_enrich_sales_data(transactions, product_mapping, product_ids, summary))
+
+
+# ... Part 4.1 ...
+
+def _iter_report_lines(stats, enrichment_summary):
+    """
+    Yields the lines of the sales report, section by section.
+    """
+    total_revenue = stats['total_revenue']
+    region_stats = _region_view(stats)
+    top_products = _top_products_view(stats, 5)
+    top_customers = _customer_view(stats, 5)
+    daily_stats = _daily_view(stats)
+    peak_day_date, peak_day_rev, peak_day_trans = _peak_day_view(daily_stats)
+    low_performers = _low_performers_view(stats, 5)
+    
+    total_trans = stats['transaction_count']
+    avg_order_val = total_revenue / total_trans if total_trans > 0 else 0
+    
+    # daily_stats is already keyed in date order
+    dates = list(daily_stats)
+    start_date = dates[0] if dates else "N/A"
+    end_date = dates[-1] if dates else "N/A"
+
+    total_enriched = enrichment_summary['total']
+    successful_matches = enrichment_summary['matches']
+    failed_products = enrichment_summary['failed_products']
+    success_rate = (successful_matches / total_enriched * 100) if total_enriched > 0 else 0.0
+
+    yield "=" * 60
+    yield "              SALES ANALYTICS REPORT"
+    yield f"          Generated: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+    yield f"          Records Processed: {total_trans}"
+    yield "=" * 60
+    yield "\n"
+
+    yield "1. OVERALL SUMMARY"
+    yield "-" * 60
+    yield f"Total Revenue:       ${total_revenue:,.2f}"
+    yield f"Total Transactions:  {total_trans}"
+    yield f"Average Order Value: ${avg_order_val:,.2f}"
+    yield f"Date Range:          {start_date} to {end_date}"
+    yield "\n"
+
+    yield "2. REGION-WISE PERFORMANCE"
+    yield "-" * 60
+    yield f"{'Region':<15} | {'Sales':<15} | {'% Total':<10} | {'Trans':<5}"
+    yield "-" * 60
+    for region, data in region_stats.items():
+        yield f"{region:<15} | ${data['total_sales']:<14,.2f} | {data['percentage']:<9}% | {data['transaction_count']:<5}"
+    yield "\n"
+
+    yield "3. TOP 5 PRODUCTS"
+    yield "-" * 60
+    yield f"{'Rank':<5} | {'Product':<25} | {'Qty':<5} | {'Revenue':<15}"
+    yield "-" * 60
+    for idx, (name, qty, rev) in enumerate(top_products, 1):
+        yield f"{idx:<5} | {name:<25} | {qty:<5} | ${rev:<14,.2f}"
+    yield "\n"
+
+    if stats['customers'] is None:
+        yield "4. TOP 5 CUSTOMERS (approximate: estimates overcount by at most Max Error)"
+        yield "-" * 60
+        yield f"{'Rank':<5} | {'Customer ID':<15} | {'Total Spent':<15} | {'Max Error':<15}"
+        yield "-" * 60
+        for idx, (cust_id, data) in enumerate(top_customers.items(), 1):
+            yield f"{idx:<5} | {cust_id:<15} | ${data['total_spent']:<14,.2f} | ${data['max_error']:<14,.2f}"
+    else:
+        yield "4. TOP 5 CUSTOMERS"
+        yield "-" * 60
+        yield f"{'Rank':<5} | {'Customer ID':<15} | {'Total Spent':<15} | {'Orders':<5}"
+        yield "-" * 60
+        for idx, (cust_id, data) in enumerate(top_customers.items(), 1):
+            yield f"{idx:<5} | {cust_id:<15} | ${data['total_spent']:<14,.2f} | {data['purchase_count']:<5}"
+    yield "\n"
+
+    yield "5. DAILY SALES TREND"
+    yield "-" * 60
+    yield f"{'Date':<15} | {'Revenue':<15} | {'Trans':<5} | {'Unique Cust':<10}"
+    yield "-" * 60
+    for date, data in daily_stats.items():
+        yield f"{date:<15} | ${data['revenue']:<14,.2f} | {data['transaction_count']:<5} | {data['unique_customers']:<10}"
+    yield "\n"
+
+    yield "6. PRODUCT PERFORMANCE ANALYSIS"
+    yield "-" * 60
+    yield f"Best Selling Day: {peak_day_date} (${peak_day_rev:,.2f} with {peak_day_trans} orders)"
+    if low_performers:
+        yield "\nLow Performing Products (Warning: Check Inventory):"
+        for name, qty, rev in low_performers:
+            yield f" - {name} (Qty: {qty}, Rev: ${rev:,.2f})"
+    else:
+        yield "\nNo products are performing below threshold."
+    yield "\n"
+
+    yield "7. API ENRICHMENT SUMMARY"
+    yield "-" * 60
+    yield f"Total Records Enriched: {total_enriched}"
+    yield f"Successful API Matches: {successful_matches}"
+    yield f"Success Rate:           {success_rate:.2f}%"
+    if failed_products:
+        yield f"Failed to Match Product IDs: {', '.join(map(str, list(failed_products)[:10]))}..."
+    yield "\n"
+
+
+def generate_sales_report(transactions, enriched_transactions, output_file='output/sales_report.txt',
+                          stats=None, enrichment_summary=None, compression=None,
+                          cube=None, start_date=None, end_date=None):
+    """
+    Generates a comprehensive text report with all analysis metrics.
+    Precomputed stats (from aggregate_transactions) and enrichment_summary
+    (from summarize_enrichment) can be passed instead of the transaction
+    lists, e.g. when the data was aggregated while streaming.
+    With a rollup cube (see utils.rollup), the report covers the days from
+    start_date to end_date (inclusive, None for open ends) and is built
+    from the cube alone.
+    The report is written section by section and replaces output_file
+    atomically; compression works as in save_enriched_data.
+    """
+    os.makedirs(os.path.dirname(output_file), exist_ok=True)
+    
+    if stats is None and cube is not None:
+        stats = cube_stats(cube, start_date, end_date)
+    if enrichment_summary is None and cube is not None:
+        enrichment_summary = cube_enrichment_summary(cube, start_date, end_date)
+    if stats is None:
+        stats = aggregate_transactions(transactions)
+    if enrichment_summary is None:
+        enrichment_summary = summarize_enrichment(enriched_transactions)
+
+    try:
+        with open_output(output_file, compression) as f:
+            separator = ''
+            for line in _iter_report_lines(stats, enrichment_summary):
+                f.write(encode_text(separator + line))
+                separator = '\n'
+        print(f"\n[SUCCESS] Report generated successfully at: {output_file}")
+        return True
+    except (IOError, ValueError) as e:
+        print(f"\n[ERROR] Could not write report: {e}")
+        return False
@@ -1,55 +1,332 @@
-def read_sales_data(filename):
-    """
-    This function opens the file and reads the lines.
-    It ignores the header (the first line) and any empty lines.
-    """
-    encodings = ['utf-8', 'latin-1', 'cp1252']
-    
-    for code in encodings:
-        try:
-            with open(filename, 'r', encoding=code) as file:
-                lines = file.readlines()
-                
-                if not lines:
-                    return []
-                data_lines = lines[1:]
-                clean_lines = []
-                for line in data_lines:
-                    if line.strip(): 
-                        clean_lines.append(line.strip())
-                return clean_lines
-
-        except UnicodeDecodeError:
-            continue
-        except FileNotFoundError:
-            print(f"Error: Could not find the file at {filename}")
-            return []
-
-    return []
-
-
-# ... Part 3.2 ...
-
-def save_enriched_data(enriched_transactions, filename):
-    """
-    Saves the enriched data to a pipe-delimited text file.
-    """
-    try:
-        with open(filename, 'w', encoding='utf-8') as file:
-            header = "TransactionID|Date|ProductID|ProductName|Quantity|UnitPrice|CustomerID|Region|API_Category|API_Brand|API_Rating|API_Match\n"
-            file.write(header)
-            
-            for t in enriched_transactions:
-                line = (
-                    f"{t['TransactionID']}|{t['Date']}|{t['ProductID']}|{t['ProductName']}|"
-                    f"{t['Quantity']}|{t['UnitPrice']}|{t['CustomerID']}|{t['Region']}|"
-                    f"{t['API_Category']}|{t['API_Brand']}|{t['API_Rating']}|{t['API_Match']}\n"
-                )
-                file.write(line)
-                
-        print(f"Successfully saved {len(enriched_transactions)} records to {filename}")
-        return True
-        
-    except IOError as e:
-        print(f"Error saving file: {e}")
-        return False
\ No newline at end of file
+import codecs
+import contextlib
+import fnmatch
+import glob
+import gzip
+import io
+import os
+import stat
+import tempfile
+from itertools import islice
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+ENCODINGS = ['utf-8', 'latin-1', 'cp1252']
+
+# Bytes at the start of a file that detect_encoding decodes
+DETECT_SAMPLE_SIZE = 1024 * 1024
+
+ENRICHED_HEADER = "TransactionID|Date|ProductID|ProductName|Quantity|UnitPrice|CustomerID|Region|API_Category|API_Brand|API_Rating|API_Match\n"
+
+# Records formatted, encoded and written together by save_enriched_data
+WRITE_BATCH_ROWS = 8192
+
+# Buffer of the underlying output file
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+# Compression picked from the file name when none is given
+COMPRESSION_SUFFIXES = {'.gz': 'gzip', '.zst': 'zstd'}
+
+# Files picked up from a directory by expand_sales_paths
+SALES_FILE_PATTERNS = ('*.txt', '*.txt.gz', '*.txt.zst')
+
+
+def open_input(filename, encoding=None):
+    """
+    Opens a sales file for reading. Files ending in .gz (or .zst, when
+    zstandard is installed) are decompressed on the fly.
+    Returns: binary file object, or a text one when encoding is given.
+    Raises FileNotFoundError if the file does not exist, and ValueError
+    for a .zst file when zstandard is not installed.
+    """
+    compression = COMPRESSION_SUFFIXES.get(os.path.splitext(filename)[1])
+    if compression is None:
+        if encoding is None:
+            return open(filename, 'rb')
+        return open(filename, 'r', encoding=encoding)
+
+    if compression == 'gzip':
+        raw = gzip.open(filename, 'rb')
+    elif zstandard is None:
+        raise ValueError("reading .zst files needs the 'zstandard' package")
+    else:
+        raw = zstandard.open(filename, 'rb')
+    if encoding is None:
+        return raw
+    return io.TextIOWrapper(raw, encoding=encoding)
+
+
+def expand_sales_paths(sources):
+    """
+    Expands sales file names, directories and glob patterns into a list of
+    files. A directory contributes every file under it (recursively) that
+    matches SALES_FILE_PATTERNS; patterns may use '**'. Each file is listed
+    once, in the order the sources were given and sorted within each source.
+    Returns: list of file paths
+    """
+    paths = []
+    seen = set()
+    for source in sources:
+        if os.path.isdir(source):
+            matches = []
+            for directory, _, names in os.walk(source):
+                for pattern in SALES_FILE_PATTERNS:
+                    matches.extend(os.path.join(directory, name) for name in fnmatch.filter(names, pattern))
+        elif any(char in source for char in '*?['):
+            matches = [path for path in glob.glob(source, recursive=True) if os.path.isfile(path)]
+        else:
+            matches = [source]
+
+        for path in sorted(matches):
+            key = os.path.abspath(path)
+            if key not in seen:
+                seen.add(key)
+                paths.append(path)
+    return paths
+
+
+def detect_encoding(filename, sample_size=DETECT_SAMPLE_SIZE, block_size=1 << 20):
+    """
+    Finds the first encoding in ENCODINGS that can decode the start of the
+    file (its first sample_size bytes, or all of it with sample_size=None),
+    so the file is not decoded in full before it is read. A multi-byte
+    character cut off at the end of the sample is not an error. Bytes past
+    the sample may still fail to decode; the readers then go on with
+    next_encoding. The file is decoded block by block, so memory use stays flat.
+    Returns: str (encoding name) or None if none of them fit.
+    """
+    for code in ENCODINGS:
+        decoder = codecs.getincrementaldecoder(code)()
+        try:
+            with open_input(filename) as file:
+                read = 0
+                while sample_size is None or read < sample_size:
+                    size = block_size if sample_size is None else min(block_size, sample_size - read)
+                    block = file.read(size)
+                    if not block:
+                        decoder.decode(b'', final=True)
+                        break
+                    decoder.decode(block)
+                    read += len(block)
+            return code
+        except UnicodeDecodeError:
+            continue
+
+    return None
+
+
+def next_encoding(encoding):
+    """
+    Returns: the encoding in ENCODINGS to try once a file turns out not to
+    decode with encoding, or None if there is none left.
+    """
+    position = ENCODINGS.index(encoding) if encoding in ENCODINGS else len(ENCODINGS)
+    return ENCODINGS[position + 1] if position + 1 < len(ENCODINGS) else None
+
+
+def iter_sales_data(filename, encoding=None, fallback=True):
+    """
+    Lazily yields the cleaned data lines of the sales file, one at a time.
+    Skips the header (the first line) and any empty lines.
+    Lines are decoded with encoding, detected from the start of the file by
+    default. If a later line does not decode, reading goes on from that line
+    with next_encoding (the lines already yielded stay as they were); with
+    fallback=False the UnicodeDecodeError is raised instead.
+    Raises FileNotFoundError if the file does not exist.
+    """
+    if encoding is None:
+        encoding = detect_encoding(filename)
+        if encoding is None:
+            return
+
+    lines_read = 0
+    while True:
+        try:
+            with open_input(filename, encoding) as file:
+                lines = enumerate(file, 1)
+                # Skip what was read before the decoding error
+                next(islice(lines, lines_read, lines_read), None)
+                if lines_read == 0:
+                    if next(lines, None) is None:
+                        return
+                    lines_read = 1
+                for lines_read, line in lines:
+                    line = line.strip()
+                    if line:
+                        yield line
+            return
+        except UnicodeDecodeError:
+            encoding = next_encoding(encoding) if fallback else None
+            if encoding is None:
+                raise
+
+
+def read_sales_data(filename):
+    """
+    This function opens the file and reads the lines.
+    It ignores the header (the first line) and any empty lines.
+    The whole file is decoded with one encoding: if a line further on does
+    not decode, the file is read again with the next one.
+    """
+    try:
+        encoding = detect_encoding(filename)
+        while encoding is not None:
+            try:
+                return list(iter_sales_data(filename, encoding, fallback=False))
+            except UnicodeDecodeError:
+                encoding = next_encoding(encoding)
+        return []
+    except FileNotFoundError:
+        print(f"Error: Could not find the file at {filename}")
+        return []
+
+
+# ... Part 3.2 ...
+
+def output_compression(filename, compression=None):
+    """
+    Returns: 'gzip', 'zstd' or None. An explicit compression wins; otherwise it
+    follows the file suffix (.gz, .zst), and plain text is written for anything else.
+    """
+    if compression is None:
+        return COMPRESSION_SUFFIXES.get(os.path.splitext(filename)[1])
+    if compression == 'none':
+        return None
+    if compression not in ('gzip', 'zstd'):
+        raise ValueError(f"unknown compression: {compression}")
+    return compression
+
+
+def match_file_mode(tmp_path, filename):
+    """
+    Gives a temporary file the permissions it should have once it is renamed
+    over filename: the mode of the existing file, or the usual 0o666 less the
+    umask for a new one (mkstemp creates its files readable by the owner only).
+    """
+    try:
+        mode = stat.S_IMODE(os.stat(filename).st_mode)
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        mode = 0o666 & ~umask
+    os.chmod(tmp_path, mode)
+
+
+@contextlib.contextmanager
+def open_output(filename, compression=None, append=False):
+    """
+    Opens filename for writing bytes, optionally through gzip or zstd.
+    Text should be written as encode_text(text), so lines end as in a
+    text-mode file.
+    A new file is written to a temporary file in the same directory and
+    renamed over filename only when the block finishes without an error, so
+    readers never see a half-written file. With append=True the bytes go
+    straight onto the end of the existing file (compressed appends add a
+    new gzip member or zstd frame, which readers decode as one stream).
+    Raises ValueError if zstd is requested and zstandard is not installed.
+    """
+    compression = output_compression(filename, compression)
+    if compression == 'zstd' and zstandard is None:
+        raise ValueError("zstd compression needs the 'zstandard' package")
+
+    directory = os.path.dirname(filename) or '.'
+    if append:
+        raw = open(filename, 'ab', buffering=WRITE_BUFFER_SIZE)
+        tmp_path = None
+    else:
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.' + os.path.basename(filename) + '.')
+        raw = os.fdopen(fd, 'wb', buffering=WRITE_BUFFER_SIZE)
+
+    try:
+        with raw:
+            if compression == 'gzip':
+                # The original name goes into the gzip header, not the temp name
+                with gzip.GzipFile(filename=os.path.basename(filename), mode='wb',
+                                   compresslevel=6, fileobj=raw) as stream:
+                    yield stream
+            elif compression == 'zstd':
+                with zstandard.ZstdCompressor().stream_writer(raw, closefd=False) as stream:
+                    yield stream
+            else:
+                yield raw
+        if tmp_path is not None:
+            match_file_mode(tmp_path, filename)
+            os.replace(tmp_path, filename)
+    except BaseException:
+        if tmp_path is not None:
+            os.unlink(tmp_path)
+        raise
+
+
+def encode_text(text):
+    """
+    Encodes text for open_output the way a text-mode file would write it:
+    UTF-8, with each '\n' written as the platform's line separator.
+    Returns: bytes
+    """
+    if os.linesep != '\n':
+        text = text.replace('\n', os.linesep)
+    return text.encode('utf-8')
+
+
+def format_enriched_records(enriched_transactions):
+    """
+    Returns: the records as one pipe-delimited text block, a line per record.
+    """
+    return ''.join([
+        f"{t['TransactionID']}|{t['Date']}|{t['ProductID']}|{t['ProductName']}|"
+        f"{t['Quantity']}|{t['UnitPrice']}|{t['CustomerID']}|{t['Region']}|"
+        f"{t['API_Category']}|{t['API_Brand']}|{t['API_Rating']}|{t['API_Match']}\n"
+        for t in enriched_transactions
+    ])
+
+
+class _NothingToSave(Exception):
+    pass
+
+
+def save_enriched_data(enriched_transactions, filename, append=False, compression=None, require_rows=False):
+    """
+    Saves the enriched data to a pipe-delimited text file.
+    Accepts a list or any iterable of enriched records (e.g. a generator);
+    records are formatted and written WRITE_BATCH_ROWS at a time.
+    With append=True the records are added to the end of an existing file
+    (the header is only written if the file is new or empty); otherwise the
+    file is replaced atomically once every record is written.
+    compression is 'gzip', 'zstd' or 'none'; by default a '.gz' or '.zst'
+    filename is compressed accordingly.
+    With require_rows=True an iterable that turns out to hold no records
+    leaves the file as it was, and False is returned.
+    """
+    try:
+        count = 0
+        write_header = not append or not os.path.exists(filename) or os.path.getsize(filename) == 0
+        records = iter(enriched_transactions)
+        with open_output(filename, compression, append) as file:
+            while True:
+                batch = list(islice(records, WRITE_BATCH_ROWS))
+                if not batch:
+                    break
+                if write_header:
+                    file.write(encode_text(ENRICHED_HEADER))
+                    write_header = False
+                file.write(encode_text(format_enriched_records(batch)))
+                count += len(batch)
+
+            if not count and require_rows:
+                raise _NothingToSave
+            if write_header:
+                file.write(encode_text(ENRICHED_HEADER))
+                
+        print(f"Successfully saved {count} records to {filename}")
+        return True
+        
+    except _NothingToSave:
+        print(f"No records to save; {filename} was left unchanged")
+        return False
+    except (IOError, ValueError) as e:
+        print(f"Error saving file: {e}")
+        return False
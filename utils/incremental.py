@@ -0,0 +1,182 @@
+import hashlib
+import os
+import pickle
+import tempfile
+
+from utils.file_handler import detect_encoding, match_file_mode, next_encoding
+from utils.data_processor import (
+    iter_parse_transactions,
+    iter_validate_and_filter,
+    aggregate_transactions,
+    summarize_enrichment,
+    merge_filter_summaries
+)
+
+DEFAULT_STATE_FILE = 'data/incremental_state.pickle'
+STATE_VERSION = 2
+
+# Bytes of the processed prefix read and hashed at a time
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def prefix_digest(filename, offset):
+    """
+    Hashes the first `offset` bytes of the file, a block at a time. The
+    whole prefix is hashed, so an edit anywhere in the part already
+    processed changes the result. Keep feeding the returned hash object the
+    bytes read after offset (see iter_new_lines) to get the checksum of the
+    longer prefix without reading the file again.
+    Returns: hashlib sha256 object
+    """
+    digest = hashlib.sha256()
+    remaining = offset
+    with open(filename, 'rb') as file:
+        while remaining:
+            block = file.read(min(remaining, HASH_BLOCK_SIZE))
+            if not block:
+                break
+            digest.update(block)
+            remaining -= len(block)
+    return digest
+
+
+def new_state(filename, filters, distinct_error=None, encoding=None):
+    return {
+        'version': STATE_VERSION,
+        'source': os.path.abspath(filename),
+        'encoding': encoding or detect_encoding(filename),
+        'filters': filters,
+        'offset': 0,
+        'fingerprint': None,
+        'stats': aggregate_transactions([], distinct_error=distinct_error),
+        'summary': {},
+        'enrichment': summarize_enrichment([])
+    }
+
+
+def load_state(state_file=DEFAULT_STATE_FILE):
+    """
+    Loads the persisted incremental state.
+    Returns: dict, or None if there is no usable state file.
+    """
+    try:
+        with open(state_file, 'rb') as file:
+            state = pickle.load(file)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+        return None
+    if not isinstance(state, dict) or state.get('version') != STATE_VERSION:
+        return None
+    return state
+
+
+def save_state(state, state_file=DEFAULT_STATE_FILE):
+    """
+    Atomically writes the incremental state (offset, checksum and aggregates).
+    """
+    directory = os.path.dirname(state_file) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.incremental_state.')
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            pickle.dump(state, file, protocol=pickle.HIGHEST_PROTOCOL)
+        match_file_mode(tmp_path, state_file)
+        os.replace(tmp_path, state_file)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _resume_digest(state, filename, filters, distinct_error):
+    # Returns: hash of the processed prefix if the state can be resumed, else None
+    if state is None:
+        return None
+    if state['source'] != os.path.abspath(filename) or state['filters'] != filters:
+        return None
+    if state['stats'].get('distinct_error') != distinct_error:
+        return None
+    if state['encoding'] is None or os.path.getsize(filename) < state['offset']:
+        return None
+    digest = prefix_digest(filename, state['offset'])
+    return digest if digest.hexdigest() == state['fingerprint'] else None
+
+
+def iter_new_lines(filename, offset, encoding, position, digest=None):
+    """
+    Yields the cleaned, non-empty lines from byte offset onwards. Only lines
+    terminated by a newline are read; a trailing partial line is left for the
+    next run. position[0] is kept at the end of the last line consumed.
+    If digest (from prefix_digest(filename, offset)) is given, every byte
+    consumed is fed to it, so it ends up hashing the first position[0] bytes.
+    """
+    with open(filename, 'rb') as file:
+        file.seek(offset)
+        if offset == 0:
+            header = file.readline()
+            if not header.endswith(b'\n'):
+                return
+            position[0] = file.tell()
+            if digest is not None:
+                digest.update(header)
+
+        for raw in file:
+            if not raw.endswith(b'\n'):
+                break
+            position[0] += len(raw)
+            if digest is not None:
+                digest.update(raw)
+            line = raw.decode(encoding).strip()
+            if line:
+                yield line
+
+
+def process_incremental(filename, region=None, min_amount=None, max_amount=None,
+                        state_file=DEFAULT_STATE_FILE, distinct_error=None):
+    """
+    Parses, validates and aggregates only the rows appended since the last run
+    and folds them into the persisted aggregates. Starts over from the top if
+    there is no state, the filters or the distinct_error mode (see
+    aggregate_transactions) changed, or the processed prefix no longer
+    matches its checksum (a hash of every byte up to the saved offset, so the
+    prefix is read once per run; the new rows extend the same hash). The
+    updated state is returned, not saved: enrich the
+    new rows, add them to state['enrichment'], then call save_state.
+    Returns: tuple (state, new_rows, resumed)
+    Raises FileNotFoundError if the file does not exist.
+    """
+    filters = (region, min_amount, max_amount)
+    state = load_state(state_file)
+    digest = _resume_digest(state, filename, filters, distinct_error)
+    resumed = digest is not None
+    if not resumed:
+        state = new_state(filename, filters, distinct_error)
+        digest = hashlib.sha256()
+
+    while True:
+        try:
+            new_rows, summary, offset = _read_new_rows(filename, state, filters, digest)
+            break
+        except UnicodeDecodeError:
+            # The rows need a different encoding than the start of the file: start over with the next one
+            encoding = next_encoding(state['encoding'])
+            if encoding is None:
+                raise
+            resumed = False
+            state = new_state(filename, filters, distinct_error, encoding)
+            digest = hashlib.sha256()
+
+    aggregate_transactions(new_rows, state['stats'])
+    merge_filter_summaries(state['summary'], summary)
+    state['offset'] = offset
+    state['fingerprint'] = digest.hexdigest()
+
+    return state, new_rows, resumed
+
+
+def _read_new_rows(filename, state, filters, digest):
+    position = [state['offset']]
+    summary = {}
+    new_rows = list(iter_validate_and_filter(
+        iter_parse_transactions(iter_new_lines(filename, state['offset'], state['encoding'], position, digest)),
+        *filters, summary
+    ))
+    return new_rows, summary, position[0]
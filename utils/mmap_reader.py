@@ -0,0 +1,253 @@
+"""
+Memory-mapped reader for the pipe-delimited sales file.
+
+The file is never read into Python strings as a whole. iter_lines hands out
+lines as memoryview slices of the mapping; iter_mapped_transactions splits
+the mapping a window at a time into bytes lines and fields, and decodes the
+repeating text fields (Date, ProductID, ProductName, CustomerID, Region)
+once per distinct value, so equal values share one string. Any byte range
+can be read on its own, so parallel workers map the file and go straight to
+their part of it.
+
+All supported encodings (see file_handler.ENCODINGS) are ASCII-compatible,
+so splitting on b'\\n' and b'|' before decoding is safe.
+"""
+import mmap
+
+from utils.file_handler import detect_encoding
+from utils.data_processor import iter_parse_transactions
+
+# Bytes of the mapping split into lines at a time by iter_raw_lines
+WINDOW_SIZE = 256 * 1024
+
+# Bytes of already-read mapping handed back to the kernel at a time
+RELEASE_SIZE = 8 * 1024 * 1024
+_CAN_RELEASE = hasattr(mmap.mmap, 'madvise') and hasattr(mmap, 'MADV_DONTNEED')
+
+# Bytes that str.strip() removes but bytes.strip() does not
+_CONTROL_SPACE = (b'\x1c', b'\x1d', b'\x1e', b'\x1f')
+_TEXT_ONLY_SPACE = frozenset(range(0x1c, 0x20)) | frozenset(range(0x80, 0x100))
+
+
+class MappedSalesFile:
+    """
+    Read-only memory map of a sales file, used as a context manager:
+
+        with MappedSalesFile('data/sales_data.txt') as mapped:
+            for view in mapped.iter_lines():
+                ...
+
+    Raises FileNotFoundError if the file does not exist.
+    """
+
+    def __init__(self, filename, encoding=None):
+        self.filename = filename
+        self.encoding = encoding or detect_encoding(filename)
+        self._file = open(filename, 'rb')
+        try:
+            self.size = self._file.seek(0, 2)
+            # mmap cannot map an empty file
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b''
+        except BaseException:
+            self._file.close()
+            raise
+
+        if self.size and hasattr(mmap.mmap, 'madvise') and hasattr(mmap, 'MADV_SEQUENTIAL'):
+            self._map.madvise(mmap.MADV_SEQUENTIAL)
+
+        self.data_start = self._header_end()
+
+    def _header_end(self):
+        # The header ends at the first '\n', '\r\n' or lone '\r', as in text mode
+        newline = self._map.find(b'\n')
+        end = self._map.find(b'\r', 0, self.size if newline < 0 else newline)
+        if end < 0:
+            end = newline
+        if end < 0:
+            return self.size
+        if self._map[end:end + 2] == b'\r\n':
+            return end + 2
+        return end + 1
+
+    def close(self):
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def line_start(self, offset):
+        """
+        Returns: byte offset of the first line that starts at or after offset
+        (never inside the header).
+        """
+        if offset <= self.data_start:
+            return self.data_start
+        if offset >= self.size:
+            return self.size
+        if self._map[offset - 1:offset] == b'\n':
+            return offset
+        end = self._map.find(b'\n', offset)
+        return self.size if end < 0 else end + 1
+
+    def iter_line_spans(self, start=None, end=None):
+        """
+        Yields (start, end) byte offsets of the lines starting in [start, end),
+        without their line terminator. Defaults to the whole data section.
+        """
+        data = self._map
+        pos = self.line_start(self.data_start if start is None else start)
+        stop = self.size if end is None else min(end, self.size)
+        find = data.find
+
+        while pos < stop:
+            newline = find(b'\n', pos)
+            if newline < 0:
+                newline = self.size
+            yield pos, newline
+            pos = newline + 1
+
+    def iter_lines(self, start=None, end=None):
+        """
+        Yields the non-empty lines starting in [start, end) as memoryview
+        slices of the mapping (no copy, no decoding). Surrounding ASCII
+        whitespace, including '\\r', is trimmed.
+        """
+        view = memoryview(self._map)
+        try:
+            for line_start, line_end in self.iter_line_spans(start, end):
+                while line_start < line_end and view[line_start] in b' \t\r\x0b\x0c':
+                    line_start += 1
+                while line_end > line_start and view[line_end - 1] in b' \t\r\x0b\x0c':
+                    line_end -= 1
+                if line_start < line_end:
+                    yield view[line_start:line_end]
+        finally:
+            view.release()
+
+    def decode(self, raw):
+        """
+        Decodes a line or field (bytes or memoryview) with the file's encoding.
+        """
+        return str(raw, self.encoding)
+
+    def iter_windows(self, start=None, end=None, window=WINDOW_SIZE):
+        """
+        Yields the lines starting in [start, end) as bytes chunks of about
+        `window` bytes, each cut after a newline. Line ends are normalised
+        to '\\n' like text mode does, including a lone '\\r'.
+        """
+        data = self._map
+        find = data.find
+        pos = self.line_start(self.data_start if start is None else start)
+        stop = self.size if end is None else min(end, self.size)
+
+        released = pos - pos % mmap.PAGESIZE
+
+        while pos < stop:
+            # Extend the window to the end of the line that contains its last byte
+            newline = find(b'\n', min(pos + window, stop) - 1)
+            window_end = self.size if newline < 0 else newline + 1
+            chunk = data[pos:window_end]
+            pos = window_end
+
+            if b'\r' in chunk:
+                chunk = chunk.replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+            yield chunk
+
+            # Pages already read are dropped from RSS; the kernel re-reads them if needed
+            if _CAN_RELEASE and pos - released >= RELEASE_SIZE:
+                boundary = pos - pos % mmap.PAGESIZE
+                data.madvise(mmap.MADV_DONTNEED, released, boundary - released)
+                released = boundary
+
+    def iter_raw_lines(self, start=None, end=None):
+        """
+        Yields the non-empty, ASCII-stripped lines starting in [start, end) as bytes.
+        """
+        for chunk in self.iter_windows(start, end):
+            for line in chunk.split(b'\n'):
+                line = line.strip()
+                if line:
+                    yield line
+
+
+class _DecodeCache(dict):
+    """
+    bytes -> str mapping that decodes each distinct value on first lookup.
+    """
+    __slots__ = ('encoding',)
+
+    def __init__(self, encoding):
+        super().__init__()
+        self.encoding = encoding
+
+    def __missing__(self, raw):
+        value = self[raw] = str(raw, self.encoding)
+        return value
+
+
+def iter_mapped_transactions(mapped, start=None, end=None):
+    """
+    Parses the lines starting in byte range [start, end) of a MappedSalesFile.
+    Same rules and output as iter_parse_transactions over iter_sales_data, but
+    fields are split as bytes; TransactionID is decoded per row, the other
+    text fields once per distinct value.
+    Raises UnicodeDecodeError if any byte of the range does not decode, even
+    in a field or line that is never parsed, as reading it in text mode would.
+    """
+    decode = mapped.decode
+    text = _DecodeCache(mapped.encoding)
+
+    for chunk in mapped.iter_windows(start, end):
+        ascii_only = chunk.isascii()
+        if not ascii_only:
+            # Windows end after a newline, so no multi-byte character is cut
+            decode(chunk)
+        # Plain ASCII without commas: bytes.strip() and str.strip() agree and
+        # no comma cleaning is needed, so no line in the window needs checking
+        clean = ascii_only and b',' not in chunk and not any(c in chunk for c in _CONTROL_SPACE)
+
+        for line in chunk.split(b'\n'):
+            line = line.strip()
+            if not line:
+                continue
+            if not clean and (b',' in line or line[0] in _TEXT_ONLY_SPACE or line[-1] in _TEXT_ONLY_SPACE):
+                # Needs str.strip() or the comma cleaning: use the text path
+                yield from iter_parse_transactions((decode(line).strip(),))
+                continue
+
+            try:
+                trans_id, date, prod_id, prod_name, qty_raw, price_raw, cust_id, region = line.split(b'|')
+            except ValueError:
+                continue
+            if not trans_id.startswith(b'T') or not cust_id or not region:
+                continue
+
+            try:
+                quantity = int(qty_raw)
+                unit_price = float(price_raw)
+            except ValueError:
+                try:
+                    # int()/float() accept more whitespace in str than in bytes
+                    quantity = int(decode(qty_raw))
+                    unit_price = float(decode(price_raw))
+                except ValueError:
+                    continue
+            if quantity <= 0 or unit_price <= 0:
+                continue
+
+            yield {
+                'TransactionID': decode(trans_id),
+                'Date': text[date],
+                'ProductID': text[prod_id],
+                'ProductName': text[prod_name],
+                'Quantity': quantity,
+                'UnitPrice': unit_price,
+                'CustomerID': text[cust_id],
+                'Region': text[region]
+            }
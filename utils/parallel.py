@@ -0,0 +1,291 @@
+import math
+import os
+
+from utils.file_handler import detect_encoding, next_encoding, iter_sales_data, COMPRESSION_SUFFIXES, DETECT_SAMPLE_SIZE
+from utils.mmap_reader import MappedSalesFile, iter_mapped_transactions
+from utils.data_processor import (
+    iter_parse_transactions,
+    iter_validate_and_filter,
+    aggregate_transactions,
+    merge_aggregates,
+    merge_filter_summaries
+)
+
+
+def chunk_ranges(filename, chunks):
+    """
+    Splits the data part of the file (everything after the header line) into
+    roughly equal byte ranges whose boundaries fall just after a newline.
+    Returns: list of (start, end) byte offsets.
+    """
+    size = os.path.getsize(filename)
+
+    with open(filename, 'rb') as file:
+        file.readline()
+        data_start = file.tell()
+        if data_start >= size:
+            return []
+
+        step = max(1, (size - data_start) // max(1, chunks))
+        boundaries = [data_start]
+        for i in range(1, chunks):
+            # Reading the rest of the line that contains byte (target - 1)
+            # lands exactly on target when target already starts a line
+            file.seek(data_start + i * step - 1)
+            file.readline()
+            boundary = file.tell()
+            if boundaries[-1] < boundary < size:
+                boundaries.append(boundary)
+        boundaries.append(size)
+
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+
+def process_range(filename, start, end, encoding, region=None, min_amount=None, max_amount=None, keep_rows=True,
+                  distinct_error=None):
+    """
+    Parses, validates and aggregates one byte range of the sales file.
+    Runs inside a worker process, which maps the file and reads only its range.
+    With encoding=None the worker detects the encoding itself, and since the
+    range is then the whole file, falls back to next_encoding if a line
+    further on does not decode; a given encoding that does not fit raises
+    UnicodeDecodeError.
+    Returns: tuple (stats, filter_summary, rows or None)
+    """
+    if encoding is not None:
+        return _process_range(filename, start, end, encoding, region, min_amount, max_amount, keep_rows,
+                              distinct_error)
+
+    encoding = detect_encoding(filename)
+    while encoding is not None:
+        try:
+            return _process_range(filename, start, end, encoding, region, min_amount, max_amount, keep_rows,
+                                  distinct_error)
+        except UnicodeDecodeError:
+            encoding = next_encoding(encoding)
+    # Undecodable files contribute nothing, as in process_file_parallel
+    return aggregate_transactions([], distinct_error=distinct_error), {}, [] if keep_rows else None
+
+
+def _process_range(filename, start, end, encoding, region, min_amount, max_amount, keep_rows, distinct_error):
+    summary = {}
+    with MappedSalesFile(filename, encoding) as mapped:
+        valid = iter_validate_and_filter(
+            iter_mapped_transactions(mapped, start, end),
+            region, min_amount, max_amount, summary
+        )
+
+        if keep_rows:
+            rows = list(valid)
+            stats = aggregate_transactions(rows, distinct_error=distinct_error)
+        else:
+            rows = None
+            stats = aggregate_transactions(valid, distinct_error=distinct_error)
+
+    return stats, summary, rows
+
+
+def _process_range_task(args):
+    return process_range(*args)
+
+
+def process_file_parallel(filename, workers=None, region=None, min_amount=None, max_amount=None,
+                          keep_rows=True, chunks_per_worker=4, distinct_error=None):
+    """
+    Parses, validates and aggregates the sales file in a process pool.
+    The file is split into newline-aligned byte ranges; each worker returns
+    mergeable partial aggregates, which are combined in file order.
+    distinct_error is passed on to aggregate_transactions.
+    The encoding is detected from the start of the file; if a range does
+    not decode with it, the file is processed again with next_encoding.
+    Returns: tuple (stats, filter_summary, rows or None)
+    Raises FileNotFoundError if the file does not exist.
+    """
+    workers = workers or os.cpu_count() or 1
+    encoding = detect_encoding(filename)
+    while True:
+        try:
+            return _process_file_parallel(filename, encoding, workers, region, min_amount, max_amount,
+                                          keep_rows, chunks_per_worker, distinct_error)
+        except UnicodeDecodeError:
+            encoding = next_encoding(encoding)
+
+
+def _process_file_parallel(filename, encoding, workers, region, min_amount, max_amount, keep_rows,
+                           chunks_per_worker, distinct_error):
+    ranges = chunk_ranges(filename, workers * chunks_per_worker) if encoding else []
+
+    stats = aggregate_transactions([], distinct_error=distinct_error)
+    summary = {}
+    rows = [] if keep_rows else None
+
+    tasks = [
+        (filename, start, end, encoding, region, min_amount, max_amount, keep_rows, distinct_error)
+        for start, end in ranges
+    ]
+
+    # Imported here: the process pool machinery (multiprocessing) is only needed in parallel runs
+    from concurrent.futures import ProcessPoolExecutor
+
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        results = pool.map(_process_range_task, tasks) if pool else map(_process_range_task, tasks)
+        for part_stats, part_summary, part_rows in results:
+            merge_aggregates(stats, part_stats)
+            merge_filter_summaries(summary, part_summary)
+            if keep_rows:
+                rows.extend(part_rows)
+    finally:
+        if pool:
+            pool.shutdown()
+
+    for key in ('total_input', 'invalid', 'filtered_by_region', 'filtered_by_amount', 'final_count'):
+        summary.setdefault(key, 0)
+
+    return stats, summary, rows
+
+
+# Plain files larger than this are split into byte ranges of about this size
+SPLIT_BYTES = 64 * 1024 * 1024
+
+
+def process_compressed_file(filename, region=None, min_amount=None, max_amount=None, keep_rows=True,
+                            distinct_error=None):
+    """
+    Parses, validates and aggregates a whole compressed sales file, which
+    cannot be split or mapped, by streaming it through the generator stages.
+    The whole file is decoded with one encoding, as in read_sales_data.
+    Returns: tuple (stats, filter_summary, rows or None)
+    """
+    encoding = detect_encoding(filename)
+    while encoding is not None:
+        summary = {}
+        valid = iter_validate_and_filter(
+            iter_parse_transactions(iter_sales_data(filename, encoding, fallback=False)),
+            region, min_amount, max_amount, summary
+        )
+
+        try:
+            if keep_rows:
+                rows = list(valid)
+                stats = aggregate_transactions(rows, distinct_error=distinct_error)
+            else:
+                rows = None
+                stats = aggregate_transactions(valid, distinct_error=distinct_error)
+            return stats, summary, rows
+        except UnicodeDecodeError:
+            encoding = next_encoding(encoding)
+
+    return aggregate_transactions([], distinct_error=distinct_error), {}, [] if keep_rows else None
+
+
+def _process_file_task(args):
+    kind, task_args = args
+    if kind == 'compressed':
+        return process_compressed_file(*task_args)
+    return process_range(*task_args)
+
+
+def estimated_size(filename):
+    """
+    Returns: int, the number of bytes of text in the file. For gzip files this
+    is the uncompressed size stored in the trailer (modulo 4 GiB, as gzip
+    records it); other compressed files count with their size on disk.
+    """
+    size = os.path.getsize(filename)
+    if filename.endswith('.gz') and size >= 18:
+        with open(filename, 'rb') as file:
+            file.seek(-4, 2)
+            size = max(size, int.from_bytes(file.read(4), 'little'))
+    return size
+
+
+def plan_file_tasks(filenames, region=None, min_amount=None, max_amount=None, keep_rows=True,
+                    distinct_error=None, split_bytes=SPLIT_BYTES, sample_size=DETECT_SAMPLE_SIZE):
+    """
+    Turns the sales files into work items for process_files_parallel, in file
+    order. A plain file is one item, or several newline-aligned byte ranges
+    when it is larger than split_bytes; a compressed file is always one item.
+    The encoding of a split file is detected here from its first sample_size
+    bytes (see detect_encoding).
+    Returns: list of (estimated bytes, task) tuples.
+    Raises FileNotFoundError if a file does not exist.
+    """
+    filters = (region, min_amount, max_amount, keep_rows, distinct_error)
+    tasks = []
+    for filename in filenames:
+        size = estimated_size(filename)
+        if os.path.splitext(filename)[1] in COMPRESSION_SUFFIXES:
+            tasks.append((size, ('compressed', (filename,) + filters)))
+            continue
+
+        pieces = max(1, math.ceil(size / split_bytes))
+        # Small files detect their encoding in the worker; a split file is detected once here
+        encoding = detect_encoding(filename, sample_size) if pieces > 1 else None
+        if pieces > 1 and encoding is None:
+            continue
+        for start, end in chunk_ranges(filename, pieces):
+            tasks.append((end - start, ('range', (filename, start, end, encoding) + filters)))
+    return tasks
+
+
+def process_files_parallel(filenames, workers=None, region=None, min_amount=None, max_amount=None,
+                           keep_rows=True, distinct_error=None, split_bytes=SPLIT_BYTES):
+    """
+    Parses, validates and aggregates many sales files (plain, .gz or .zst)
+    in a process pool and merges the per-file results into one.
+    Work items are handed out largest first, so a big file starts early
+    instead of finishing last, and each idle worker takes the next one.
+    Results are merged in file order as soon as every earlier item is in,
+    so the merged rows and aggregates match a serial run over the files.
+    Returns: tuple (stats, filter_summary, rows or None)
+    Raises FileNotFoundError if a file does not exist.
+    """
+    workers = workers or os.cpu_count() or 1
+    tasks = plan_file_tasks(filenames, region, min_amount, max_amount, keep_rows, distinct_error,
+                            split_bytes)
+    try:
+        return _run_file_tasks(tasks, workers, keep_rows, distinct_error)
+    except UnicodeDecodeError:
+        # A split file stops decoding past its start: detect the split files on all their bytes
+        tasks = plan_file_tasks(filenames, region, min_amount, max_amount, keep_rows, distinct_error,
+                                split_bytes, sample_size=None)
+        return _run_file_tasks(tasks, workers, keep_rows, distinct_error)
+
+
+def _run_file_tasks(tasks, workers, keep_rows, distinct_error):
+    stats = aggregate_transactions([], distinct_error=distinct_error)
+    summary = {}
+    rows = [] if keep_rows else None
+
+    def merge(result):
+        part_stats, part_summary, part_rows = result
+        merge_aggregates(stats, part_stats)
+        merge_filter_summaries(summary, part_summary)
+        if keep_rows:
+            rows.extend(part_rows)
+
+    if workers > 1 and len(tasks) > 1:
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+
+        pool = ProcessPoolExecutor(max_workers=workers)
+        try:
+            by_size = sorted(range(len(tasks)), key=lambda i: tasks[i][0], reverse=True)
+            futures = {pool.submit(_process_file_task, tasks[i][1]): i for i in by_size}
+            finished = {}
+            next_index = 0
+            for future in as_completed(futures):
+                finished[futures[future]] = future.result()
+                while next_index in finished:
+                    merge(finished.pop(next_index))
+                    next_index += 1
+        finally:
+            pool.shutdown(cancel_futures=True)
+    else:
+        for _, task in tasks:
+            merge(_process_file_task(task))
+
+    for key in ('total_input', 'invalid', 'filtered_by_region', 'filtered_by_amount', 'final_count'):
+        summary.setdefault(key, 0)
+
+    return stats, summary, rows
@@ -0,0 +1,197 @@
+import os
+import pickle
+import tempfile
+import threading
+import time
+
+from utils.api_handler import API_BASE_URL, fetch_all_products, fetch_products_by_ids, create_product_mapping
+from utils.file_handler import match_file_mode
+
+DEFAULT_CACHE_FILE = 'data/product_cache.pickle'
+DEFAULT_TTL = 24 * 60 * 60
+CACHE_VERSION = 2
+
+# Per-process counters of how product mapping lookups were served
+cache_stats = {'hit': 0, 'miss': 0, 'stale': 0, 'error': 0, 'refreshed': 0}
+
+_refresh_thread = None
+# (cache_file, base_url) pairs with a background refresh running
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+
+
+def read_cache(cache_file=DEFAULT_CACHE_FILE, base_url=API_BASE_URL):
+    """
+    Loads a cache entry written by write_cache for the API at base_url.
+    Returns: dict with 'fetched_at', 'mapping', 'checked_at' and 'not_found',
+    or None if missing, unreadable or cached from another API.
+    """
+    try:
+        with open(cache_file, 'rb') as file:
+            entry = pickle.load(file)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+        return None
+
+    if not isinstance(entry, dict) or entry.get('version') != CACHE_VERSION:
+        return None
+    if entry.get('base_url') != base_url:
+        return None
+    return entry
+
+
+def write_cache(mapping, cache_file=DEFAULT_CACHE_FILE, fetched_at=None, not_found=None,
+                base_url=API_BASE_URL, checked_at=None):
+    """
+    Atomically stores a product mapping (from create_product_mapping) on disk
+    for the API at base_url. fetched_at is when the full catalog was fetched,
+    or None for a partial mapping built from demand lookups. checked_at maps
+    each product ID in mapping or in not_found (IDs the API reported as not
+    found) to when it was last fetched; by default every product counts as
+    fetched at fetched_at.
+    """
+    if checked_at is None:
+        checked_at = dict.fromkeys(mapping, fetched_at if fetched_at is not None else time.time())
+    entry = {
+        'version': CACHE_VERSION,
+        'base_url': base_url,
+        'fetched_at': fetched_at,
+        'mapping': mapping,
+        'checked_at': checked_at,
+        'not_found': set(not_found or ())
+    }
+    directory = os.path.dirname(cache_file) or '.'
+    os.makedirs(directory, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.product_cache.')
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            pickle.dump(entry, file, protocol=pickle.HIGHEST_PROTOCOL)
+        match_file_mode(tmp_path, cache_file)
+        os.replace(tmp_path, cache_file)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _fetch_mapping(base_url):
+    products = fetch_all_products(base_url)
+    if not products:
+        return None
+    return create_product_mapping(products)
+
+
+def _refresh(cache_file, base_url):
+    try:
+        mapping = _fetch_mapping(base_url)
+        if mapping is None:
+            cache_stats['error'] += 1
+            return
+        write_cache(mapping, cache_file, time.time(), base_url=base_url)
+        cache_stats['refreshed'] += 1
+    finally:
+        with _refreshing_lock:
+            _refreshing.discard((cache_file, base_url))
+
+
+def _background_refresh(cache_file, base_url):
+    # Runs in its own thread: a failure is reported, the stale entry stays in place
+    try:
+        _refresh(cache_file, base_url)
+    except Exception as e:
+        cache_stats['error'] += 1
+        print(f" ! Background refresh of the product catalog failed: {e}")
+
+
+def wait_for_refresh(timeout=None):
+    """
+    Blocks until a background revalidation started by get_product_mapping finishes.
+    """
+    if _refresh_thread is not None:
+        _refresh_thread.join(timeout)
+
+
+def get_product_mapping(cache_file=DEFAULT_CACHE_FILE, ttl=DEFAULT_TTL, base_url=API_BASE_URL,
+                        background_refresh=True):
+    """
+    Returns the product mapping, served from the on-disk cache when possible.
+      - fresh entry (full catalog fetched less than ttl seconds ago): returned
+        without touching the network
+      - stale entry: returned immediately, and refreshed from the API in a
+        background thread (or in-line if background_refresh is False),
+        unless a refresh of that entry is already running; if the refresh
+        fails the stale entry stays in place
+      - no entry, or only the partial mapping left by demand lookups
+        (get_product_mapping_for_ids): fetched from the API and stored
+    Returns: tuple (mapping, status) where status is 'hit', 'stale', 'miss' or 'error'.
+    """
+    global _refresh_thread
+
+    entry = read_cache(cache_file, base_url)
+
+    if entry is not None and entry['fetched_at'] is not None:
+        age = time.time() - entry['fetched_at']
+        if age <= ttl:
+            cache_stats['hit'] += 1
+            return entry['mapping'], 'hit'
+
+        cache_stats['stale'] += 1
+        with _refreshing_lock:
+            start_refresh = (cache_file, base_url) not in _refreshing
+            _refreshing.add((cache_file, base_url))
+        if start_refresh and background_refresh:
+            _refresh_thread = threading.Thread(target=_background_refresh, args=(cache_file, base_url))
+            _refresh_thread.start()
+        elif start_refresh:
+            _refresh(cache_file, base_url)
+        return entry['mapping'], 'stale'
+
+    cache_stats['miss'] += 1
+    mapping = _fetch_mapping(base_url)
+    if mapping is None:
+        cache_stats['error'] += 1
+        return {}, 'error'
+
+    write_cache(mapping, cache_file, time.time(), base_url=base_url)
+    return mapping, 'miss'
+
+
+def get_product_mapping_for_ids(product_ids, cache_file=DEFAULT_CACHE_FILE, ttl=DEFAULT_TTL,
+                                base_url=API_BASE_URL):
+    """
+    Demand-driven lookup: returns the cached mapping extended with any of the
+    requested numeric product IDs it was missing, fetched one by one.
+    Freshness is tracked per product: IDs fetched (or found not to exist)
+    less than ttl seconds ago are not requested again, older ones are
+    re-fetched (the cached details stay as a fallback if that fails).
+    The lookups are stored with the catalog, but only a full catalog fetch
+    makes the entry complete for get_product_mapping.
+    Returns: tuple (mapping, number of products fetched)
+    """
+    wanted = {product_id for product_id in product_ids if product_id is not None}
+
+    now = time.time()
+    entry = read_cache(cache_file, base_url)
+    mapping = dict(entry['mapping']) if entry is not None else {}
+    checked_at = dict(entry['checked_at']) if entry is not None else {}
+    not_found = set(entry['not_found']) if entry is not None else set()
+
+    missing = {product_id for product_id in wanted
+               if now - checked_at.get(product_id, float('-inf')) > ttl}
+    if not missing:
+        cache_stats['hit'] += 1
+        return mapping, 0
+
+    cache_stats['stale' if missing & checked_at.keys() else 'miss'] += 1
+    products, missing_ids = fetch_products_by_ids(missing, base_url)
+    fetched = create_product_mapping(products)
+    if not fetched and not missing_ids:
+        cache_stats['error'] += 1
+        return mapping, 0
+
+    mapping.update(fetched)
+    not_found = (not_found | missing_ids) - fetched.keys()
+    checked_at.update(dict.fromkeys(fetched.keys() | missing_ids, now))
+    # The full catalog's timestamp is kept as it was, so its refresh is still due when it expires
+    write_cache(mapping, cache_file, entry['fetched_at'] if entry is not None else None, not_found,
+                base_url, checked_at)
+    return mapping, len(fetched)
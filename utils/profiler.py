@@ -0,0 +1,206 @@
+"""
+Stage profiler for the pipeline in main.py.
+
+Each stage (read, parse, validate, fetch, enrich, save, report, ...) is
+wrapped in `with profiler.stage(name) as stage:`; the caller sets
+stage['rows'] to the number of records it handled. Individual functions
+(e.g. the data_processor metric views) can be instrumented as well; their
+calls are totalled per function name.
+
+For every stage the profile records wall time, CPU time of the thread that
+ran it (worker processes are not included), rows and rows/sec, and, if
+memory tracing is on, the peak tracemalloc memory above the level at which
+the stage started. Stages may nest or overlap (e.g. in threads): whenever
+a stage starts or ends, the current peak is folded into every running
+stage before the tracemalloc peak is reset.
+"""
+import cProfile
+import contextlib
+import datetime
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+
+class StageProfiler:
+
+    def __init__(self):
+        self.stages = []
+        self.functions = {}
+        self.trace_memory = False
+        self.started = time.perf_counter()
+        self._started_wall = datetime.datetime.now()
+        self._run_peak = 0
+        self._active = []
+        self._lock = threading.Lock()
+        self._cprofile = None
+        self._patched = []
+
+    def start(self, trace_memory=False, cprofile=False):
+        """
+        Starts a profiled run. trace_memory turns tracemalloc on (it slows
+        Python code down noticeably); cprofile also records a cProfile of
+        the main thread.
+        """
+        self.stages = []
+        self.functions = {}
+        self.started = time.perf_counter()
+        self._started_wall = datetime.datetime.now()
+        self.trace_memory = trace_memory
+        self._run_peak = 0
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if cprofile:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+
+    def _fold_peak(self):
+        # Called with the lock held
+        if self.trace_memory:
+            peak = tracemalloc.get_traced_memory()[1]
+            self._run_peak = max(self._run_peak, peak)
+            for record in self._active:
+                if peak > record['_peak']:
+                    record['_peak'] = peak
+            tracemalloc.reset_peak()
+
+    def _begin(self, name):
+        record = {'name': name, 'rows': None}
+        with self._lock:
+            self._fold_peak()
+            record['_memory'] = tracemalloc.get_traced_memory()[0] if self.trace_memory else 0
+            record['_peak'] = record['_memory']
+            self._active.append(record)
+        record['_wall'] = time.perf_counter()
+        record['start_s'] = round(record['_wall'] - self.started, 6)
+        record['_cpu'] = time.thread_time()
+        return record
+
+    def _end(self, record):
+        wall = time.perf_counter() - record.pop('_wall')
+        cpu = time.thread_time() - record.pop('_cpu')
+        with self._lock:
+            self._fold_peak()
+            self._active.remove(record)
+        start_memory = record.pop('_memory')
+        peak = record.pop('_peak')
+
+        record['wall_s'] = round(wall, 6)
+        record['cpu_s'] = round(cpu, 6)
+        record['peak_memory_bytes'] = peak - start_memory if self.trace_memory else None
+        rows = record['rows']
+        record['rows_per_s'] = round(rows / wall, 1) if rows and wall > 0 else None
+        return record
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """
+        Profiles the enclosed block as one pipeline stage.
+        Yields the stage record; set record['rows'] to report throughput.
+        """
+        record = self._begin(name)
+        try:
+            yield record
+        finally:
+            self.stages.append(self._end(record))
+
+    def wrap(self, func, name=None):
+        """
+        Returns: func wrapped so that its calls are totalled under name
+        (default: the function's name). The row count is taken from the
+        first argument when it is a list.
+        """
+        name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            record = self._begin(name)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                if args and isinstance(args[0], list):
+                    record['rows'] = len(args[0])
+                self._add_call(self._end(record))
+
+        wrapper.__wrapped__ = func
+        return wrapper
+
+    def _add_call(self, record):
+        with self._lock:
+            totals = self.functions.setdefault(record['name'], {
+                'calls': 0, 'wall_s': 0.0, 'cpu_s': 0.0, 'rows': 0,
+                'peak_memory_bytes': 0 if self.trace_memory else None
+            })
+            totals['calls'] += 1
+            totals['wall_s'] = round(totals['wall_s'] + record['wall_s'], 6)
+            totals['cpu_s'] = round(totals['cpu_s'] + record['cpu_s'], 6)
+            totals['rows'] += record['rows'] or 0
+            if self.trace_memory:
+                totals['peak_memory_bytes'] = max(totals['peak_memory_bytes'], record['peak_memory_bytes'])
+
+    def instrument(self, module, names):
+        """
+        Replaces module.<name> for each name with a wrapped version, in that
+        module and in every loaded utils.* module that imported the same
+        function by name. finish() puts the originals back.
+        """
+        for name in names:
+            original = getattr(module, name)
+            wrapped = self.wrap(original, name)
+            for other in list(sys.modules.values()):
+                other_name = getattr(other, '__name__', '') or ''
+                if other is module or other_name.startswith('utils.') or other_name == '__main__':
+                    if getattr(other, name, None) is original:
+                        setattr(other, name, wrapped)
+                        self._patched.append((other, name, original))
+
+    def finish(self, json_file=None, cprofile_file=None, run_info=None):
+        """
+        Ends the run: restores instrumented functions, stops tracing and
+        writes the JSON profile (and the cProfile dump, if one was recorded).
+        Returns: dict (the profile)
+        """
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        for module, name, original in reversed(self._patched):
+            setattr(module, name, original)
+        self._patched = []
+
+        import platform
+
+        total = time.perf_counter() - self.started
+        profile = {
+            'run': dict({
+                'started': self._started_wall.isoformat(timespec='seconds'),
+                'python': platform.python_version(),
+                'argv': sys.argv[1:],
+                'memory_traced': self.trace_memory
+            }, **(run_info or {})),
+            'total_wall_s': round(total, 6),
+            'stages': self.stages,
+            'functions': self.functions
+        }
+        if self.trace_memory:
+            with self._lock:
+                self._fold_peak()
+            profile['peak_memory_bytes'] = self._run_peak
+            tracemalloc.stop()
+            self.trace_memory = False
+
+        if json_file:
+            os.makedirs(os.path.dirname(json_file) or '.', exist_ok=True)
+            with open(json_file, 'w', encoding='utf-8') as file:
+                json.dump(profile, file, indent=2)
+        if self._cprofile is not None and cprofile_file:
+            os.makedirs(os.path.dirname(cprofile_file) or '.', exist_ok=True)
+            self._cprofile.dump_stats(cprofile_file)
+        self._cprofile = None
+        return profile
+
+
+# Shared by main.py and its run modes
+profiler = StageProfiler()
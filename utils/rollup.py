@@ -0,0 +1,401 @@
+"""
+Rollup cube of sales by day x region x product.
+
+Every (region, product) cell of a bucket holds its revenue, quantity and
+transaction count. Next to the cells, each bucket keeps its customers
+(amount spent, orders and products bought) and its enrichment counts, so a
+full sales report can be rebuilt for any date window. Buckets exist per day
+and per month ('YYYY-MM', the first seven characters of the date). A date
+window is answered by adding up the month buckets it covers completely and
+the day buckets at its edges, without going back to the transactions.
+
+Cells and customers also remember the ordinal of the first row that touched
+them. Stats built for a window list regions, products and customers in the
+order of their first row inside that window, which is the order
+aggregate_transactions would produce for the same rows, so ties in the
+report rank the same way.
+
+The cube is persisted with pickle, like the incremental state.
+"""
+import bisect
+import datetime
+import itertools
+import os
+import pickle
+import tempfile
+
+from utils.file_handler import match_file_mode
+
+DEFAULT_CUBE_FILE = 'data/sales_cube.pickle'
+CUBE_VERSION = 1
+
+# Bucket keys accepted by cube_rollup
+ROLLUP_BUCKETS = ('day', 'week', 'month', 'region', 'product')
+
+
+def new_cube():
+    return {
+        'version': CUBE_VERSION,
+        'rows': 0,
+        # date -> bucket, and 'YYYY-MM' -> bucket (see _new_bucket)
+        'days': {},
+        'months': {},
+        'sorted_days': []
+    }
+
+
+def _new_bucket():
+    return {
+        # (region, product) -> [revenue, quantity, transactions, first row]
+        'cells': {},
+        # [revenue, quantity, transactions]
+        'totals': [0.0, 0, 0],
+        # customer -> [spent, orders, set of products, first row]
+        'customers': {},
+        # [enriched, matches, set of unmatched ProductIDs]
+        'enrichment': [0, 0, set()]
+    }
+
+
+def _merge_bucket(target, source):
+    """
+    Adds source into target, copying mutable values so the buckets share nothing.
+    """
+    cells = target['cells']
+    for key, (revenue, qty, count, first) in source['cells'].items():
+        cell = cells.get(key)
+        if cell is None:
+            cells[key] = [revenue, qty, count, first]
+        else:
+            cell[0] += revenue
+            cell[1] += qty
+            cell[2] += count
+            if first < cell[3]:
+                cell[3] = first
+
+    totals = target['totals']
+    for i, value in enumerate(source['totals']):
+        totals[i] += value
+
+    customers = target['customers']
+    for cust_id, (spent, orders, bought, first) in source['customers'].items():
+        customer = customers.get(cust_id)
+        if customer is None:
+            customers[cust_id] = [spent, orders, set(bought), first]
+        else:
+            customer[0] += spent
+            customer[1] += orders
+            customer[2] |= bought
+            if first < customer[3]:
+                customer[3] = first
+
+    enrichment = target['enrichment']
+    enrichment[0] += source['enrichment'][0]
+    enrichment[1] += source['enrichment'][1]
+    enrichment[2] |= source['enrichment'][2]
+
+
+def update_cube(cube, transactions):
+    """
+    Folds transactions (dicts as produced by parse_transactions, optionally
+    enriched) into the cube, in place. Rows should arrive in file order.
+    They are first gathered into day buckets of their own, which are then
+    added to the cube's day and month buckets.
+    Returns: the cube.
+    """
+    batch = {}
+    row = cube['rows']
+
+    for t in transactions:
+        qty = t['Quantity']
+        amount = qty * t['UnitPrice']
+        date = t['Date']
+        cust_id = t['CustomerID']
+        prod_name = t['ProductName']
+
+        bucket = batch.get(date)
+        if bucket is None:
+            bucket = batch[date] = _new_bucket()
+        cells = bucket['cells']
+        key = (t['Region'], prod_name)
+        cell = cells.get(key)
+        if cell is None:
+            cell = cells[key] = [0.0, 0, 0, row]
+        cell[0] += amount
+        cell[1] += qty
+        cell[2] += 1
+
+        totals = bucket['totals']
+        totals[0] += amount
+        totals[1] += qty
+        totals[2] += 1
+
+        customer = bucket['customers'].get(cust_id)
+        if customer is None:
+            customer = bucket['customers'][cust_id] = [0.0, 0, set(), row]
+        customer[0] += amount
+        customer[1] += 1
+        customer[2].add(prod_name)
+
+        if 'API_Match' in t:
+            enrichment = bucket['enrichment']
+            enrichment[0] += 1
+            if t['API_Match']:
+                enrichment[1] += 1
+            else:
+                enrichment[2].add(t['ProductID'])
+
+        row += 1
+
+    cube['rows'] = row
+    days = cube['days']
+    months = cube['months']
+    for date, bucket in batch.items():
+        month = months.get(date[:7])
+        if month is None:
+            month = months[date[:7]] = _new_bucket()
+        _merge_bucket(month, bucket)
+        if date in days:
+            _merge_bucket(days[date], bucket)
+        else:
+            days[date] = bucket
+            bisect.insort(cube['sorted_days'], date)
+
+    return cube
+
+
+def iter_update_cube(transactions, cube, chunk_size=10000):
+    """
+    Passes transactions through unchanged while folding them into the cube
+    in fixed-size chunks, so a stream can fill the cube on its way to being saved.
+    """
+    chunk = []
+    for t in transactions:
+        chunk.append(t)
+        if len(chunk) >= chunk_size:
+            update_cube(cube, chunk)
+            yield from chunk
+            chunk = []
+
+    if chunk:
+        update_cube(cube, chunk)
+        yield from chunk
+
+
+def build_cube(transactions):
+    """
+    Returns: a new cube holding the transactions.
+    """
+    return update_cube(new_cube(), transactions)
+
+
+def load_cube(cube_file=DEFAULT_CUBE_FILE):
+    """
+    Loads the persisted cube.
+    Returns: dict, or None if there is no usable cube file.
+    """
+    try:
+        with open(cube_file, 'rb') as file:
+            cube = pickle.load(file)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+        return None
+    if not isinstance(cube, dict) or cube.get('version') != CUBE_VERSION:
+        return None
+    return cube
+
+
+def save_cube(cube, cube_file=DEFAULT_CUBE_FILE):
+    """
+    Atomically writes the cube.
+    """
+    directory = os.path.dirname(cube_file) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.sales_cube.')
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            pickle.dump(cube, file, protocol=pickle.HIGHEST_PROTOCOL)
+        match_file_mode(tmp_path, cube_file)
+        os.replace(tmp_path, cube_file)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def days_in_window(cube, start_date=None, end_date=None):
+    """
+    Returns: list of the cube's days from start_date to end_date (inclusive,
+    'YYYY-MM-DD'; None leaves that end open), in date order.
+    """
+    sorted_days = cube['sorted_days']
+    low = 0 if start_date is None else bisect.bisect_left(sorted_days, start_date)
+    high = len(sorted_days) if end_date is None else bisect.bisect_right(sorted_days, end_date)
+    return sorted_days[low:high]
+
+
+def window_buckets(cube, start_date=None, end_date=None):
+    """
+    Covers a date window with as few buckets as possible: a month's bucket
+    when the window holds all of the cube's days of that month, its day
+    buckets otherwise.
+    Returns: list of (first date, bucket) tuples in date order.
+    """
+    sorted_days = cube['sorted_days']
+    covered = []
+    for month, dates in itertools.groupby(days_in_window(cube, start_date, end_date), key=lambda d: d[:7]):
+        dates = list(dates)
+        first = bisect.bisect_left(sorted_days, dates[0])
+        after = first + len(dates)
+        # Days sharing a month prefix are adjacent in sorted order
+        is_whole = (first == bisect.bisect_left(sorted_days, month)
+                    and (after == len(sorted_days) or sorted_days[after][:7] != month))
+        if is_whole:
+            covered.append((dates[0], cube['months'][month]))
+        else:
+            covered.extend((date, cube['days'][date]) for date in dates)
+    return covered
+
+
+def _bucket_key(date, by, region, product):
+    if by == 'day':
+        return date
+    if by == 'region':
+        return region
+    if by == 'product':
+        return product
+    if by == 'month':
+        return date[:7]
+    try:
+        year, week, _ = datetime.date.fromisoformat(date).isocalendar()
+    except ValueError:
+        # Dates that are not ISO formatted get a bucket of their own
+        return date
+    return f"{year}-W{week:02d}"
+
+
+def cube_rollup(cube, by='day', start_date=None, end_date=None, region=None, product=None):
+    """
+    Adds up the cube's buckets for a date window, optionally restricted to one
+    region and/or product, and groups them by 'day', 'week' (ISO week,
+    'YYYY-Www'), 'month' ('YYYY-MM'), 'region' or 'product'.
+    Returns: dict of bucket -> {'revenue', 'quantity', 'transaction_count'},
+    sorted by bucket.
+    """
+    if by not in ROLLUP_BUCKETS:
+        raise ValueError(f"unknown rollup bucket: {by}")
+
+    if by in ('day', 'week'):
+        buckets = [(date, cube['days'][date]) for date in days_in_window(cube, start_date, end_date)]
+    else:
+        buckets = window_buckets(cube, start_date, end_date)
+
+    results = {}
+    for date, bucket in buckets:
+        if region is None and product is None and by not in ('region', 'product'):
+            # Bucket totals are kept, so no cell has to be visited
+            parts = [(None, None, bucket['totals'])]
+        else:
+            parts = [
+                (cell_region, cell_product, cell)
+                for (cell_region, cell_product), cell in bucket['cells'].items()
+                if (region is None or cell_region == region) and (product is None or cell_product == product)
+            ]
+        for cell_region, cell_product, cell in parts:
+            key = _bucket_key(date, by, cell_region, cell_product)
+            totals = results.get(key)
+            if totals is None:
+                totals = results[key] = [0.0, 0, 0]
+            totals[0] += cell[0]
+            totals[1] += cell[1]
+            totals[2] += cell[2]
+
+    return {
+        key: {'revenue': revenue, 'quantity': quantity, 'transaction_count': count}
+        for key, (revenue, quantity, count) in sorted(results.items())
+    }
+
+
+def cube_totals(cube, start_date=None, end_date=None, region=None, product=None):
+    """
+    Returns: dict with the revenue, quantity and transaction_count of a date
+    window, optionally for one region and/or product.
+    """
+    totals = {'revenue': 0.0, 'quantity': 0, 'transaction_count': 0}
+    for bucket in cube_rollup(cube, 'month', start_date, end_date, region, product).values():
+        totals['revenue'] += bucket['revenue']
+        totals['quantity'] += bucket['quantity']
+        totals['transaction_count'] += bucket['transaction_count']
+    return totals
+
+
+def cube_stats(cube, start_date=None, end_date=None):
+    """
+    Rebuilds the accumulators of aggregate_transactions (exact mode) for the
+    transactions of a date window, from the cube alone.
+    Returns: dictionary in the format of aggregate_transactions.
+    """
+    window = _new_bucket()
+    for _, bucket in window_buckets(cube, start_date, end_date):
+        _merge_bucket(window, bucket)
+
+    daily = {}
+    for date in days_in_window(cube, start_date, end_date):
+        bucket = cube['days'][date]
+        daily[date] = {
+            'revenue': bucket['totals'][0],
+            'transaction_count': bucket['totals'][2],
+            'unique_customers_set': set(bucket['customers'])
+        }
+
+    regions = {}
+    products = {}
+    for (region, prod_name), (revenue, qty, count, first) in window['cells'].items():
+        region_data = regions.get(region)
+        if region_data is None:
+            region_data = regions[region] = [0.0, 0, first]
+        region_data[0] += revenue
+        region_data[1] += count
+        if first < region_data[2]:
+            region_data[2] = first
+
+        product_data = products.get(prod_name)
+        if product_data is None:
+            product_data = products[prod_name] = [0, 0.0, first]
+        product_data[0] += qty
+        product_data[1] += revenue
+        if first < product_data[2]:
+            product_data[2] = first
+
+    def first_seen(section, position):
+        return sorted(section.items(), key=lambda item: item[1][position])
+
+    return {
+        'total_revenue': window['totals'][0],
+        'transaction_count': window['totals'][2],
+        'regions': {
+            region: {'total_sales': sales, 'transaction_count': count}
+            for region, (sales, count, _) in first_seen(regions, 2)
+        },
+        'products': {
+            name: {'total_qty': qty, 'total_revenue': revenue}
+            for name, (qty, revenue, _) in first_seen(products, 2)
+        },
+        'customers': {
+            cust_id: {'total_spent': spent, 'purchase_count': orders, 'products_bought': bought}
+            for cust_id, (spent, orders, bought, _) in first_seen(window['customers'], 3)
+        },
+        'daily': daily
+    }
+
+
+def cube_enrichment_summary(cube, start_date=None, end_date=None):
+    """
+    Returns: the enrichment summary (as from summarize_enrichment) of the
+    enriched transactions in a date window.
+    """
+    summary = {'total': 0, 'matches': 0, 'failed_products': set()}
+    for _, bucket in window_buckets(cube, start_date, end_date):
+        total, matches, failed = bucket['enrichment']
+        summary['total'] += total
+        summary['matches'] += matches
+        summary['failed_products'] |= failed
+    return summary
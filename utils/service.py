@@ -0,0 +1,349 @@
+"""
+Long-running analytics service over a warm, in-memory copy of the sales file.
+
+The file is read, parsed, indexed and enriched once. The metrics of
+data_processor are then answered over HTTP, on localhost or a Unix socket,
+from the TransactionIndex and its cached filtered aggregates. A watcher
+thread polls the file and folds appended rows into the index and the cached
+aggregates; if the part already read is rewritten or truncated, the file is
+loaded again from scratch.
+
+Endpoints (GET, JSON). The metric endpoints take the filters region, min
+and max, with the same meaning as in validate_and_filter:
+    /health           rows loaded, bytes read, load and update times
+    /options          regions and amount range to filter on
+    /summary          revenue, transaction count, filter summary, enrichment of all rows
+    /regions          region_wise_sales
+    /top-products     top_selling_products (n, default 5)
+    /customers        customer_analysis (n, default 10)
+    /daily            daily_sales_trend
+    /peak-day         find_peak_sales_day
+    /low-performers   low_performing_products (threshold, default 10; n)
+"""
+import datetime
+import hashlib
+import json
+import os
+import signal
+import stat
+import threading
+from urllib.parse import urlparse, parse_qs
+
+from utils.file_handler import detect_encoding, next_encoding
+from utils.incremental import iter_new_lines, prefix_digest
+from utils.transaction_index import TransactionIndex
+from utils.data_processor import (
+    iter_parse_transactions,
+    collect_product_ids,
+    enrich_sales_data,
+    summarize_enrichment,
+    _region_view,
+    _top_products_view,
+    _customer_view,
+    _daily_view,
+    _peak_day_view,
+    _low_performers_view
+)
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+DEFAULT_WATCH_INTERVAL = 1.0
+
+METRIC_ENDPOINTS = ('/summary', '/regions', '/top-products', '/customers', '/daily', '/peak-day',
+                    '/low-performers')
+
+
+class SalesDataset:
+    """
+    The parsed and enriched sales file held in memory, with the byte offset
+    up to which it has been read. load_catalog(product_ids) returns the
+    product mapping for the given collect_product_ids result; with
+    refetch_missing, products first seen in appended rows are fetched too,
+    otherwise appended rows are enriched from the catalog loaded at start.
+    load and refresh run in one thread at a time and never change an index
+    or enrichment summary that readers can see: they build new ones and swap
+    them in under lock. Readers take the current ones under lock and query
+    them after releasing it, so a slow query holds up neither other queries
+    nor refresh.
+    """
+
+    def __init__(self, filename, load_catalog, refetch_missing=False, distinct_error=None):
+        self.filename = filename
+        self.load_catalog = load_catalog
+        self.refetch_missing = refetch_missing
+        self.distinct_error = distinct_error
+        self.lock = threading.Lock()
+        self.index = None
+        self.product_map = {}
+        self.enrichment = summarize_enrichment([])
+        self.encoding = None
+        self.offset = 0
+        self.fingerprint = None
+        self.loaded_at = None
+        self.updated_at = None
+        self._file_stat = None
+
+    def load(self):
+        """
+        Reads, parses, indexes and enriches the whole file, replacing what was loaded.
+        Only complete lines are read; a trailing partial line waits for refresh.
+        Raises FileNotFoundError if the file does not exist.
+        """
+        file_stat = os.stat(self.filename)
+        encoding = detect_encoding(self.filename)
+        while True:
+            if encoding is None:
+                raise ValueError(f"none of the supported encodings can decode {self.filename}")
+            position = [0]
+            digest = hashlib.sha256()
+            try:
+                index = TransactionIndex(iter_parse_transactions(
+                    iter_new_lines(self.filename, 0, encoding, position, digest)))
+                break
+            except UnicodeDecodeError:
+                encoding = next_encoding(encoding)
+
+        valid_data = index.filter()[0]
+        product_ids = collect_product_ids(valid_data)
+        product_map = self.load_catalog(product_ids)
+        enrichment = summarize_enrichment([])
+        enrich_sales_data(valid_data, product_map, product_ids, enrichment)
+
+        with self.lock:
+            self.index = index
+            self.product_map = product_map
+            self.enrichment = enrichment
+            self.encoding = encoding
+            self.offset = position[0]
+            self.fingerprint = digest.hexdigest()
+            self.loaded_at = self.updated_at = datetime.datetime.now()
+            self._file_stat = (file_stat.st_size, file_stat.st_mtime_ns)
+
+    def refresh(self):
+        """
+        Folds the rows appended to the file since the last load or refresh
+        into the dataset. Loads the file again if the part already read has
+        changed, or if the new rows need another encoding.
+        Returns: number of rows added (0 if the file is unchanged), or None after a full reload.
+        """
+        file_stat = os.stat(self.filename)
+        if (file_stat.st_size, file_stat.st_mtime_ns) == self._file_stat:
+            return 0
+        if file_stat.st_size < self.offset:
+            self.load()
+            return None
+        # The whole part already read is hashed again, then extended with the new bytes
+        digest = prefix_digest(self.filename, self.offset)
+        if digest.hexdigest() != self.fingerprint:
+            self.load()
+            return None
+
+        position = [self.offset]
+        try:
+            rows = list(iter_parse_transactions(
+                iter_new_lines(self.filename, self.offset, self.encoding, position, digest)))
+        except UnicodeDecodeError:
+            self.load()
+            return None
+
+        fingerprint = digest.hexdigest()
+        if not rows:
+            with self.lock:
+                self.offset = position[0]
+                self.fingerprint = fingerprint
+                self._file_stat = (file_stat.st_size, file_stat.st_mtime_ns)
+            return 0
+
+        product_map = self.product_map
+        if self.refetch_missing:
+            missing = {raw: product_id for raw, product_id in collect_product_ids(rows).items()
+                       if product_id is not None and product_id not in product_map}
+            if missing:
+                product_map = {**product_map, **self.load_catalog(missing)}
+
+        # Copy-on-write: readers keep using the current index and summary
+        # while the new rows go into copies of them
+        index = self.index.copy()
+        enrichment = dict(self.enrichment, failed_products=set(self.enrichment['failed_products']))
+        valid_data = index.extend(rows)
+        enrich_sales_data(valid_data, product_map, None, enrichment)
+
+        with self.lock:
+            self.index = index
+            self.product_map = product_map
+            self.enrichment = enrichment
+            self.offset = position[0]
+            self.fingerprint = fingerprint
+            self._file_stat = (file_stat.st_size, file_stat.st_mtime_ns)
+            self.updated_at = datetime.datetime.now()
+        return len(rows)
+
+
+def watch(dataset, interval, stop):
+    """
+    Refreshes the dataset every interval seconds until the stop event is set.
+    """
+    while not stop.wait(interval):
+        try:
+            added = dataset.refresh()
+        except FileNotFoundError:
+            continue
+        except Exception as e:
+            print(f" ! Could not apply changes to {dataset.filename}: {e}")
+            continue
+        if added is None:
+            print(f" ✓ {dataset.filename} was rewritten; reloaded {len(dataset.index)} rows", flush=True)
+        elif added:
+            print(f" ✓ Applied {added} appended rows ({len(dataset.index)} in total)", flush=True)
+
+
+def _number(params, name, convert=float, default=None):
+    value = params.get(name, '').strip()
+    if not value:
+        return default
+    try:
+        return convert(value)
+    except ValueError:
+        raise ValueError(f"{name} must be a number, got {value!r}") from None
+
+
+def _product_rows(products):
+    return [{'product': name, 'total_qty': qty, 'total_revenue': revenue} for name, qty, revenue in products]
+
+
+def answer(dataset, path, params):
+    """
+    Answers one query against the dataset.
+    Returns: tuple (HTTP status, JSON-serializable payload)
+    """
+    try:
+        region = params.get('region', '').strip() or None
+        min_amount = _number(params, 'min')
+        max_amount = _number(params, 'max')
+        n = _number(params, 'n', int)
+        threshold = _number(params, 'threshold', float, 10)
+    except ValueError as e:
+        return 400, {'error': str(e)}
+    filters = {'region': region, 'min': min_amount, 'max': max_amount}
+    if path not in METRIC_ENDPOINTS and path not in ('/health', '/options'):
+        return 404, {'error': f"unknown endpoint {path}"}
+
+    # Only the lookup is locked; refresh swaps in new objects instead of changing these
+    with dataset.lock:
+        index = dataset.index
+        enrichment = dataset.enrichment
+        if path == '/health':
+            return 200, {
+                'file': dataset.filename,
+                'rows': len(index),
+                'bytes_read': dataset.offset,
+                'loaded_at': dataset.loaded_at.isoformat(timespec='seconds'),
+                'updated_at': dataset.updated_at.isoformat(timespec='seconds')
+            }
+
+    if path == '/options':
+        regions, min_amt, max_amt = index.options
+        return 200, {'regions': regions, 'min_amount': min_amt, 'max_amount': max_amt}
+
+    stats = index.aggregate(region, min_amount, max_amount, distinct_error=dataset.distinct_error)
+    if path == '/summary':
+        result = {
+            'total_revenue': stats['total_revenue'],
+            'transaction_count': stats['transaction_count'],
+            'filter_summary': index.filter_summary(region, min_amount, max_amount),
+            'enrichment': {'total': enrichment['total'], 'matches': enrichment['matches'],
+                           'failed_products': sorted(enrichment['failed_products'])}
+        }
+    elif path == '/regions':
+        result = _region_view(stats)
+    elif path == '/top-products':
+        result = _product_rows(_top_products_view(stats, 5 if n is None else n))
+    elif path == '/customers':
+        result = _customer_view(stats, 10 if n is None else n)
+    elif path == '/daily':
+        result = _daily_view(stats)
+    elif path == '/peak-day':
+        peak_date, revenue, count = _peak_day_view(_daily_view(stats))
+        result = {'date': peak_date, 'revenue': revenue, 'transaction_count': count} if peak_date else None
+    else:
+        result = _product_rows(_low_performers_view(stats, threshold, n))
+    return 200, {'filters': filters, 'result': result}
+
+
+def make_handler(dataset, tcp=True):
+    # http.server is imported here so that importing this module stays cheap for the other modes
+    from http.server import BaseHTTPRequestHandler
+
+    class QueryHandler(BaseHTTPRequestHandler):
+        # Keep-alive, so clients can reuse one connection for many queries
+        protocol_version = 'HTTP/1.1'
+        # Headers and body go out in one write; as two small writes, Nagle's
+        # algorithm and delayed ACKs held every keep-alive response for ~40 ms
+        wbufsize = -1
+        disable_nagle_algorithm = tcp
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+            status, payload = answer(dataset, url.path, params)
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            # A line per query would flood the console
+            pass
+
+    return QueryHandler
+
+
+def serve(dataset, host=DEFAULT_HOST, port=DEFAULT_PORT, socket_path=None,
+          watch_interval=DEFAULT_WATCH_INTERVAL):
+    """
+    Serves the dataset's metrics until interrupted (Ctrl+C or SIGTERM), on
+    host:port or, with socket_path, on a Unix socket. The sales file is
+    checked for appended rows every watch_interval seconds (0 turns
+    watching off).
+    """
+    import socketserver
+    from http.server import ThreadingHTTPServer
+
+    class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+    handler = make_handler(dataset, tcp=not socket_path)
+    if socket_path:
+        # Only a socket left over from an earlier run is replaced, never another file
+        if os.path.exists(socket_path) and stat.S_ISSOCK(os.stat(socket_path).st_mode):
+            os.unlink(socket_path)
+        server = UnixHTTPServer(socket_path, handler)
+        where = f"unix:{socket_path}"
+    else:
+        server = ThreadingHTTPServer((host, port), handler)
+        server.daemon_threads = True
+        bound_host, bound_port = server.server_address[:2]
+        where = f"http://{bound_host}:{bound_port}"
+
+    stop = threading.Event()
+    if watch_interval > 0:
+        threading.Thread(target=watch, args=(dataset, watch_interval, stop), daemon=True).start()
+
+    def stop_serving(signum, frame):
+        raise KeyboardInterrupt
+
+    # SIGTERM (kill, service managers) stops the service as cleanly as Ctrl+C
+    signal.signal(signal.SIGTERM, stop_serving)
+
+    print(f" ✓ Serving on {where} (Ctrl+C to stop)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n ✓ Stopping the service")
+    finally:
+        stop.set()
+        server.server_close()
+        if socket_path and os.path.exists(socket_path):
+            os.unlink(socket_path)
@@ -0,0 +1,194 @@
+"""
+Bounded-memory summaries for streams with too many distinct keys to count
+exactly (millions of products or customers).
+
+SpaceSaving keeps the heaviest items in a fixed number of counters and
+answers approximate top-k queries. HyperLogLog counts distinct items in a
+fixed number of registers. Both can be merged, so partial summaries built by
+parallel workers or incremental runs combine like merge_aggregates.
+"""
+import hashlib
+import heapq
+import math
+
+
+class SpaceSaving:
+    """
+    Space-Saving heavy-hitter summary (Metwally et al.) with weighted updates.
+    Holds at most `capacity` items. An item's estimate never undercounts its
+    true total and overcounts by at most its reported error; any item whose
+    true total exceeds (stream total / capacity) is guaranteed to be held.
+    """
+
+    def __init__(self, capacity):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.total = 0
+        self.counters = {}  # item -> [estimate, error]
+        self._heap = []     # (estimate, seq, item), may hold outdated entries
+        self._seq = 0
+
+    def __len__(self):
+        return len(self.counters)
+
+    def _push(self, count, item):
+        self._seq += 1
+        heapq.heappush(self._heap, (count, self._seq, item))
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(c[0], i, key) for i, (key, c) in enumerate(self.counters.items())]
+            heapq.heapify(self._heap)
+            self._seq = len(self._heap)
+
+    def _pop_min(self):
+        # Skips heap entries left behind by later increments
+        while True:
+            count, _, item = heapq.heappop(self._heap)
+            counter = self.counters.get(item)
+            if counter is not None and counter[0] == count:
+                return item, counter
+
+    def add(self, item, weight=1):
+        self.total += weight
+        counter = self.counters.get(item)
+        if counter is not None:
+            counter[0] += weight
+        elif len(self.counters) < self.capacity:
+            counter = self.counters[item] = [weight, 0]
+        else:
+            # Evict the smallest counter; the new item inherits its count as error
+            evicted, smallest = self._pop_min()
+            del self.counters[evicted]
+            counter = self.counters[item] = [smallest[0] + weight, smallest[0]]
+        self._push(counter[0], item)
+
+    def min_count(self):
+        """
+        Returns: the smallest estimate held while the summary is full (the
+        most any unlisted item can have), else 0.
+        """
+        if len(self.counters) < self.capacity:
+            return 0
+        return min(counter[0] for counter in self.counters.values())
+
+    def merge(self, other):
+        """
+        Folds another summary in (Agarwal et al. mergeable summaries).
+        Items missing from one side are charged that side's min_count.
+        """
+        floor_self, floor_other = self.min_count(), other.min_count()
+        merged = {}
+        for item in self.counters.keys() | other.counters.keys():
+            mine = self.counters.get(item, (floor_self, floor_self))
+            theirs = other.counters.get(item, (floor_other, floor_other))
+            merged[item] = [mine[0] + theirs[0], mine[1] + theirs[1]]
+
+        kept = heapq.nlargest(self.capacity, merged.items(), key=lambda entry: entry[1][0])
+        self.counters = dict(kept)
+        self.total += other.total
+        self._heap = [(c[0], i, key) for i, (key, c) in enumerate(self.counters.items())]
+        heapq.heapify(self._heap)
+        self._seq = len(self._heap)
+        return self
+
+    def top(self, k):
+        """
+        Returns: list of up to k tuples (item, estimate, error), largest first.
+        """
+        entries = heapq.nlargest(k, self.counters.items(), key=lambda entry: entry[1][0])
+        return [(item, counter[0], counter[1]) for item, counter in entries]
+
+
+
+class HyperLogLog:
+    """
+    HyperLogLog distinct counter (Flajolet et al.) in 2**precision one-byte
+    registers; the relative standard error is about 1.04 / sqrt(2**precision).
+    Hashing is stable across processes, so sketches of the same precision
+    merge across workers and runs. len() gives the rounded estimate, so a
+    sketch can stand in for a set wherever only its size is used.
+    """
+    __slots__ = ('precision', 'registers')
+
+    def __init__(self, precision=14, items=()):
+        if not 4 <= precision <= 18:
+            raise ValueError("precision must be between 4 and 18")
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+        for item in items:
+            self.add(item)
+
+    @staticmethod
+    def precision_for(error):
+        """
+        Returns: the smallest precision whose standard error is at most error,
+        but at least 5 (about 0.18), the smallest whose sketch replaces sets
+        of a few members (see set_limit).
+        Raises ValueError if error is not positive, or smaller than the
+        standard error of the largest precision (18, about 0.002).
+        """
+        if error <= 0:
+            raise ValueError("error must be positive")
+        precision = max(5, math.ceil(math.log2((1.04 / error) ** 2)))
+        if precision > 18:
+            # Rounded up, so the error named in the message is accepted
+            smallest = math.ceil(1.04 / math.sqrt(1 << 18) * 1e6) / 1e6
+            raise ValueError(f"error must be at least {smallest:.6f}, "
+                             f"the standard error at the largest precision (18)")
+        return precision
+
+    @staticmethod
+    def set_limit(precision):
+        """
+        Returns: the set size above which a sketch of this precision is
+        smaller than a set of references (about 32 bytes per member), at least 1.
+        """
+        return max(1, (1 << precision) // 32)
+
+    def add(self, item):
+        value = int.from_bytes(
+            hashlib.blake2b(str(item).encode('utf-8'), digest_size=8).digest(), 'little'
+        )
+        rest_bits = 64 - self.precision
+        index = value >> rest_bits
+        rank = rest_bits - (value & ((1 << rest_bits) - 1)).bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other):
+        """
+        Folds another sketch of the same precision in (register-wise maximum).
+        Returns: self
+        """
+        if other.precision != self.precision:
+            raise ValueError("HyperLogLog sketches must share a precision to merge")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    def __ior__(self, other):
+        if isinstance(other, HyperLogLog):
+            return self.merge(other)
+        for item in other:
+            self.add(item)
+        return self
+
+    def copy(self):
+        clone = HyperLogLog(self.precision)
+        clone.registers[:] = self.registers
+        return clone
+
+    def estimate(self):
+        m = len(self.registers)
+        alpha = {16: 0.673, 32: 0.697, 64: 0.709}.get(m, 0.7213 / (1 + 1.079 / m))
+        raw = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if raw <= 2.5 * m and zeros:
+            # Small-range correction (linear counting)
+            return m * math.log(m / zeros)
+        return raw
+
+    def __len__(self):
+        return int(round(self.estimate()))
+
+    def __repr__(self):
+        return f"HyperLogLog(precision={self.precision}, estimate={self.estimate():.0f})"
@@ -0,0 +1,296 @@
+"""
+Binary snapshots of parsed or enriched transactions.
+
+A snapshot stores each field as one compressed column, so a later run can
+restore the rows without reading and parsing the text file again.
+
+Layout:
+    MAGIC | version (uint16) | header length (uint32) | header (JSON) | column blocks
+
+The header holds the schema (field names, column types and block sizes),
+the row count, the byte order and, optionally, the size and mtime of the
+source file the rows came from. Column types:
+    int64    every value is an int:   array('q')
+    float64  every value is a float:  array('d')
+    text     unique strings:          '\\0'-joined UTF-8
+    dict     anything else:           JSON list of distinct values + codes
+"""
+import json
+import os
+import struct
+import sys
+import tempfile
+import zlib
+from array import array
+from itertools import chain, islice, repeat
+from operator import itemgetter
+
+from utils.file_handler import match_file_mode
+from utils.transaction_table import TransactionTable, ENCODED_FIELDS, FIELDS
+
+MAGIC = b'SALESNAP'
+SNAPSHOT_VERSION = 1
+_PREAMBLE = struct.Struct('<HI')
+
+# Rows gathered into columns at a time by save_snapshot
+SAVE_CHUNK_ROWS = 4096
+
+# Fields written as plain strings instead of dictionary-encoded values
+TEXT_FIELDS = ('TransactionID',)
+
+
+def _column_type(name, values):
+    types = set(map(type, values))
+    if types == {int}:
+        if -2**63 <= min(values) and max(values) < 2**63:
+            return 'int64'
+    elif types == {float}:
+        return 'float64'
+    elif types == {str} and name in TEXT_FIELDS:
+        if not any('\0' in v for v in values):
+            return 'text'
+    return 'dict'
+
+
+def _encode_column(kind, values, level):
+    """
+    Returns: (blocks, extra header fields) for one column.
+    """
+    if kind == 'int64':
+        return [zlib.compress(array('q', values).tobytes(), level)], {}
+    if kind == 'float64':
+        return [zlib.compress(array('d', values).tobytes(), level)], {}
+    if kind == 'text':
+        return [zlib.compress('\0'.join(values).encode('utf-8'), level)], {}
+
+    # Codes are handed out in order of first appearance
+    index = {}
+    if set(map(type, values)) == {str}:
+        codes = [index.setdefault(value, len(index)) for value in values]
+        distinct = list(index)
+    else:
+        # The type is part of the key so that 1, 1.0 and True stay apart
+        codes = [index.setdefault(key, len(index)) for key in zip(map(type, values), values)]
+        distinct = [value for _, value in index]
+    typecode = 'B' if len(distinct) <= 1 << 8 else 'H' if len(distinct) <= 1 << 16 else 'I'
+    blocks = [zlib.compress(json.dumps(distinct).encode('utf-8'), level),
+              zlib.compress(array(typecode, codes).tobytes(), level)]
+    return blocks, {'codes': typecode}
+
+
+def _decode_array(typecode, block, swap):
+    values = array(typecode)
+    values.frombytes(zlib.decompress(block))
+    if swap:
+        values.byteswap()
+    return values
+
+
+def save_snapshot(transactions, filename, source=None, level=1):
+    """
+    Atomically writes transactions (parsed or enriched dicts, or a
+    TransactionTable) to a compressed columnar snapshot. The fields are taken
+    from the first record. If source is given, its size and mtime are stored
+    so snapshot_matches can tell whether it changed since.
+    Returns: True on success, False if the file could not be written.
+    """
+    rows = iter(transactions)
+    first = next(rows, None)
+    fields = FIELDS if first is None else tuple(first)
+    columns = [[] for _ in fields]
+    if first is not None:
+        rows = chain((first,), rows)
+        extenders = [(column.extend, itemgetter(name)) for column, name in zip(columns, fields)]
+        # Columns are filled a small chunk of rows at a time, while the chunk is in cache
+        while True:
+            chunk = list(islice(rows, SAVE_CHUNK_ROWS))
+            if not chunk:
+                break
+            for extend, get_field in extenders:
+                extend(map(get_field, chunk))
+
+    schema = []
+    blocks = []
+    for name, values in zip(fields, columns):
+        kind = _column_type(name, values)
+        column_blocks, extra = _encode_column(kind, values, level)
+        schema.append(dict(name=name, type=kind, sizes=[len(b) for b in column_blocks], **extra))
+        blocks.extend(column_blocks)
+
+    header = {
+        'version': SNAPSHOT_VERSION,
+        'rows': len(columns[0]),
+        'byteorder': sys.byteorder,
+        'compression': 'zlib',
+        'fields': schema,
+        'source': _source_info(source) if source else None
+    }
+    header_bytes = json.dumps(header).encode('utf-8')
+
+    try:
+        directory = os.path.dirname(filename) or '.'
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.snapshot.')
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                file.write(MAGIC + _PREAMBLE.pack(SNAPSHOT_VERSION, len(header_bytes)) + header_bytes)
+                file.writelines(blocks)
+            match_file_mode(tmp_path, filename)
+            os.replace(tmp_path, filename)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except OSError as e:
+        print(f"Error saving snapshot: {e}")
+        return False
+    return True
+
+
+def _source_info(source):
+    info = os.stat(source)
+    return {'path': os.path.abspath(source), 'size': info.st_size, 'mtime_ns': info.st_mtime_ns}
+
+
+def _read_header(file):
+    preamble = file.read(len(MAGIC) + _PREAMBLE.size)
+    if preamble[:len(MAGIC)] != MAGIC:
+        raise ValueError("not a sales snapshot")
+    version, header_length = _PREAMBLE.unpack(preamble[len(MAGIC):])
+    if version != SNAPSHOT_VERSION:
+        raise ValueError(f"unsupported snapshot version {version}")
+    header = json.loads(file.read(header_length))
+    if not isinstance(header, dict):
+        raise ValueError("malformed snapshot header")
+    return header
+
+
+def read_snapshot_header(filename):
+    """
+    Reads only the header (schema, row count, source info) of a snapshot.
+    Returns: dict, or None if there is no usable snapshot.
+    """
+    try:
+        with open(filename, 'rb') as file:
+            return _read_header(file)
+    except (OSError, ValueError, struct.error):
+        return None
+
+
+def snapshot_matches(filename, source):
+    """
+    Returns: True if the snapshot was saved from source and source has not
+    changed size or mtime since.
+    """
+    header = read_snapshot_header(filename)
+    if header is None or not header.get('source'):
+        return False
+    try:
+        return header['source'] == _source_info(source)
+    except OSError:
+        return False
+
+
+def load_snapshot_columns(filename):
+    """
+    Decompresses every column of a snapshot. int64/float64 columns come back
+    as arrays, text columns as lists and dict columns as (distinct values,
+    codes array) pairs.
+    Returns: tuple (header, {field: column}), or None if there is no usable snapshot.
+    """
+    try:
+        with open(filename, 'rb') as file:
+            header = _read_header(file)
+            data = file.read()
+    except (OSError, ValueError, struct.error):
+        return None
+
+    columns = {}
+    pos = 0
+    try:
+        # A header without a byte order, like a damaged column, means re-parsing the text
+        swap = header['byteorder'] != sys.byteorder
+        for field in header['fields']:
+            blocks = []
+            for size in field['sizes']:
+                blocks.append(data[pos:pos + size])
+                pos += size
+
+            kind = field['type']
+            if kind == 'int64':
+                values = _decode_array('q', blocks[0], swap)
+            elif kind == 'float64':
+                values = _decode_array('d', blocks[0], swap)
+            elif kind == 'text':
+                raw = zlib.decompress(blocks[0]).decode('utf-8')
+                values = raw.split('\0') if header['rows'] else []
+            else:
+                distinct = json.loads(zlib.decompress(blocks[0]))
+                codes = _decode_array(field['codes'], blocks[1], swap)
+                values = (distinct, codes)
+            columns[field['name']] = values
+    except (zlib.error, ValueError, KeyError, IndexError):
+        return None
+    return header, columns
+
+
+def load_snapshot(filename):
+    """
+    Restores the transaction dicts saved by save_snapshot, in their original
+    order and with their original field order and value types.
+    Returns: list of dicts, or None if there is no usable snapshot.
+    """
+    loaded = load_snapshot_columns(filename)
+    if loaded is None:
+        return None
+    columns = loaded[1]
+
+    fields = list(columns)
+    expanded = []
+    for name in fields:
+        values = columns[name]
+        expanded.append(_expand(values) if isinstance(values, tuple) else values)
+    return list(map(dict, map(zip, repeat(fields), zip(*expanded))))
+
+
+def load_snapshot_table(filename):
+    """
+    Restores the base transaction fields of a snapshot straight into a
+    TransactionTable, without building a dict per row. API_* fields of an
+    enriched snapshot are not part of the table.
+    Returns: TransactionTable, or None if there is no usable snapshot or it
+    lacks one of the base fields.
+    """
+    loaded = load_snapshot_columns(filename)
+    if loaded is None:
+        return None
+    columns = loaded[1]
+    if any(name not in columns for name in FIELDS):
+        return None
+
+    table = TransactionTable()
+    ids = columns['TransactionID']
+    table.transaction_ids = ids if isinstance(ids, list) else _expand(ids)
+    for name, column in (('Quantity', table.quantity), ('UnitPrice', table.unit_price)):
+        values = columns[name]
+        if isinstance(values, array) and values.typecode == column.typecode:
+            column.frombytes(values.tobytes())
+        else:
+            column.extend(_expand(values) if isinstance(values, tuple) else values)
+
+    for name in ENCODED_FIELDS:
+        values = columns[name]
+        column = table.encoded[name]
+        if isinstance(values, tuple):
+            distinct, codes = values
+            column.values = distinct
+            column.codes = codes if codes.typecode == 'I' else array('I', codes)
+            column.index = {value: code for code, value in enumerate(distinct)}
+        else:
+            for value in values:
+                column.append(value)
+    return table
+
+
+def _expand(values):
+    distinct, codes = values
+    return [distinct[code] for code in codes]
@@ -0,0 +1,268 @@
+import threading
+from bisect import bisect_left, bisect_right
+
+from utils.data_processor import aggregate_transactions, aggregation_backend, filter_options, merge_aggregates
+from utils.transaction_table import TransactionTable
+
+# Filtered aggregates kept by TransactionIndex.aggregate; the oldest goes first
+STATS_CACHE_SIZE = 64
+
+
+def _is_valid(t):
+    # Same validity rules as iter_validate_and_filter (a NaN price passes them)
+    return not (not t['TransactionID'].startswith('T') or
+                not t['ProductID'].startswith('P') or
+                not t['CustomerID'].startswith('C') or
+                t['Quantity'] <= 0 or
+                t['UnitPrice'] <= 0)
+
+
+class _AmountIndex:
+    """
+    Positions of a group of valid transactions, in input order and sorted by
+    amount (Quantity * UnitPrice) for bisect range lookups.
+    NaN amounts never fail a min/max comparison, so they are kept apart and
+    always match.
+    """
+    __slots__ = ('positions', 'amounts', 'by_amount', 'unordered')
+
+    def __init__(self):
+        self.positions = []
+        self.amounts = []
+        self.by_amount = []
+        self.unordered = []
+
+    def add(self, position, amount):
+        self.positions.append(position)
+        if amount != amount:
+            self.unordered.append(position)
+        else:
+            self.amounts.append((amount, position))
+
+    def copy(self):
+        other = _AmountIndex()
+        other.positions = list(self.positions)
+        other.amounts = list(self.amounts)
+        other.by_amount = list(self.by_amount)
+        other.unordered = list(self.unordered)
+        return other
+
+    def freeze(self):
+        self.amounts.sort()
+        self.by_amount = [position for _, position in self.amounts]
+        self.amounts = [amount for amount, _ in self.amounts]
+
+    def extend(self, entries):
+        """
+        Adds (position, amount) pairs positioned after every indexed one to a
+        frozen index. A few new amounts are inserted in place; many are
+        merged in with one sort over both runs.
+        """
+        ordered = []
+        for position, amount in entries:
+            self.positions.append(position)
+            if amount != amount:
+                self.unordered.append(position)
+            else:
+                ordered.append((amount, position))
+        ordered.sort()
+
+        if len(ordered) * 16 > len(self.amounts):
+            merged = sorted(list(zip(self.amounts, self.by_amount)) + ordered)
+            self.amounts = [amount for amount, _ in merged]
+            self.by_amount = [position for _, position in merged]
+        else:
+            # New positions are the largest, so they go after equal amounts
+            for amount, position in ordered:
+                i = bisect_right(self.amounts, amount)
+                self.amounts.insert(i, amount)
+                self.by_amount.insert(i, position)
+
+    def bounds(self, min_amount, max_amount):
+        lo = 0 if min_amount is None else bisect_left(self.amounts, min_amount)
+        hi = len(self.amounts) if max_amount is None else bisect_right(self.amounts, max_amount)
+        return lo, max(lo, hi)
+
+    def count(self, min_amount, max_amount):
+        lo, hi = self.bounds(min_amount, max_amount)
+        return hi - lo + len(self.unordered)
+
+    def select(self, min_amount, max_amount):
+        """
+        Returns: positions of the transactions in [min_amount, max_amount], in input order.
+        """
+        if min_amount is None and max_amount is None:
+            return self.positions
+        lo, hi = self.bounds(min_amount, max_amount)
+        return sorted(self.by_amount[lo:hi] + self.unordered)
+
+
+class TransactionIndex:
+    """
+    Index over parsed transactions for repeated filtering.
+    Built once in O(N log N): invalid rows are counted up front, and valid
+    rows are indexed per region (posting lists) and by amount. Each
+    filter_summary is then answered in O(log N), and filter returns the
+    same rows as validate_and_filter in time proportional to the result.
+    Rows appended to the input later can be added with extend.
+    aggregate may be called from several threads at once; extend must not
+    run while the index is in use (extend a copy instead).
+    """
+
+    def __init__(self, transactions):
+        self.transactions = list(transactions)
+        self.options = filter_options(self.transactions)
+        self.invalid = 0
+        self.all_valid = _AmountIndex()
+        self.regions = {}
+        self._stats = {}
+        self._stats_lock = threading.Lock()
+
+        for position, t in enumerate(self.transactions):
+            if not _is_valid(t):
+                self.invalid += 1
+                continue
+            amount = t['Quantity'] * t['UnitPrice']
+            self.all_valid.add(position, amount)
+            region_index = self.regions.get(t['Region'])
+            if region_index is None:
+                region_index = self.regions[t['Region']] = _AmountIndex()
+            region_index.add(position, amount)
+
+        self.all_valid.freeze()
+        for region_index in self.regions.values():
+            region_index.freeze()
+
+    def __len__(self):
+        return len(self.transactions)
+
+    def copy(self):
+        """
+        Returns: an independent copy of the index, sharing only the row dicts,
+        which can be extended while this one keeps answering queries.
+        """
+        other = TransactionIndex.__new__(TransactionIndex)
+        other.transactions = list(self.transactions)
+        other.options = self.options
+        other.invalid = self.invalid
+        other.all_valid = self.all_valid.copy()
+        other.regions = {region: region_index.copy() for region, region_index in self.regions.items()}
+        with self._stats_lock:
+            cached = list(self._stats.items())
+        # Merging into empty stats copies every set and sketch, keeping key order
+        other._stats = {
+            key: merge_aggregates(aggregate_transactions([], distinct_error=stats.get('distinct_error')), stats)
+            for key, stats in cached
+        }
+        other._stats_lock = threading.Lock()
+        return other
+
+    def _group(self, region):
+        if not region:
+            return self.all_valid
+        return self.regions.get(region) or _AmountIndex()
+
+    def filter_summary(self, region=None, min_amount=None, max_amount=None):
+        """
+        Counts what validate_and_filter would keep and drop, without touching the rows.
+        Returns: dict with the same keys as validate_and_filter's filter_summary.
+        """
+        valid = len(self.all_valid.positions)
+        group = self._group(region)
+        in_region = len(group.positions)
+        final_count = group.count(min_amount, max_amount)
+        return {
+            'total_input': len(self.transactions),
+            'invalid': self.invalid,
+            'filtered_by_region': valid - in_region,
+            'filtered_by_amount': in_region - final_count,
+            'final_count': final_count
+        }
+
+    def filter(self, region=None, min_amount=None, max_amount=None):
+        """
+        Same result as validate_and_filter on the indexed transactions.
+        Returns: tuple (valid_transactions, invalid_count, filter_summary)
+        """
+        rows = self.transactions
+        positions = self._group(region).select(min_amount, max_amount)
+        return [rows[i] for i in positions], self.invalid, self.filter_summary(region, min_amount, max_amount)
+
+    def aggregate(self, region=None, min_amount=None, max_amount=None, distinct_error=None, backend='python'):
+        """
+        aggregate_transactions over one filtered subset, cached per filter,
+        ready for generate_sales_report(..., stats=...) and the report views.
+        With backend='numpy' the subset is copied into a TransactionTable and
+        aggregated with the NumPy backend (see aggregation_backend for when
+        it applies); both backends give the same result, so they share the cache.
+        Treat the result as read-only.
+        Returns: dictionary of raw accumulators.
+        """
+        key = (region or None, min_amount, max_amount, distinct_error)
+        stats = self._stats.get(key)
+        if stats is None:
+            # Aggregated outside the cache lock; two threads missing on the
+            # same filter both compute it, and the first result is kept
+            rows = self.filter(region, min_amount, max_amount)[0]
+            if backend == 'numpy' and distinct_error is None:
+                rows = TransactionTable.from_transactions(rows)
+            stats = aggregate_transactions(rows, backend=backend, distinct_error=distinct_error)
+            with self._stats_lock:
+                cached = self._stats.get(key)
+                if cached is not None:
+                    return cached
+                if len(self._stats) >= STATS_CACHE_SIZE:
+                    del self._stats[next(iter(self._stats))]
+                self._stats[key] = stats
+        return stats
+
+    def extend(self, transactions):
+        """
+        Appends transactions, e.g. rows appended to the sales file, without
+        rebuilding the index. Cached aggregates are kept up to date by
+        folding in only the new rows their filter keeps, which gives the
+        same result as aggregating the whole subset again.
+        Returns: list of the new valid transactions, in input order.
+        """
+        start = len(self.transactions)
+        self.transactions.extend(transactions)
+        new_rows = self.transactions[start:]
+        if not new_rows:
+            return []
+
+        old_regions, old_min, old_max = self.options
+        regions, min_amount, max_amount = filter_options(new_rows)
+        mins = [amount for amount in (old_min, min_amount) if amount is not None]
+        maxes = [amount for amount in (old_max, max_amount) if amount is not None]
+        self.options = (sorted(set(old_regions).union(regions)),
+                        min(mins) if mins else None, max(maxes) if maxes else None)
+
+        valid = []
+        all_entries = []
+        by_region = {}
+        for position, t in enumerate(new_rows, start):
+            if not _is_valid(t):
+                self.invalid += 1
+                continue
+            amount = t['Quantity'] * t['UnitPrice']
+            valid.append((t, amount))
+            all_entries.append((position, amount))
+            by_region.setdefault(t['Region'], []).append((position, amount))
+
+        self.all_valid.extend(all_entries)
+        for region, entries in by_region.items():
+            region_index = self.regions.get(region)
+            if region_index is None:
+                region_index = self.regions[region] = _AmountIndex()
+            region_index.extend(entries)
+
+        # Same comparisons as validate_and_filter, so a NaN amount matches every range
+        for (region, min_amount, max_amount, _), stats in self._stats.items():
+            rows = [
+                t for t, amount in valid
+                if not (region and t['Region'] != region)
+                and not (min_amount is not None and amount < min_amount)
+                and not (max_amount is not None and amount > max_amount)
+            ]
+            aggregate_transactions(rows, stats)
+        return [t for t, _ in valid]
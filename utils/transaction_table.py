@@ -0,0 +1,149 @@
+from array import array
+from collections.abc import Mapping
+
+FIELDS = ('TransactionID', 'Date', 'ProductID', 'ProductName',
+          'Quantity', 'UnitPrice', 'CustomerID', 'Region')
+
+# Low-cardinality text columns stored as integer codes into a value list
+ENCODED_FIELDS = ('Date', 'ProductID', 'ProductName', 'CustomerID', 'Region')
+
+
+class EncodedColumn:
+    """
+    Dictionary-encoded text column: each row stores a 4-byte code,
+    each distinct value is stored once.
+    """
+    __slots__ = ('codes', 'values', 'index')
+
+    def __init__(self):
+        self.codes = array('I')
+        self.values = []
+        self.index = {}
+
+    def append(self, value):
+        code = self.index.get(value)
+        if code is None:
+            code = self.index[value] = len(self.values)
+            self.values.append(value)
+        self.codes.append(code)
+
+    def __getitem__(self, i):
+        return self.values[self.codes[i]]
+
+    def __len__(self):
+        return len(self.codes)
+
+
+class TransactionRow(Mapping):
+    """
+    Read-only, dict-like view of one row of a TransactionTable.
+    Supports t['Quantity'], t.get(...), t.copy() etc. like a parsed transaction dict.
+    """
+    __slots__ = ('_table', '_index')
+
+    def __init__(self, table, index):
+        self._table = table
+        self._index = index
+
+    def __getitem__(self, key):
+        table = self._table
+        i = self._index
+        if key == 'Quantity':
+            return table.quantity[i]
+        if key == 'UnitPrice':
+            return table.unit_price[i]
+        if key == 'TransactionID':
+            return table.transaction_ids[i]
+        column = table.encoded.get(key)
+        if column is None:
+            raise KeyError(key)
+        return column.values[column.codes[i]]
+
+    def __iter__(self):
+        return iter(FIELDS)
+
+    def __len__(self):
+        return len(FIELDS)
+
+    def copy(self):
+        return {key: self[key] for key in FIELDS}
+
+    def __repr__(self):
+        return f"TransactionRow({self.copy()!r})"
+
+
+class TransactionTable:
+    """
+    Columnar store for parsed transactions.
+    Quantity and UnitPrice are typed arrays ('q' and 'd'), Region, ProductID,
+    ProductName, CustomerID and Date are dictionary-encoded. Iterating or
+    indexing yields TransactionRow views, so the report functions keep working.
+    """
+
+    def __init__(self):
+        self.transaction_ids = []
+        self.quantity = array('q')
+        self.unit_price = array('d')
+        self.encoded = {name: EncodedColumn() for name in ENCODED_FIELDS}
+
+    @classmethod
+    def from_transactions(cls, transactions):
+        """
+        Builds a table from any iterable of transaction dicts (e.g. a generator
+        from iter_validate_and_filter), without holding the dicts in memory.
+        """
+        table = cls()
+        table.extend(transactions)
+        return table
+
+    def append(self, t):
+        self.extend((t,))
+
+    def extend(self, transactions):
+        ids_append = self.transaction_ids.append
+        qty_append = self.quantity.append
+        price_append = self.unit_price.append
+        encoded = [(name, self.encoded[name]) for name in ENCODED_FIELDS]
+        appenders = [(name, column.append) for name, column in encoded]
+
+        for t in transactions:
+            ids_append(t['TransactionID'])
+            qty_append(t['Quantity'])
+            price_append(t['UnitPrice'])
+            for name, append in appenders:
+                append(t[name])
+
+    def __len__(self):
+        return len(self.quantity)
+
+    def __getitem__(self, i):
+        n = len(self.quantity)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("TransactionTable index out of range")
+        return TransactionRow(self, i)
+
+    def __iter__(self):
+        for i in range(len(self.quantity)):
+            yield TransactionRow(self, i)
+
+    def codes(self, name):
+        """
+        Returns: (codes array, list of distinct values) for an encoded column.
+        """
+        column = self.encoded[name]
+        return column.codes, column.values
+
+    def to_numpy(self, name):
+        """
+        Zero-copy NumPy view of a numeric column or of an encoded column's codes.
+        Requires NumPy.
+        """
+        import numpy as np
+
+        if name == 'Quantity':
+            return np.frombuffer(self.quantity, dtype=np.int64)
+        if name == 'UnitPrice':
+            return np.frombuffer(self.unit_price, dtype=np.float64)
+        return np.frombuffer(self.encoded[name].codes, dtype=np.uint32)